@@ -1,8 +1,14 @@
+import io
+import os
+
 import streamlit as st
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns   
+
+from turnos.cache import RosterCache, content_hash
+from turnos.profiling import MemoryTracing, StageTimer
+
+# pandas y los módulos propios de cada sección se importan dentro de la sección
+# (o del ayudante) que los usa: cada página carga solo lo que necesita.
 
 
 # =======================
@@ -12,18 +18,156 @@ st.set_page_config(page_title="Programación de Turnos de Enfermería",
                    layout="wide",
                    page_icon="🩺")
 
+# =======================
+# CACHÉ COMPARTIDA ENTRE SESIONES
+# =======================
+@st.cache_resource
+def roster_cache():
+    """Matrices Xij y agregados por hash del archivo (LRU, máx. 512 MB)."""
+    return RosterCache()
+
+
+cache = roster_cache()
+
+
+@st.cache_resource
+def solution_cache():
+    """Soluciones óptimas en disco por hash de los parámetros (se conservan entre reinicios)."""
+    from turnos.solutions import SolutionCache, default_path
+
+    return SolutionCache(default_path())
+
+
+@st.cache_resource
+def memory_tracing():
+    """Sesiones que piden medir memoria; ``tracemalloc`` se comparte entre todas."""
+    return MemoryTracing()
+
+
+@st.cache_resource
+def static_image(name):
+    """Bytes de una imagen del proyecto, leídos una sola vez y compartidos entre sesiones."""
+    with open(name, "rb") as f:
+        return f.read()
+
+
+def show_chart(name, data, options, build):
+    """Muestra una figura como PNG, reutilizándola si los datos y opciones no cambiaron."""
+    from turnos import charts
+
+    png = cache.get_or_compute(
+        ("chart", name, charts.data_hash(*data), options),
+        lambda: charts.to_png(build()),
+    )
+    st.image(png)
+
+
+def show_summary(result):
+    """Encabezado con el resumen de Xij (en lugar de la matriz completa)."""
+    from turnos import viewer
+
+    info = viewer.summary(result)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Enfermeras × turnos", f"{info['nurses']:,} × {info['shifts']}")
+    c2.metric("Asignaciones", f"{info['assigned']:,}", f"{info['density']:.1%} de las celdas",
+              delta_color="off")
+    c3.metric("Enfermeras con violaciones", f"{info['violating']:,}")
+    c4.metric("Celdas no binarias", f"{info['invalid']:,}")
+
+
+def show_matrix(source, result, prefix):
+    """Visor paginado de Xij: filtra en el servidor y envía solo la página visible."""
+    import pandas as pd
+
+    from turnos import viewer
+    from turnos.loaders import INVALID
+
+    nurses, shifts = source.shape
+    f1, f2, f3 = st.columns(3)
+    only_violations = f1.checkbox("Solo enfermeras con violaciones", key=f"{prefix}_violations")
+    shift = f2.selectbox("Turno", ["Todos"] + list(range(1, shifts + 1)), key=f"{prefix}_shift")
+    shift = None if shift == "Todos" else shift - 1
+    only_assigned = f3.checkbox("Solo asignadas a ese turno", key=f"{prefix}_assigned",
+                                disabled=shift is None)
+
+    rows, columns = viewer.select(source, result, only_violations, shift, only_assigned)
+    pages = max(1, -(-len(rows) // viewer.PAGE_ROWS))
+    number = st.number_input(f"Página (de {pages:,})", min_value=1, max_value=pages, value=1,
+                             key=f"{prefix}_page")
+    window = viewer.page(source, rows, columns, number - 1)
+
+    # índices 1-based como en el modelo; las celdas no binarias se muestran vacías
+    table = pd.DataFrame(window.cells, index=window.rows + 1, columns=window.columns + 1)
+    st.dataframe(table.where(table != INVALID))
+    st.caption(f"{window.matches:,} enfermeras cumplen el filtro · "
+               f"página {window.number + 1:,} de {window.pages:,}")
+
+
+def show_downloads(source, result, prefix):
+    """Descargas del rol, las horas y las violaciones; cada archivo se genera al pulsar su botón."""
+    from turnos import export
+
+    labels = {"xlsx": "Excel (.xlsx)", "parquet": "Parquet", "csv": "CSV"}
+    fmt = st.radio("Formato", export.EXPORT_FORMATS, format_func=labels.get, horizontal=True,
+                   key=f"{prefix}_export_format")
+    mime = export.MIME_TYPES[fmt]
+
+    def button(column, label, rows, name, write, *args, **kwargs):
+        # Excel tiene un límite de filas por hoja; Parquet y CSV no
+        too_big = fmt == "xlsx" and rows > export.XLSX_MAX_ROWS
+        column.download_button(
+            label, lambda: export.to_bytes(write, *args, fmt=fmt, **kwargs),
+            file_name=f"{name}.{fmt}", mime=mime, on_click="ignore", disabled=too_big,
+            key=f"{prefix}_export_{name}",
+            help=f"Excel admite hasta {export.XLSX_MAX_ROWS:,} filas." if too_big else None,
+        )
+
+    d1, d2, d3 = st.columns(3)
+    if source is not None:
+        button(d1, "⬇️ Rol Xij", source.shape[0], "Xij_SoloTabla", export.write_roster, source)
+    button(d2, "⬇️ Horas por enfermera", result.nurses + 1, "horas",
+           export.write_table, export.hours_table(result), sheet="Horas")
+    button(d3, "⬇️ Violaciones", result.violations.shape[0] + 1, "violaciones",
+           export.write_table, export.violations_table(result), sheet="Violaciones")
+
+
+def value_range(column, label, max_value, default, step, key):
+    """Rango (deslizador) y paso de un parámetro del barrido, como arreglo de valores."""
+    low, high = column.slider(label, 0, max_value, default, key=f"{key}_range")
+    step = column.number_input(f"Paso de {label}", min_value=1, value=step, key=f"{key}_step")
+    return np.arange(low, high + 1, step)
+
+
 # =======================
 # LOGO EN LA BARRA LATERAL
 # =======================
-st.sidebar.image("logo.png", width=180)
+st.sidebar.image(static_image("logo.png"), width=180)
 st.sidebar.title("📌 Navegación")
 menu = st.sidebar.radio(
     "Selecciona una sección:",
     ["🏠 Dashboard",
      "📘 Explicación del documento y notación",
      "📊 Cargar modelo y dashboard",
-     "🧮 Calculadora interactiva"]
+     "🛠️ Optimizar modelo",
+     "🧮 Calculadora interactiva",
+     "🔀 Comparar versiones"]
 )
+
+# =======================
+# INSTRUMENTACIÓN POR ETAPA
+# =======================
+# Cada etapa se marca con timer.start(...); el panel "⏱️ Rendimiento" al final
+# de la barra lateral muestra tiempo, memoria y uso de la caché de esta ejecución.
+# tracemalloc es de todo el proceso: se apaga solo cuando ninguna sesión lo pide.
+memory_tracing().request(st.session_state.setdefault("trace_session", MemoryTracing.session()),
+                         st.session_state.get("trace_memory", False))
+profiler = None
+if st.session_state.pop("profile_next", False):
+    from turnos.profiling import start_profile
+
+    profiler = start_profile()
+timer = StageTimer(page=menu, cache=cache)
+
 if menu == "🏠 Dashboard":
 
     st.title("🩺 Sistema de Programación de Turnos de Enfermería")
@@ -116,7 +260,7 @@ if menu == "🏠 Dashboard":
 
         Así, la programación lineal ayuda a tomar decisiones óptimas dentro de un hospital. 
         """)
-        st.image("PROGRAMACION LINEAL.jpg", use_container_width=True)
+        st.image(static_image("PROGRAMACION LINEAL.jpg"), use_container_width=True)
 
     with st.expander("🧩 Elementos principales de la Programación Lineal"):
         st.write("""
@@ -133,7 +277,7 @@ if menu == "🏠 Dashboard":
         - **Programación Mixta:** combina reales con enteras.
         - **Programación por Metas:** maneja múltiples objetivos. 
         """)
-        st.image("ELEMENTOS PRINICPALES DE PROGRAMCION LINEAL.png", use_container_width=True)
+        st.image(static_image("ELEMENTOS PRINICPALES DE PROGRAMCION LINEAL.png"), use_container_width=True)
         st.write("""
         Un modelo de programación lineal está compuesto por:
 
@@ -159,11 +303,11 @@ if menu == "🏠 Dashboard":
         2. Definir restricciones  
         3. Construir función objetivo  
         """)
-        st.image("ETAPAS DE PROGRMACION LINEAL.png", use_container_width=True)
+        st.image(static_image("ETAPAS DE PROGRMACION LINEAL.png"), use_container_width=True)
 
     with st.expander("🌟 Beneficios de la Programación Lineal"):
         st.write("Permite optimizar recursos, reducir costos y mejorar decisiones.")
-        st.image("BENEFICIOS.jpg", use_container_width=True)
+        st.image(static_image("BENEFICIOS.jpg"), use_container_width=True)
 
 # =======================
 # 1. DASHBOARD
@@ -209,6 +353,7 @@ if menu == "🏠 Dashboard":
 # 2. EXPLICACIÓN DEL MODELO (VERSIÓN SENCILLA Y CLARA)
 # =======================
 if menu == "📘 Explicación del documento y notación":
+    import pandas as pd
 
     st.title("📘 Explicación del documento y notación (clara y numerada)")
 
@@ -369,6 +514,17 @@ if menu == "📘 Explicación del documento y notación":
 # 3. CARGAR MODELO Y DASHBOARD — VERSIÓN MEJORADA
 # =======================
 if menu == "📊 Cargar modelo y dashboard":
+    import pandas as pd
+
+    from turnos import RULES, charts
+    from turnos.horizon import Horizon
+    from turnos.incremental import EditableRoster
+    from turnos.loaders import FORMATS, load_roster
+    from turnos.packed import PackedRoster
+    from turnos.precheck import precheck
+    from turnos.repair import repair
+    from turnos.sparse import is_sparse_file, load_sparse
+    from turnos.streaming import validate_stream
 
     st.title("📊 Análisis de factibilidad del modelo de turnos de enfermería")
 
@@ -380,83 +536,351 @@ if menu == "📊 Cargar modelo y dashboard":
     - **Columnas = turnos (j)**  
     - Cada celda vale **1 si la enfermera trabaja ese turno**, o **0 si no trabaja**  
 
+    También se aceptan los formatos **Parquet**, **CSV** y **NumPy (.npy)**, que se leen
+    mucho más rápido que Excel en matrices grandes, y roles **dispersos**: una lista de
+    asignaciones (CSV o Parquet con columnas `enfermera,turno`) o una matriz CSR (`.npz`),
+    que solo guardan los turnos trabajados.
     """)
     
-    uploaded_file = st.file_uploader("📤 Sube el archivo Xij_SoloTabla.xlsx", type=["xlsx"])
+    uploaded_file = st.file_uploader("📤 Sube el archivo Xij_SoloTabla.xlsx (o .parquet, .csv, .npy, .npz)",
+                                     type=list(FORMATS))
 
     if uploaded_file:
 
+        timer.start("Lectura del archivo")
         # ========================
         # 1. Cargar matriz
         # ========================
-        X = pd.read_excel(uploaded_file, header=None)
-        st.write("### 📋 Matriz cargada (Xij):")
-        st.dataframe(X)
+        # La lectura y los agregados se guardan por hash del contenido: las
+        # siguientes ejecuciones con el mismo archivo los toman de la caché.
+        data = uploaded_file.getvalue()
+        key = content_hash(data)
+
+        col_a, col_b = st.columns(2)
+        slots = col_a.selectbox("Turnos por día", [2, 3, 4], index=1,
+                                help="El número de semanas se deduce de las columnas del archivo.")
+        stream_mode = col_b.checkbox(
+            "🧱 Validación por bloques (roles muy grandes)",
+            help="Lee el archivo por bloques de filas sin cargar la matriz completa en memoria.",
+        )
+        week_len = 7 * slots
+
+        try:
+            if stream_mode:
+                bar = st.progress(0.0, text="Validando por bloques…")
+
+                def report(rows, total):
+                    done = rows / total if total else 0.0
+                    bar.progress(min(done, 1.0), text=f"Validando por bloques… {rows:,} enfermeras procesadas")
+
+                summary = cache.get_or_compute(
+                    ("stream", key, slots),
+                    lambda: validate_stream(io.BytesIO(data), uploaded_file.name,
+                                            week_len=week_len, progress=report),
+                )
+                bar.empty()
+                check_roster = summary.validate
+
+                nurses, shifts = summary.shape
+                st.info(f"📦 Archivo validado por bloques: **{nurses:,} enfermeras × {shifts} turnos**. "
+                        "La matriz completa no se muestra en este modo.")
+            elif is_sparse_file(io.BytesIO(data), uploaded_file.name):
+                # Lista de asignaciones: se valida sin crear la matriz densa.
+                roster = cache.get_or_compute(
+                    ("sparse", key, slots),
+                    lambda: load_sparse(io.BytesIO(data), uploaded_file.name, week_len=week_len),
+                )
+                check_roster = roster.validate
+
+                nurses, shifts = roster.shape
+                st.caption(f"🧮 Rol disperso: {roster.nnz:,} asignaciones "
+                           f"({roster.nbytes / 2**20:,.1f} MB en memoria)")
+            else:
+                # La matriz se guarda empaquetada en bits (un uint32 por enfermera y semana).
+                roster = cache.get_or_compute(
+                    ("roster", key, slots),
+                    lambda: PackedRoster.from_matrix(load_roster(io.BytesIO(data), uploaded_file.name),
+                                                     week_len=week_len),
+                )
+                check_roster = roster.validate
+
+                nurses, shifts = roster.shape   # número de enfermeras y de turnos
 
-        nurses = X.shape[0]     # número de enfermeras
-        shifts = X.shape[1]     # número de turnos
-        WH = 40                  # máximo permitido por enfermera
-        hours = X.sum(axis=1) * 8   # horas por enfermera
+            horizon = Horizon.from_shifts(shifts, slots)
+        except ValueError as exc:
+            st.error(f"❌ No se pudo leer el archivo: {exc}")
+            st.stop()
 
+        st.caption(f"🗓️ Horizonte: {horizon.weeks} semana(s) × 7 días × {slots} turnos = {shifts} turnos")
+
+        timer.start("Validación (R1–R5)")
+        # ========================
+        # 2. Evaluar factibilidad (R1–R5)
+        # ========================
+        st.subheader("⚙️ Parámetros de validación")
+        col1, col2, col3 = st.columns(3)
+        WH = col1.number_input("WH (horas máximas por enfermera)", min_value=0, value=40)
+        nj_min = col2.number_input("Nj(min) — mínimo por turno", min_value=0, value=0)
+        nj_max = col3.number_input("Nj(max) — máximo por turno", min_value=0, value=nurses)
+
+        result = cache.get_or_compute(
+            ("validation", key, slots, WH, nj_min, nj_max),
+            lambda: check_roster(WH=WH, nj_min=nj_min, nj_max=nj_max),
+        )
+
+        timer.start("Editor de celdas")
         # ========================
-        # 2. Evaluar factibilidad
+        # Edición de celdas con revalidación incremental
         # ========================
-        feasible_hours = (hours <= WH).all()
+        # El editor es propio de cada sesión: mantiene horas, cobertura, totales
+        # por día y violaciones, y cada cambio de celda los actualiza en O(ventana).
+        # Como necesita la matriz densa, se crea solo la primera vez que se edita,
+        # se repara o se reprograma; mientras tanto se trabaja con el rol empaquetado.
+        editor_key = (key, slots)
+        if st.session_state.get("editor_key") != editor_key:
+            st.session_state.pop("editor", None)
+        editor = st.session_state.get("editor")
+        if editor is not None:
+            editor.set_limits(WH=WH, nj_min=nj_min, nj_max=nj_max)
+        edits = editor.edits if editor is not None else 0
+
+        def open_editor(X=None):
+            """Editor de la sesión; si no existe, lo crea a partir de ``X`` (por omisión, del rol)."""
+            if st.session_state.get("editor") is None:
+                st.session_state.editor_key = editor_key
+                st.session_state.editor = EditableRoster(
+                    roster.to_matrix() if X is None else X, week_len=week_len, slots=slots,
+                    WH=WH, nj_min=nj_min, nj_max=nj_max,
+                )
+            return st.session_state.editor
+
+        if not stream_mode:
+            with st.expander("✏️ Editar celdas de Xij (revalidación inmediata)"):
+                e1, e2, e3 = st.columns(3)
+                cell_i = e1.number_input("Enfermera (i)", min_value=1, max_value=nurses, value=1)
+                cell_j = e2.number_input("Turno (j)", min_value=1, max_value=shifts, value=1)
+                current = (editor.cells[cell_i - 1, cell_j - 1] if editor is not None
+                           else roster.to_matrix(cell_i - 1, cell_i)[0, cell_j - 1])
+                e3.write(f"Valor actual: **{current}**")
+                if e3.button("Alternar 0 ↔ 1"):
+                    open_editor().toggle(cell_i - 1, cell_j - 1)
+                    st.rerun()
+
+                if edits:
+                    st.caption(f"📝 {edits} cambio(s) aplicados · violaciones por regla: {editor.counts()}")
+                    if st.button("Descartar cambios"):
+                        del st.session_state["editor_key"]
+                        del st.session_state["editor"]
+                        st.rerun()
+
+            if edits:
+                result = editor.result()
+
+        timer.start("Visor de la matriz")
+        st.write("### 📋 Matriz cargada (Xij):")
+        show_summary(result)
+        if not stream_mode:
+            show_matrix(editor.cells if edits else roster, result, "dashboard")
 
-        st.subheader("📌 Resultado global del modelo")
+        # horas por enfermera (en la semana más cargada si el horizonte tiene varias)
+        hours = result.week_hours.max(axis=1)
 
-        if feasible_hours:
-            st.success("✔️ El modelo es **FACTIBLE**: todas las enfermeras cumplen el máximo permitido de 40 horas.")
-        else:
-            st.error("❌ El modelo **NO es factible**: una o más enfermeras exceden las 40 horas permitidas.")
+        timer.start("Resultado y violaciones")
+        st.subheader("📌 Resultado global del modelo")
 
-            st.warning(f"👉 Número de enfermeras que exceden el límite: {(hours > WH).sum()}")
+        repaired = st.session_state.get("repair_report")
+        if not stream_mode and edits and repaired and repaired[0] == editor_key:
+            report = repaired[1]
+            st.info(f"🔧 Reparación automática: {len(report.changes):,} celda(s) cambiada(s) en "
+                    f"{report.iterations:,} iteraciones ({report.elapsed:.2f} s). "
+                    f"Violaciones antes: {report.before} · después: {report.after}")
 
+        if result.feasible:
+            st.success("✔️ El modelo es **FACTIBLE**: se cumplen las restricciones R1 a R5.")
+        else:
+            st.error("❌ El modelo **NO es factible**: se violan una o más restricciones.")
+
+            counts = result.counts()
+            st.table(pd.DataFrame({
+                "Restricción": list(RULES.values()),
+                "Violaciones": list(counts.values()),
+            }))
+
+            if counts[1]:
+                st.warning(f"👉 Número de enfermeras que exceden el límite: {counts[1]}")
+
+            st.write("#### 🔎 Detalle de violaciones (primeras 500)")
+            shown = result.violations[:500]
+            # índices 1-based como en el modelo; vacío → la regla no depende de ese eje
+            detail = pd.DataFrame(shown[:, :2] + 1, columns=["Enfermera", "Turno"]).replace(0, pd.NA)
+            detail["Regla"] = pd.Series(shown[:, 2]).map(RULES)
+            st.dataframe(detail)
+
+            # Búsqueda local sobre el editor: los cambios se pueden revisar o descartar
+            if not stream_mode:
+                st.write("#### 🔧 Reparación automática")
+                st.caption("Busca el rol factible más cercano cambiando la menor cantidad de celdas; "
+                           "los cambios quedan en el editor y se pueden descartar.")
+                rep1, rep2 = st.columns(2)
+                repair_limit = rep1.number_input("Límite de tiempo de la reparación (s)",
+                                                 min_value=1.0, value=10.0)
+                if rep2.button("Reparar rol"):
+                    st.session_state.repair_report = (editor_key, repair(open_editor(), time_limit=repair_limit))
+                    st.rerun()
+
+        timer.start("Reprogramación")
+        # ========================
+        # Reprogramación por ausencias a mitad del horizonte
+        # ========================
+        # Parte del rol vigente (el del editor, si hay cambios) y deja los nuevos cambios
+        # en el editor, como la reparación automática.
+        if not stream_mode:
+            rescheduled = st.session_state.get("reschedule_report")
+            rescheduled = rescheduled[1] if rescheduled and rescheduled[0] == editor_key else None
+            with st.expander("🚑 Reprogramar por ausencias", expanded=rescheduled is not None):
+                st.caption("Indica quién no puede trabajar y desde qué turno el rol ya se cumplió. "
+                           "Se busca el rol factible que cambia menos celdas, reoptimizando solo "
+                           "los turnos cercanos a las ausencias.")
+                a1, a2 = st.columns(2)
+                frozen = a1.number_input("Turnos ya trabajados (no se modifican)", min_value=0,
+                                         max_value=shifts, value=0)
+                reschedule_limit = a2.number_input("Límite de tiempo (s)", min_value=1.0, value=30.0,
+                                                   key="reschedule_limit")
+                absences = st.data_editor(
+                    pd.DataFrame({"Enfermera": pd.Series([1], dtype="Int64"),
+                                  "Desde turno": pd.Series([frozen + 1], dtype="Int64"),
+                                  "Hasta turno": pd.Series([min(frozen + slots, shifts)], dtype="Int64")}),
+                    num_rows="dynamic", key="reschedule_absences",
+                )
+                if st.button("Reprogramar"):
+                    from turnos.reschedule import reschedule    # importa SciPy solo al usarse
+
+                    # índices 1-based en la tabla; se ignoran las filas incompletas
+                    rows = absences.dropna().to_numpy(dtype=np.int64)
+                    pairs = [(i - 1, j - 1) for i, first, last in rows for j in range(first, last + 1)]
+                    # sin ediciones, el rol se densifica aquí una sola vez y esa matriz crea el editor
+                    X = editor.cells if editor is not None else roster.to_matrix()
+                    try:
+                        report = reschedule(X, pairs, frozen=frozen, WH=WH,
+                                            nj_min=nj_min, nj_max=nj_max, week_len=week_len,
+                                            time_limit=reschedule_limit)
+                    except ValueError as exc:
+                        st.error(f"❌ {exc}")
+                    else:
+                        editor = open_editor(X)
+                        for i, j, value in report.changes.tolist():
+                            editor.set(i, j, value)
+                        st.session_state.reschedule_report = (editor_key, report)
+                        st.rerun()
+
+                if rescheduled is not None:
+                    if not rescheduled.success:
+                        st.error(f"❌ No se pudo reprogramar: {rescheduled.message}.")
+                    else:
+                        how = ("cubriendo los turnos con enfermeras libres (mínimo demostrado por la cota)"
+                               if rescheduled.origin == "voraz" else
+                               f"con el solucionador en los turnos {rescheduled.start + 1}–{rescheduled.stop}")
+                        st.info(f"🚑 {len(rescheduled.changes):,} celda(s) cambiada(s) {how}, en "
+                                f"{rescheduled.build_time + rescheduled.solve_time:.2f} s · "
+                                f"cota inferior: {rescheduled.lower_bound:,} · {rescheduled.message}.")
+                        if not rescheduled.check.feasible:
+                            st.warning("⚠️ Quedan violaciones que dependen de turnos congelados o "
+                                       f"ajenos a las ausencias: {rescheduled.check.counts()}")
+                        changes = rescheduled.changes[:500]
+                        st.dataframe(pd.DataFrame({"Enfermera": changes[:, 0] + 1,
+                                                   "Turno": changes[:, 1] + 1,
+                                                   "Nuevo valor": changes[:, 2]}), hide_index=True)
+
+        timer.start("Exportación")
+        with st.expander("💾 Exportar rol, horas y violaciones"):
+            if stream_mode:
+                st.caption("En la validación por bloques el rol no se guarda en memoria: "
+                           "se exportan solo las horas y las violaciones.")
+            show_downloads(None if stream_mode else editor.cells if edits else roster,
+                           result, "dashboard")
+
+        timer.start("Prechequeo y cota")
+        # ========================
+        # Prechequeo de la instancia y brecha contra la relajación lineal
+        # ========================
+        # La cota depende solo de los parámetros (TN = enfermeras del archivo, WH, Nj),
+        # no de las celdas, así que editar el rol no obliga a recalcularla.
+        st.subheader("📐 Prechequeo y cota inferior del tiempo ocioso")
+        bound = cache.get_or_compute(
+            ("relaxation", nurses, WH, nj_min, nj_max, horizon),
+            lambda: precheck(nurses, shifts, WH, nj_min=nj_min, nj_max=nj_max, week_len=week_len),
+        )
+        if bound.infeasible:
+            st.error(f"🚫 Con {nurses:,} enfermeras y estos límites **ningún rol puede ser factible**:\n\n"
+                     + "\n".join(f"- {reason}" for reason in bound.reasons))
+        else:
+            idle = bound.idle(result.coverage.sum())
+            b1, b2, b3 = st.columns(3)
+            b1.metric("Tiempo ocioso del rol (h)", f"{idle:,.0f}")
+            b2.metric("Cota inferior (relajación lineal)", f"{bound.bound:,.0f}")
+            b3.metric("Brecha contra la cota", f"{bound.gap(idle):.2%}")
+            st.caption(f"Calculado en {bound.seconds * 1000:,.0f} ms. Ningún rol factible con estos "
+                       "parámetros tiene menos tiempo ocioso que la cota"
+                       + ("." if result.feasible else "; este rol no es factible, así que la brecha "
+                          "es solo orientativa."))
+
+        timer.start("Gráfica 1")
         # ========================
         # 3. GRÁFICA 1 — Horas por enfermera
         # ========================
         st.subheader("📈 Gráfica 1: Horas trabajadas por cada enfermera")
 
-        fig, ax = plt.subplots()
-        ax.bar(np.arange(nurses) + 1, hours)
-        ax.axhline(40, linestyle="--", color="red", label="Máximo permitido (40 h)")
-        ax.set_xlabel("Enfermera")
-        ax.set_ylabel("Horas trabajadas")
-        ax.set_title("Horas asignadas por enfermera")
-        ax.legend()
+        ylabel = "Horas trabajadas" if horizon.weeks == 1 else "Horas en la semana más cargada"
+        aggregated = nurses > charts.MAX_BARS
+        show_chart("hours", [hours], (WH, ylabel),
+                   lambda: charts.hours_figure(hours, WH, ylabel))
 
-        st.pyplot(fig)
+        if aggregated:
+            st.caption(f"ℹ️ Con más de {charts.MAX_BARS:,} enfermeras se muestra la distribución "
+                       "de horas en lugar de una barra por enfermera.")
+            if not result.feasible:
+                st.write("#### 🚨 Enfermeras con más violaciones")
+                show_chart("top", [result.violations], charts.TOP_K,
+                           lambda: charts.top_violators_figure(result.violations))
 
         st.write("""
         ### 📝 Interpretación de la gráfica:
-        - Cada barra representa las **horas totales asignadas** a una enfermera.  
+        - Cada barra representa las **horas totales asignadas** a una enfermera  
+          (con muchas enfermeras, cuántas enfermeras tienen cada total de horas).  
         - La línea roja marca el **límite máximo permitido de 40 horas**.  
         - Si alguna barra **sobrepasa la línea roja**, entonces el modelo **no es factible**  
           porque **viola la restricción R1 (límite de horas)**.
         """)
 
+        timer.start("Gráfica 2")
         # ========================
-        # 4. GRÁFICA 2 — Carga por día (7 días)
+        # 4. GRÁFICA 2 — Carga por día
         # ========================
-        st.subheader("📆 Gráfica 2: Carga semanal agrupada por día")
+        st.subheader("📆 Gráfica 2: Carga agrupada por día")
 
-        totals = []
-        for d in range(7):
-            start = d * 3
-            end = start + 3
-            totals.append(X.iloc[:, start:end].sum().sum())
+        # Totales por día, por turno del día y por semana desde el cubo (días × turnos)
+        if stream_mode or not edits:
+            agg = cache.get_or_compute(
+                ("days", key, slots, stream_mode),
+                lambda: horizon.aggregates(result.coverage),
+            )
+        else:
+            agg = horizon.aggregates(result.coverage)
+        show_chart("days", [agg.table], slots, lambda: charts.day_figure(agg, slots))
 
-        fig2, ax2 = plt.subplots()
-        ax2.plot(range(1, 8), totals, marker="o")
-        ax2.set_xlabel("Día de la semana")
-        ax2.set_ylabel("Total de asignaciones (turnos trabajados)")
-        ax2.set_title("Carga total de trabajo por día")
+        if aggregated:
+            show_chart("heatmap", [agg.table], slots, lambda: charts.heatmap_figure(agg.table))
 
-        st.pyplot(fig2)
+        if horizon.weeks > 1:
+            st.table(pd.DataFrame({
+                "Semana": np.arange(1, horizon.weeks + 1),
+                "Asignaciones": agg.week_totals,
+            }))
 
         st.write("""
         ### 📝 Interpretación de la gráfica:
-        - Cada punto representa el total de enfermeras que trabajaron en los tres turnos del día.  
+        - Cada punto representa el total de enfermeras que trabajaron en los turnos del día;  
+          las líneas punteadas separan cada turno del día.  
         - Permite ver **cuáles días están más cargados** y detectar posibles **desbalanceos**.  
         - Si un día tiene una carga muy baja o muy alta, puede indicar que se violan:  
           - **R3** → mínimo por turno  
@@ -464,24 +888,18 @@ if menu == "📊 Cargar modelo y dashboard":
         """)
 
 
+        timer.start("Gráfica 3")
         # ========================
-        # 6. NUEVA GRÁFICA  — Turnos por turno (21 turnos)
+        # 6. NUEVA GRÁFICA  — Turnos por turno
         # ========================
-        st.subheader("📊 Gráfica 3: Enfermeras asignadas por turno individual (21 turnos)")
-
-        nurses_per_shift = X.sum(axis=0)
+        st.subheader(f"📊 Gráfica 3: Enfermeras asignadas por turno individual ({shifts} turnos)")
 
-        fig4, ax4 = plt.subplots(figsize=(10, 4))
-        ax4.bar(np.arange(1, shifts + 1), nurses_per_shift)
-        ax4.set_xlabel("Turno (j)")
-        ax4.set_ylabel("Enfermeras asignadas")
-        ax4.set_title("Número de enfermeras por turno")
+        show_chart("shifts", [result.coverage], None,
+                   lambda: charts.shift_figure(result.coverage))
 
-        st.pyplot(fig4)
-
-        st.write("""
+        st.write(f"""
         ### 📝 Interpretación:
-        - Se observa cómo están cubiertos los **21 turnos de la semana**.  
+        - Se observa cómo están cubiertos los **{shifts} turnos del horizonte**.  
         - Turnos con muy pocas o muchas asignaciones pueden violar:  
             - **R3 (mínimo por turno)**  
             - **R4 (máximo por turno)**  
@@ -489,9 +907,206 @@ if menu == "📊 Cargar modelo y dashboard":
         """)
 
 # =======================
-# 4. CALCULADORA INTERACTIVA
+# 4. OPTIMIZAR MODELO
+# =======================
+if menu == "🛠️ Optimizar modelo":
+    import pandas as pd
+
+    from turnos import RULES, validate
+    from turnos.horizon import Horizon
+    from turnos.precheck import precheck, structural_reasons
+    from turnos.solutions import cached_solve
+
+    st.title("🛠️ Optimización del modelo de turnos")
+
+    st.write("""
+    En esta sección el sistema **resuelve el modelo** directamente, sin necesidad de MATLAB:
+
+    - Minimiza el tiempo ocioso **WH·TN − 8·ΣXij**.  
+    - Respeta R1 (horas), R2 (descanso), R3/R4 (mínimo y máximo por turno) y R5 (binaria).  
+    - Usa el solucionador **HiGHS** (`scipy.optimize.milp`).  
+    """)
+
+    # -------------------------
+    # Parámetros del modelo
+    # -------------------------
+    col1, col2, col3, col4 = st.columns(4)
+    TN = col1.number_input("TN — total de enfermeras", min_value=1, value=100)
+    WH = col2.number_input("WH — horas máximas", min_value=0, value=40)
+    nj_min = col3.number_input("Nj(min) — mínimo por turno", min_value=0, value=10)
+    nj_max = col4.number_input("Nj(max) — máximo por turno", min_value=0, value=30)
+
+    col8, col9 = st.columns(2)
+    weeks = col8.number_input("Semanas del horizonte", min_value=1, max_value=6, value=1)
+    slots = col9.selectbox("Turnos por día", [2, 3, 4], index=1)
+    horizon = Horizon(weeks=weeks, slots=slots)
+
+    col5, col6, col7 = st.columns(3)
+    time_limit = col5.number_input("Límite de tiempo (s)", min_value=1.0, value=60.0)
+    mip_gap = col6.number_input("Brecha MIP relativa", min_value=0.0, max_value=1.0,
+                                value=0.0001, format="%.4f")
+    formulation = col7.selectbox(
+        "Formulación",
+        ["auto", "patterns", "nurses"],
+        help="patterns: agrega enfermeras por patrón semanal · nurses: una variable por Xij",
+    )
+
+    # Descomposición: cada (sala, semana) es un subproblema independiente que se
+    # resuelve en un proceso aparte; luego se cosen las semanas y se valida.
+    decomposed = st.checkbox(
+        "🧩 Resolver por salas y semanas en paralelo",
+        help="Nj(min) y Nj(max) se aplican a cada sala; el límite de tiempo es por subproblema.",
+    )
+    wards = [TN]
+    if decomposed:
+        text = st.text_input("Plantilla de cada sala (separada por comas)", str(TN))
+        try:
+            wards = [int(value) for value in text.split(",") if value.strip()]
+        except ValueError:
+            st.error("❌ Escriba la plantilla de cada sala como números enteros separados por comas.")
+            st.stop()
+        if not wards or min(wards) < 1:
+            st.error("❌ Cada sala debe tener al menos una enfermera.")
+            st.stop()
+        st.caption(f"{len(wards)} sala(s) × {weeks} semana(s) = {len(wards) * weeks} subproblemas · "
+                   f"{sum(wards):,} enfermeras en total")
+
+    params = (TN, WH, nj_min, nj_max, horizon, time_limit, mip_gap, formulation,
+              decomposed, tuple(wards))
+
+    timer.start("Prechequeo")
+    # Pruebas de capacidad y de ventanas en O(turnos): si alguna falla, ninguna
+    # asignación cumple las restricciones y no hace falta llamar al solucionador.
+    reasons = []
+    for size in sorted(set(wards)):
+        found = structural_reasons(size, horizon.shifts, WH, nj_min=nj_min, nj_max=nj_max,
+                                   week_len=horizon.week_len)
+        prefix = f"Sala de {size} enfermeras — " if len(set(wards)) > 1 else ""
+        reasons += [prefix + reason for reason in found]
+    if reasons:
+        st.error("🚫 **El modelo es infactible** (se demuestra sin resolverlo):\n\n"
+                 + "\n".join(f"- {reason}" for reason in reasons))
+
+    timer.start("Solución del modelo")
+    if st.button("Resolver modelo"):
+        # SciPy (HiGHS) solo se importa al resolver, no en cada arranque de la app
+        from turnos.decompose import solve_decomposed
+
+        try:
+            if decomposed:
+                opt = solve_decomposed(wards, weeks=horizon.weeks, WH=WH, nj_min=nj_min,
+                                       nj_max=nj_max, time_limit=time_limit, mip_gap=mip_gap,
+                                       formulation=formulation, week_len=horizon.week_len)
+                origin = "solucionador"
+            else:
+                # la misma instancia (u otra vecina con límites más holgados) sale del disco
+                opt, origin = cached_solve(solution_cache(), TN, shifts=horizon.shifts, WH=WH,
+                                           nj_min=nj_min, nj_max=nj_max, time_limit=time_limit,
+                                           mip_gap=mip_gap, formulation=formulation,
+                                           week_len=horizon.week_len)
+        except ValueError as exc:
+            st.error(f"❌ {exc}")
+            st.stop()
+        st.session_state.optimization = (params, opt, origin)
+
+    # La solución se conserva en la sesión para poder paginar y filtrar la matriz
+    # sin volver a resolver; se descarta al cambiar los parámetros.
+    saved = st.session_state.get("optimization")
+    if saved is not None and saved[0] == params:
+        opt, origin = saved[1], saved[2]
+
+        timer.start("Resultado del solucionador")
+        st.subheader("📌 Resultado del solucionador")
+
+        if decomposed:
+            st.write("#### 🧩 Subproblemas")
+            st.dataframe(pd.DataFrame({
+                "Sala": [part.ward + 1 for part, _ in opt.parts],
+                "Semana": [part.week + 1 for part, _ in opt.parts],
+                "Enfermeras": [part.TN for part, _ in opt.parts],
+                "Estado": [result.message for _, result in opt.parts],
+                "Brecha MIP": [result.mip_gap for _, result in opt.parts],
+                "Solución (s)": [result.solve_time for _, result in opt.parts],
+            }))
+
+        if not opt.success:
+            st.error(f"❌ {opt.message}: no se encontró una asignación que cumpla las restricciones.")
+        else:
+            if opt.status == 0:
+                st.success(f"✔️ {opt.message}.")
+            else:
+                st.warning(f"⚠️ {opt.message}: se muestra la mejor solución encontrada.")
+
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("Tiempo ocioso (h)", f"{opt.objective:,.0f}")
+            m2.metric("Brecha MIP", f"{opt.mip_gap:.2%}")
+            m3.metric("Construcción (s)", f"{opt.build_time:.3f}")
+            m4.metric("Solución (s)", f"{opt.solve_time:.3f}")
+            if not decomposed:
+                bound = cache.get_or_compute(
+                    ("relaxation", TN, WH, nj_min, nj_max, horizon),
+                    lambda: precheck(TN, horizon.shifts, WH, nj_min=nj_min, nj_max=nj_max,
+                                     week_len=horizon.week_len),
+                )
+                if not bound.infeasible:
+                    st.caption(f"📐 Cota inferior de la relajación lineal: **{bound.bound:,.0f} h** "
+                               f"de tiempo ocioso · la solución está a "
+                               f"{bound.gap(opt.objective):.2%} de la cota.")
+            if origin == "caché":
+                st.caption("💾 Instancia ya resuelta: la solución se leyó de la caché en disco.")
+            elif origin == "vecina":
+                st.caption("💾 Se reutilizó el óptimo de una instancia con límites Nj más holgados, "
+                           "que también cumple estos límites.")
+
+            if decomposed:
+                # R3/R4 se validan por sala; la matriz completa se revisa con R1, R2 y R5
+                check = validate(opt.X, WH=WH, week_len=horizon.week_len)
+                feasible = opt.feasible
+                counts = {rule: sum(ward.counts()[rule] for ward in opt.checks) for rule in RULES}
+            else:
+                check = validate(opt.X, WH=WH, nj_min=nj_min, nj_max=nj_max,
+                                 week_len=horizon.week_len)
+                feasible, counts = check.feasible, check.counts()
+            if feasible:
+                st.success("✔️ La solución cumple R1 a R5.")
+            else:
+                st.error(f"❌ La solución viola restricciones: {counts}")
+
+            timer.start("Visor de la matriz")
+            st.write("### 📋 Matriz Xij óptima:")
+            show_summary(check)
+            show_matrix(opt.X, check, "optimizer")
+
+            with st.expander("💾 Exportar la solución"):
+                show_downloads(opt.X, check, "optimizer")
+
+            timer.start("Gráfica de cobertura")
+            st.subheader("📊 Enfermeras asignadas por turno")
+            import matplotlib.pyplot as plt
+
+            fig, ax = plt.subplots(figsize=(10, 4))
+            ax.bar(np.arange(1, opt.X.shape[1] + 1), check.coverage)
+            # con varias salas, los límites de la cobertura total son la suma de las salas
+            ax.axhline(nj_min * len(wards), linestyle="--", color="orange", label="Nj(min)")
+            ax.axhline(nj_max * len(wards), linestyle="--", color="red", label="Nj(max)")
+            ax.set_xlabel("Turno (j)")
+            ax.set_ylabel("Enfermeras asignadas")
+            ax.set_title("Cobertura de la solución óptima")
+            ax.legend()
+
+            st.pyplot(fig)
+
+# =======================
+# 5. CALCULADORA INTERACTIVA
 # =======================
 if menu == "🧮 Calculadora interactiva":
+    import pandas as pd
+
+    from turnos import charts
+    from turnos.horizon import Horizon
+    from turnos.loaders import FORMATS, load_roster
+    from turnos.packed import PackedRoster
+    from turnos.scenarios import sweep_roster
 
     st.title("🧮 Calculadora de factibilidad")
 
@@ -517,6 +1132,7 @@ if menu == "🧮 Calculadora interactiva":
     # -------------------------
     # BOTÓN PARA CALCULAR
     # -------------------------
+    timer.start("Cálculo individual")
     if st.button("Calcular factibilidad"):
 
         hours = shifts_worked * 8
@@ -539,6 +1155,7 @@ if menu == "🧮 Calculadora interactiva":
         # Gráfica de comparación
         # ===============================
         st.subheader("📊 Gráfica: Horas asignadas vs límite permitido")
+        import matplotlib.pyplot as plt
 
         fig, ax = plt.subplots(figsize=(5, 3))
 
@@ -607,4 +1224,253 @@ if menu == "🧮 Calculadora interactiva":
             - Permite validar rápidamente si la redistribución es viable.  
             """)
 
+    timer.start("Barrido: lectura del rol")
+    # ======================================================
+    # 🧪 Barrido de escenarios sobre un rol real
+    # ======================================================
+    st.markdown("---")
+    st.subheader("🧪 Barrido de escenarios (¿qué pasaría si…?)")
+
+    st.write("""
+    Evalúa de una sola vez todas las combinaciones de **WH**, **horas por turno**,
+    **Nj(min)**, **Nj(max)** y **plantilla** sobre un rol real.  
+    Una plantilla distinta a la del archivo se interpreta como la **misma mezcla de horarios**
+    a otra escala (la cobertura de cada turno crece o baja en proporción).
+    """)
+
+    sweep_file = st.file_uploader("Rol de referencia (Xij)", type=list(FORMATS), key="sweep_file")
+
+    if sweep_file is not None:
+        data = sweep_file.getvalue()
+        key = content_hash(data)
+        slots = st.selectbox("Turnos por día", [2, 3, 4], index=1, key="sweep_slots")
+
+        try:
+            roster = cache.get_or_compute(
+                ("roster", key, slots),
+                lambda: PackedRoster.from_matrix(load_roster(io.BytesIO(data), sweep_file.name),
+                                                 week_len=7 * slots),
+            )
+            Horizon.from_shifts(roster.shifts, slots)
+        except ValueError as exc:
+            st.error(f"❌ No se pudo leer el archivo: {exc}")
+            st.stop()
+
+        nurses = roster.nurses
+        col1, col2, col3 = st.columns(3)
+        wh_values = value_range(col1, "WH", 80, (32, 48), 4, "sweep_wh")
+        nj_min_values = value_range(col2, "Nj(min)", nurses, (0, nurses // 2),
+                                    max(1, nurses // 20), "sweep_nj_min")
+        nj_max_values = value_range(col3, "Nj(max)", nurses, (nurses // 2, nurses),
+                                    max(1, nurses // 20), "sweep_nj_max")
+        col4, col5 = st.columns(2)
+        hour_values = col4.multiselect("Horas por turno", [4, 6, 8, 10, 12], default=[8],
+                                       key="sweep_hours")
+        headcount_values = value_range(col5, "Plantilla", 3 * nurses, (nurses // 2, 2 * nurses),
+                                       max(1, nurses // 10), "sweep_headcount")
+
+        timer.start("Barrido: escenarios")
+        grid = (tuple(wh_values), tuple(hour_values), tuple(nj_min_values),
+                tuple(nj_max_values), tuple(headcount_values))
+        try:
+            scenarios = cache.get_or_compute(
+                ("sweep", key, slots, grid),
+                lambda: sweep_roster(roster, *grid),
+            )
+        except ValueError as exc:
+            st.error(f"❌ {exc}")
+            st.stop()
+
+        feasible = scenarios.feasible
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Escenarios evaluados", f"{len(scenarios):,}")
+        m2.metric("Escenarios factibles", f"{int(feasible.sum()):,}")
+        m3.metric("Mínimo tiempo ocioso factible (h)",
+                  f"{scenarios.idle[feasible].min():,.0f}" if feasible.any() else "—")
+
+        timer.start("Barrido: tabla")
+        st.write("#### 📋 Factibilidad y tiempo ocioso por escenario (primeras 500 filas)")
+        only_feasible = st.checkbox("Solo escenarios factibles", key="sweep_feasible")
+        shown = np.flatnonzero(feasible) if only_feasible else np.arange(len(scenarios))
+        shown = shown[np.argsort(scenarios.idle[shown], kind="stable")[:500]]
+        st.dataframe(pd.DataFrame({name: values[shown] for name, values in scenarios.columns().items()}))
+
+        timer.start("Barrido: frontera")
+        st.subheader("📈 Frontera: plantilla vs tiempo ocioso")
+        show_chart("frontier", [scenarios.headcount, scenarios.idle, feasible], None,
+                   lambda: charts.frontier_figure(scenarios))
+
+        st.write("""
+        ### 📝 Interpretación:
+        - Cada punto es un escenario; los **azules** cumplen R1 a R5 y los **grises** no.  
+        - La línea roja marca, para cada plantilla, el **menor tiempo ocioso** entre los escenarios factibles.  
+        - Si el rol tiene violaciones de **R2** o **R5**, ningún escenario es factible: esas reglas
+          no dependen de los parámetros y hay que corregir el rol.  
+        """)
+
+# =======================
+# COMPARAR VERSIONES DEL ROL
+# =======================
+if menu == "🔀 Comparar versiones":
+    import pandas as pd
+
+    from turnos import charts
+    from turnos.compare import compare, summarize
+    from turnos.loaders import FORMATS, load_roster
+    from turnos.packed import PackedRoster
+    from turnos.sparse import is_sparse_file, load_sparse
+
+    st.title("🔀 Comparar versiones del rol")
 
+    st.write("""
+    Sube dos o más versiones sucesivas de **Xij_SoloTabla.xlsx** (o de los otros formatos
+    aceptados), en el orden en que se hicieron. Las versiones se alinean por número de
+    enfermera y de turno; si una tiene menos filas o turnos, las celdas que le faltan
+    cuentan como 0.
+    """)
+
+    files = st.file_uploader("📤 Versiones del rol", type=list(FORMATS),
+                             accept_multiple_files=True, key="compare_files")
+    slots = st.selectbox("Turnos por día", [2, 3, 4], index=1, key="compare_slots")
+    week_len = 7 * slots
+
+    if len(files) >= 2:
+        timer.start("Comparación: lectura")
+        # Cada versión usa las mismas entradas de caché que el dashboard (rol y
+        # resumen por hash del archivo): solo se leen las versiones nuevas.
+        keys, versions = [], []
+        for file in files:
+            data = file.getvalue()
+            key = content_hash(data)
+
+            def load():
+                if is_sparse_file(io.BytesIO(data), file.name):
+                    return cache.get_or_compute(
+                        ("sparse", key, slots),
+                        lambda: load_sparse(io.BytesIO(data), file.name, week_len=week_len))
+                return cache.get_or_compute(
+                    ("roster", key, slots),
+                    lambda: PackedRoster.from_matrix(load_roster(io.BytesIO(data), file.name),
+                                                     week_len=week_len))
+
+            try:
+                versions.append(cache.get_or_compute(("version", key, slots),
+                                                     lambda: summarize(load())))
+            except ValueError as exc:
+                st.error(f"❌ No se pudo leer {file.name}: {exc}")
+                st.stop()
+            keys.append(key)
+        names = [f"{k + 1}. {file.name}" for k, file in enumerate(files)]
+
+        timer.start("Comparación: diferencias")
+        comparison = cache.get_or_compute(("comparison", tuple(keys), slots),
+                                          lambda: compare(versions, names))
+        if len(set(comparison.shapes)) > 1:
+            st.warning("⚠️ Las versiones no tienen el mismo tamaño: "
+                       + ", ".join(f"{name} ({n:,} × {m})"
+                                   for name, (n, m) in zip(names, comparison.shapes)))
+        if any(comparison.invalid):
+            st.warning("⚠️ Las celdas no binarias (R5) no participan en la comparación.")
+
+        baseline = st.radio("Comparar cada versión contra", ["La versión anterior", "La primera versión"],
+                            horizontal=True, key="compare_baseline") == "La primera versión"
+        summary = comparison.summary(baseline)
+        st.subheader("📋 Resumen de cambios por versión")
+        st.dataframe(pd.DataFrame({
+            "Antes": summary["before"],
+            "Después": summary["after"],
+            "Turnos agregados": summary["added"],
+            "Turnos quitados": summary["removed"],
+            "Enfermeras con cambios": summary["nurses_changed"],
+            "Δ horas totales": summary["hours_delta"],
+            "Máx. |Δ cobertura| por turno": summary["max_coverage_delta"],
+        }), hide_index=True)
+
+        pairs = comparison.pairs(baseline)
+        pair = st.selectbox("Par de versiones a detallar", range(len(pairs)),
+                            format_func=lambda k: f"{names[pairs[k][0]]} → {names[pairs[k][1]]}",
+                            key="compare_pair")
+        before, after = pairs[pair]
+
+        timer.start("Comparación: detalle")
+        hours = comparison.hours()
+        added, removed = comparison.diff(before, after)
+        changed = np.flatnonzero(added + removed)
+        delta = hours[after, changed] - hours[before, changed]
+        changed = changed[np.argsort(-np.abs(delta), kind="stable")[:500]]
+
+        st.write(f"#### 👩‍⚕️ Δ horas por enfermera ({int((added + removed > 0).sum()):,} con cambios; "
+                 "se muestran las 500 con mayor cambio)")
+        st.dataframe(pd.DataFrame({
+            "Enfermera": changed + 1,
+            "Horas antes": hours[before, changed],
+            "Horas después": hours[after, changed],
+            "Δ horas": hours[after, changed] - hours[before, changed],
+            "Turnos agregados": added[changed],
+            "Turnos quitados": removed[changed],
+        }), hide_index=True)
+
+        st.write("#### 📅 Δ cobertura por turno")
+        coverage_delta = comparison.coverage[after] - comparison.coverage[before]
+        moved = np.flatnonzero(coverage_delta)
+        st.dataframe(pd.DataFrame({
+            "Turno": moved + 1,
+            "Antes": comparison.coverage[before, moved],
+            "Después": comparison.coverage[after, moved],
+            "Δ enfermeras": coverage_delta[moved],
+        }), hide_index=True)
+
+        st.write("#### 🔍 Celdas cambiadas (primeras 500)")
+        cells = comparison.changes(before, after, limit=500)
+        st.dataframe(pd.DataFrame({
+            "Enfermera": cells[:, 0] + 1,
+            "Turno": cells[:, 1] + 1,
+            "Antes": 1 - cells[:, 2],
+            "Después": cells[:, 2],
+        }), hide_index=True)
+
+        timer.start("Comparación: gráfica")
+        st.subheader("📈 Cobertura por turno en cada versión")
+        show_chart("versions", [comparison.coverage], tuple(names),
+                   lambda: charts.versions_figure(comparison.coverage, names))
+    elif files:
+        st.info("Sube al menos dos versiones para compararlas.")
+
+# =======================
+# PANEL DE RENDIMIENTO
+# =======================
+timer.stop()
+if profiler is not None:
+    from turnos.profiling import profile_report
+
+    st.session_state.profile_report = profile_report(profiler)
+
+with st.sidebar.expander("⏱️ Rendimiento de esta ejecución"):
+    if timer.stages:
+        st.dataframe({
+            "Etapa": [stage.name for stage in timer.stages],
+            "Tiempo (ms)": [stage.seconds * 1000 for stage in timer.stages],
+            "Memoria Δ (MB)": [None if stage.memory_delta is None else stage.memory_delta / 2**20
+                               for stage in timer.stages],
+            "Pico (MB)": [None if stage.memory_peak is None else stage.memory_peak / 2**20
+                          for stage in timer.stages],
+            "Aciertos caché": [stage.cache_hits for stage in timer.stages],
+            "Fallos caché": [stage.cache_misses for stage in timer.stages],
+        }, hide_index=True)
+    st.caption(f"Total: {timer.total * 1000:,.0f} ms · caché: {len(cache)} entradas, "
+               f"{cache.current_bytes / 2**20:,.1f} MB")
+
+    st.checkbox("Medir memoria (tracemalloc)", key="trace_memory",
+                help="Tiene un costo propio; se aplica desde la siguiente ejecución.")
+    if st.button("Perfilar la siguiente ejecución (cProfile)"):
+        st.session_state.profile_next = True
+        st.rerun()
+    if "profile_report" in st.session_state:
+        st.code(st.session_state.profile_report, language="text")
+
+    st.download_button("Descargar mediciones (JSON)", timer.to_json(indent=2),
+                       file_name="etapas.json", mime="application/json")
+
+# Para monitoreo: cada ejecución se agrega como una línea JSON a este archivo
+if os.environ.get("TURNOS_STAGE_LOG"):
+    timer.append_jsonl(os.environ["TURNOS_STAGE_LOG"])
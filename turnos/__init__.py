@@ -0,0 +1,49 @@
+"""Lógica del modelo de turnos de enfermería, independiente de la interfaz.
+
+El optimizador depende de SciPy, que tarda en importarse; sus nombres se cargan
+solo cuando se usan, para que validar (``turnos.validate``, la línea de
+comandos) arranque en milisegundos.
+"""
+
+from turnos.horizon import Horizon
+from turnos.packed import PackedRoster
+from turnos.validation import (
+    RULES,
+    SHIFT_HOURS,
+    SHIFTS,
+    REST_WINDOW,
+    WH,
+    ValidationResult,
+    validate,
+)
+
+_LAZY = {
+    "OptimizationResult": "turnos.optimizer",
+    "build_model": "turnos.optimizer",
+    "solve": "turnos.optimizer",
+}
+
+__all__ = [
+    "Horizon",
+    "OptimizationResult",
+    "PackedRoster",
+    "build_model",
+    "solve",
+    "RULES",
+    "SHIFT_HOURS",
+    "REST_WINDOW",
+    "SHIFTS",
+    "WH",
+    "ValidationResult",
+    "validate",
+]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module 'turnos' has no attribute {name!r}")
@@ -0,0 +1,212 @@
+"""Línea de comandos: ``python -m turnos validate``, ``solve`` y ``serve``.
+
+Ejemplos::
+
+    python -m turnos validate roles/ --jobs 8 --output reportes/
+    python -m turnos solve --nurses 100 --nj-min 10 --nj-max 30 --output X.npy
+    python -m turnos serve --port 8000 --workers 4
+    python -m turnos reschedule Xij.xlsx --absent 7:10-15 --frozen 9 --output nuevo.xlsx
+
+``validate`` termina con código 0 si todos los roles son factibles, 1 si
+alguno no lo es y 2 si algún archivo no se pudo leer.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from turnos.validation import REST_WINDOW, SHIFT_HOURS, WH
+
+
+def _limits(parser):
+    parser.add_argument("--slots", type=int, default=3, choices=(2, 3, 4),
+                        help="turnos por día (el número de semanas sale del archivo)")
+    parser.add_argument("--wh", type=float, default=WH, help="horas máximas por semana")
+    parser.add_argument("--shift-hours", type=float, default=SHIFT_HOURS)
+    parser.add_argument("--nj-min", type=float, default=None, help="mínimo por turno")
+    parser.add_argument("--nj-max", type=float, default=None, help="máximo por turno")
+    parser.add_argument("--window", type=int, default=REST_WINDOW,
+                        help="turnos de la ventana de descanso (R2)")
+
+
+def validate_command(args):
+    from turnos.batch import roster_files, validate_files, write_reports
+
+    paths = roster_files(args.paths)
+    start = time.perf_counter()
+    reports = validate_files(
+        paths, jobs=args.jobs, slots=args.slots, WH=args.wh, shift_hours=args.shift_hours,
+        nj_min=args.nj_min, nj_max=args.nj_max, window=args.window,
+    )
+    write_reports(reports, args.output, args.format)
+
+    errors = sum("error" in report for report in reports)
+    infeasible = sum(not report.get("feasible", True) for report in reports)
+    for report in reports:
+        if "error" in report:
+            verdict = f"ERROR: {report['error']}"
+        else:
+            verdict = "factible" if report["feasible"] else f"NO factible {report['violations']}"
+        print(f"{report['file']}: {verdict}")
+    print(f"{len(reports)} archivo(s) en {time.perf_counter() - start:.2f} s · "
+          f"{infeasible} no factible(s) · {errors} error(es) · reportes en {args.output}",
+          file=sys.stderr)
+    return 2 if errors else 1 if infeasible else 0
+
+
+def solve_command(args):
+    import numpy as np
+
+    from turnos.horizon import Horizon
+    from turnos.optimizer import solve
+    from turnos.validation import validate
+
+    horizon = Horizon(weeks=args.weeks, slots=args.slots)
+    options = dict(shifts=horizon.shifts, WH=args.wh, shift_hours=args.shift_hours,
+                   nj_min=args.nj_min, nj_max=args.nj_max, window=args.window,
+                   time_limit=args.time_limit, mip_gap=args.mip_gap,
+                   formulation=args.formulation, week_len=horizon.week_len)
+    if args.cache:
+        from turnos.solutions import SolutionCache, cached_solve
+
+        opt, origin = cached_solve(SolutionCache(args.cache), args.nurses, **options)
+    else:
+        opt, origin = solve(args.nurses, **options), "solucionador"
+    report = {
+        "status": int(opt.status),
+        "message": opt.message,
+        "objective": None if opt.X is None else float(opt.objective),
+        "mip_gap": opt.mip_gap,
+        "build_time": opt.build_time,
+        "solve_time": opt.solve_time,
+        "origin": origin,
+    }
+    if opt.X is not None:
+        check = validate(opt.X, WH=args.wh, shift_hours=args.shift_hours, nj_min=args.nj_min,
+                         nj_max=args.nj_max, window=args.window, week_len=horizon.week_len)
+        report["violations"] = {f"R{rule}": count for rule, count in check.counts().items()}
+        if args.output:
+            from turnos.export import EXPORT_FORMATS, write_roster
+
+            if args.output.rsplit(".", 1)[-1].lower() in EXPORT_FORMATS:
+                write_roster(opt.X, args.output)
+            else:
+                np.save(args.output, opt.X)
+            report["output"] = args.output
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0 if opt.success else 1
+
+
+def serve_command(args):
+    import asyncio
+
+    from turnos.service import serve
+
+    print(f"Validando en http://{args.address}:{args.port}/validate (Ctrl+C para salir)",
+          file=sys.stderr)
+    try:
+        asyncio.run(serve(args.port, args.address, args.workers, args.max_pending,
+                          args.batch_size, args.batch_wait, args.timeout))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _absence(text):
+    """``ENFERMERA:TURNO`` o ``ENFERMERA:DESDE-HASTA`` (1-based) → pares 0-based."""
+    try:
+        nurse, shifts = text.split(":")
+        first, _, last = shifts.partition("-")
+        return [(int(nurse) - 1, j - 1) for j in range(int(first), int(last or first) + 1)]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ausencia inválida: '{text}' (use ENFERMERA:DESDE-HASTA)") from None
+
+
+def reschedule_command(args):
+    from turnos.loaders import load_roster
+    from turnos.reschedule import reschedule
+
+    X = load_roster(args.path)
+    pairs = [pair for absence in args.absent for pair in absence]
+    result = reschedule(X, pairs, frozen=args.frozen, WH=args.wh, shift_hours=args.shift_hours,
+                        nj_min=args.nj_min, nj_max=args.nj_max, window=args.window,
+                        week_len=7 * args.slots, time_limit=args.time_limit)
+    report = {
+        "status": int(result.status),
+        "message": result.message,
+        "origin": result.origin,
+        "changes": int(result.changes.shape[0]),
+        "lower_bound": result.lower_bound,
+        "neighbourhood": [result.start + 1, result.stop],
+        "build_time": result.build_time,
+        "solve_time": result.solve_time,
+    }
+    if result.success:
+        report["violations"] = {f"R{rule}": count for rule, count in result.check.counts().items()}
+        report["changed_cells"] = [[i + 1, j + 1, value] for i, j, value in result.changes.tolist()]
+        if args.output:
+            from turnos.export import write_roster
+
+            write_roster(result.X, args.output)
+            report["output"] = args.output
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0 if result.success else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m turnos",
+                                     description="Validación y solución de roles de enfermería.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    check = commands.add_parser("validate", help="valida archivos o directorios de roles")
+    check.add_argument("paths", nargs="+", help="archivos .xlsx/.parquet/.csv/.npy o directorios")
+    _limits(check)
+    check.add_argument("--jobs", type=int, default=None, help="procesos (por omisión, uno por núcleo)")
+    check.add_argument("--output", default="reportes", help="carpeta de reportes")
+    check.add_argument("--format", nargs="+", choices=("json", "csv"), default=["json", "csv"])
+    check.set_defaults(run=validate_command)
+
+    model = commands.add_parser("solve", help="resuelve el modelo y guarda Xij")
+    model.add_argument("--nurses", type=int, required=True, help="TN, total de enfermeras")
+    model.add_argument("--weeks", type=int, default=1)
+    _limits(model)
+    model.add_argument("--time-limit", type=float, default=60.0)
+    model.add_argument("--mip-gap", type=float, default=1e-4)
+    model.add_argument("--formulation", choices=("auto", "patterns", "nurses"), default="auto")
+    model.add_argument("--output", help="archivo .npy, .xlsx, .parquet o .csv para la matriz Xij")
+    model.add_argument("--cache", help="carpeta de la caché de soluciones (turnos.solutions)")
+    model.set_defaults(run=solve_command)
+
+    service = commands.add_parser("serve", help="servicio HTTP de validación (Tornado)")
+    service.add_argument("--port", type=int, default=8000)
+    service.add_argument("--address", default="127.0.0.1")
+    service.add_argument("--workers", type=int, default=None,
+                         help="procesos de validación (por omisión, uno por núcleo)")
+    service.add_argument("--max-pending", type=int, default=256,
+                         help="solicitudes en cola antes de responder 503")
+    service.add_argument("--batch-size", type=int, default=32)
+    service.add_argument("--batch-wait", type=float, default=0.005,
+                         help="segundos que se espera para completar un lote")
+    service.add_argument("--timeout", type=float, default=60.0,
+                         help="segundos por solicitud, incluida la espera en cola")
+    service.set_defaults(run=serve_command)
+
+    replan = commands.add_parser("reschedule",
+                                 help="reprograma un rol por ausencias con el menor número de cambios")
+    replan.add_argument("path", help="rol vigente (.xlsx/.parquet/.csv/.npy/.npz)")
+    _limits(replan)
+    replan.add_argument("--absent", type=_absence, action="append", required=True,
+                        help="ENFERMERA:TURNO o ENFERMERA:DESDE-HASTA (1-based); se puede repetir")
+    replan.add_argument("--frozen", type=int, default=0,
+                        help="turnos ya trabajados, que no se modifican")
+    replan.add_argument("--time-limit", type=float, default=30.0)
+    replan.add_argument("--output", help="archivo .xlsx, .parquet o .csv para el rol reprogramado")
+    replan.set_defaults(run=reschedule_command)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Validación por lotes de archivos Xij, sin Streamlit ni matplotlib.
+
+Cada archivo se valida por bloques (``validate_stream``), así que la memoria
+no depende del tamaño del rol, y los archivos se reparten entre procesos con
+``ProcessPoolExecutor``. Por archivo se genera un reporte ``dict`` con el
+veredicto, las violaciones por regla, las horas, la cobertura y los totales por
+día; ``write_reports`` los guarda como JSON (uno por archivo), CSV de
+violaciones y un ``summary.csv`` con una fila por archivo.
+"""
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from turnos.horizon import Horizon
+from turnos.loaders import BLOCK_ROWS, FORMATS
+from turnos.streaming import validate_stream
+from turnos.validation import REST_WINDOW, RULES, SHIFT_HOURS, WH
+
+SUMMARY_FIELDS = ("file", "feasible", "nurses", "shifts", "weeks", "R1", "R2", "R3", "R4",
+                  "R5", "max_week_hours", "min_coverage", "max_coverage", "seconds", "error")
+
+
+def roster_files(paths):
+    """Archivos de rol en ``paths`` (archivos o directorios, sin recursión), ordenados."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                full = os.path.join(path, name)
+                if os.path.isfile(full) and os.path.splitext(name)[1].lower().lstrip(".") in FORMATS:
+                    found.append(full)
+        else:
+            found.append(path)
+    return found
+
+
+def validate_file(path, slots=3, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None, nj_max=None,
+                  window=REST_WINDOW, block_rows=BLOCK_ROWS):
+    """Valida un archivo y devuelve su reporte; los errores de lectura quedan en ``error``."""
+    start = time.perf_counter()
+    report = {"file": os.path.abspath(path)}
+    try:
+        summary = validate_stream(path, block_rows=block_rows, window=window,
+                                  week_len=7 * slots)
+        result = summary.validate(WH=WH, shift_hours=shift_hours, nj_min=nj_min,
+                                  nj_max=nj_max)
+        report.update(describe(result, slots))
+    except Exception as exc:     # un archivo dañado no detiene el lote
+        report.update(error=str(exc), seconds=time.perf_counter() - start)
+        return report
+
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def describe(result, slots=3):
+    """Campos del reporte de un ``ValidationResult`` (sin ``file`` ni ``seconds``)."""
+    nurses, shifts = result.nurses, result.shifts
+    horizon = Horizon.from_shifts(shifts, slots)
+    agg = horizon.aggregates(result.coverage)
+    counts = result.counts()
+    return dict(
+        feasible=result.feasible,
+        nurses=nurses,
+        shifts=shifts,
+        weeks=horizon.weeks,
+        slots=slots,
+        violations={f"R{rule}": count for rule, count in counts.items()},
+        rules={f"R{rule}": text for rule, text in RULES.items()},
+        max_week_hours=int(result.week_hours.max()) if nurses else 0,
+        mean_hours=float(result.hours.mean()) if nurses else 0.0,
+        min_coverage=int(result.coverage.min()) if shifts else 0,
+        max_coverage=int(result.coverage.max()) if shifts else 0,
+        coverage=result.coverage.tolist(),
+        day_totals=agg.day_totals.tolist(),
+        week_totals=agg.week_totals.tolist(),
+        details=result.violations,
+    )
+
+
+def _validate_one(args):
+    path, options = args
+    return validate_file(path, **options)
+
+
+def validate_files(paths, jobs=None, **options):
+    """Valida los archivos en paralelo (``jobs`` procesos); conserva el orden de ``paths``."""
+    jobs = min(jobs or os.cpu_count() or 1, max(len(paths), 1))
+    tasks = [(path, options) for path in paths]
+    if jobs == 1:
+        return [_validate_one(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_validate_one, tasks))
+
+
+def write_reports(reports, output, formats=("json", "csv")):
+    """Escribe un JSON y un CSV de violaciones por archivo, y ``summary.csv``."""
+    os.makedirs(output, exist_ok=True)
+    for report in reports:
+        name = os.path.basename(report["file"])      # «rol.npy» → «rol.npy.json»
+        details = report.get("details")
+        if "json" in formats:
+            document = {key: value for key, value in report.items() if key != "details"}
+            with open(os.path.join(output, f"{name}.json"), "w", encoding="utf-8") as f:
+                json.dump(document, f, indent=2, ensure_ascii=False)
+        if "csv" in formats and details is not None:
+            with open(os.path.join(output, f"{name}.csv"), "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["nurse", "shift", "rule"])
+                # índices 1-based como en el modelo; vacío → la regla no depende de ese eje
+                for nurse, shift, rule in np.asarray(details).tolist():
+                    writer.writerow([nurse + 1 if nurse >= 0 else "",
+                                     shift + 1 if shift >= 0 else "", f"R{rule}"])
+
+    with open(os.path.join(output, "summary.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for report in reports:
+            writer.writerow({**report, **report.get("violations", {})})
@@ -0,0 +1,267 @@
+"""Banco de pruebas de rendimiento con roles sintéticos.
+
+Genera roles con ``turnos.synthetic.generate_roster`` para cada combinación de
+tamaño, semanas y tasa de violaciones, y mide por etapa el tiempo de pared y el
+pico de memoria (``tracemalloc``):
+
+- ``ingest``: lectura del archivo con ``load_roster`` (npy, parquet o csv);
+- ``streaming``: validación por bloques con ``validate_stream``;
+- ``aggregation``: empaquetado en bits, horas, cobertura y totales por día;
+- ``validation``: R1 a R5 sobre el rol empaquetado;
+- ``charts``: las tres gráficas del dashboard como PNG;
+- ``optimization``: el modelo con la plantilla del caso (descompuesto por
+  semanas si el horizonte tiene varias).
+
+Los resultados se guardan en JSON junto con la versión del código y del
+entorno, y ``--baseline`` compara contra una corrida anterior::
+
+    python -m turnos.benchmark --nurses 100 10000 1000000 --weeks 1 6 \\
+        --output resultados.json --baseline anteriores.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from turnos import charts
+from turnos.export import write_roster
+from turnos.horizon import Horizon
+from turnos.loaders import load_roster
+from turnos.packed import PackedRoster
+from turnos.streaming import validate_stream
+from turnos.synthetic import generate_roster
+
+STAGES = ("ingest", "streaming", "aggregation", "validation", "charts", "optimization")
+NURSES = (100, 1_000, 10_000, 100_000, 1_000_000)
+WEEKS = (1, 6)
+NURSE_MODEL_LIMIT = 2_000    # plantilla máxima para la formulación por enfermera
+
+
+@dataclass
+class Case:
+    nurses: int
+    weeks: int = 1
+    slots: int = 3
+    violation_rate: float = 0.0
+    seed: int = 0
+
+    @property
+    def name(self):
+        return (f"n={self.nurses} w={self.weeks} s={self.slots} "
+                f"v={self.violation_rate:g} seed={self.seed}")
+
+
+@dataclass
+class Measurement:
+    case: dict
+    stage: str
+    seconds: float
+    peak_bytes: int
+    info: dict = field(default_factory=dict)
+
+
+def measure(stage, case, run):
+    """Ejecuta ``run()`` y devuelve su resultado con el tiempo y el pico de memoria."""
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    value = run()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - base
+    return value, Measurement(case=asdict(case), stage=stage, seconds=seconds,
+                              peak_bytes=max(peak, 0))
+
+
+def _write(X, path):
+    fmt = os.path.splitext(path)[1].lstrip(".")
+    if fmt == "npy":
+        np.save(path, X)
+    else:
+        write_roster(X, path, fmt)
+
+
+def run_case(case, stages=STAGES, fmt="npy", workdir=None, time_limit=30.0):
+    """Mide las etapas pedidas para un caso; devuelve una lista de ``Measurement``."""
+    horizon = Horizon(weeks=case.weeks, slots=case.slots)
+    X = generate_roster(case.nurses, case.weeks, case.slots, case.violation_rate,
+                        seed=case.seed)
+    results = []
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        path = os.path.join(tmp, f"roster.{fmt}")
+        if "ingest" in stages or "streaming" in stages:
+            _write(X, path)
+        if "ingest" in stages:
+            def ingest():
+                # como en el dashboard: un objeto archivo, sin mapear en memoria
+                with open(path, "rb") as f:
+                    return load_roster(f, path)
+
+            loaded, m = measure("ingest", case, ingest)
+            m.info["bytes_on_disk"] = os.path.getsize(path)
+            results.append(m)
+            del loaded
+        if "streaming" in stages:
+            summary, m = measure("streaming", case,
+                                 lambda: validate_stream(path, week_len=horizon.week_len))
+            m.info["violations"] = int(summary.validate().violations.shape[0])
+            results.append(m)
+
+    def aggregate():
+        roster = PackedRoster.from_matrix(X, week_len=horizon.week_len)
+        coverage = roster.coverage()
+        return roster, roster.week_hours(), horizon.aggregates(coverage)
+
+    (roster, week_hours, agg), m = measure("aggregation", case, aggregate)
+    if "aggregation" in stages:
+        results.append(m)
+
+    nj_min, nj_max = int(0.1 * case.nurses), int(0.3 * case.nurses)
+    if "validation" in stages:
+        result, m = measure("validation", case,
+                            lambda: roster.validate(nj_min=nj_min, nj_max=nj_max))
+        m.info["counts"] = result.counts()
+        results.append(m)
+
+    if "charts" in stages:
+        def render():
+            hours = week_hours.max(axis=1)
+            return [
+                charts.to_png(charts.hours_figure(hours, 40)),
+                charts.to_png(charts.day_figure(agg, case.slots)),
+                charts.to_png(charts.shift_figure(agg.table.ravel())),
+            ]
+
+        pngs, m = measure("charts", case, render)
+        m.info["png_bytes"] = sum(len(png) for png in pngs)
+        results.append(m)
+
+    if "optimization" not in stages:
+        return results
+    # SciPy se importa solo si se mide la optimización
+    from turnos.decompose import solve_decomposed
+    from turnos.optimizer import MAX_PATTERN_SHIFTS, solve
+
+    per_nurse = horizon.week_len > MAX_PATTERN_SHIFTS
+    if not (per_nurse and case.nurses > NURSE_MODEL_LIMIT):
+        def optimize():
+            if case.weeks == 1:
+                return solve(case.nurses, shifts=horizon.shifts, nj_min=nj_min, nj_max=nj_max,
+                             time_limit=time_limit, week_len=horizon.week_len)
+            return solve_decomposed([case.nurses], weeks=case.weeks, nj_min=nj_min,
+                                    nj_max=nj_max, time_limit=time_limit,
+                                    week_len=horizon.week_len, max_workers=1)
+
+        opt, m = measure("optimization", case, optimize)
+        m.info.update(status=int(opt.status), objective=float(opt.objective))
+        results.append(m)
+    return results
+
+
+def environment():
+    """Versión del código y del entorno, para comparar corridas."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(cases, stages=STAGES, fmt="npy", workdir=None, time_limit=30.0, log=print):
+    """Corre todos los casos y devuelve el documento JSON de resultados."""
+    tracemalloc.start()
+    measurements = []
+    try:
+        for case in cases:
+            for m in run_case(case, stages, fmt, workdir, time_limit):
+                measurements.append(m)
+                log(f"{case.name:<40} {m.stage:<13} {m.seconds:9.3f} s "
+                    f"{m.peak_bytes / 2**20:10.1f} MB")
+    finally:
+        tracemalloc.stop()
+    return {
+        "environment": environment(),
+        "format": fmt,
+        "results": [asdict(m) for m in measurements],
+    }
+
+
+def compare(current, baseline):
+    """Filas ``(caso, etapa, segundos antes, segundos ahora, razón)`` en común."""
+    def key(m):
+        return (tuple(sorted(m["case"].items())), m["stage"])
+
+    before = {key(m): m for m in baseline["results"]}
+    rows = []
+    for m in current["results"]:
+        old = before.get(key(m))
+        if old is not None:
+            ratio = m["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+            rows.append((Case(**m["case"]).name, m["stage"], old["seconds"], m["seconds"], ratio))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nurses", type=int, nargs="+", default=list(NURSES))
+    parser.add_argument("--weeks", type=int, nargs="+", default=list(WEEKS))
+    parser.add_argument("--slots", type=int, nargs="+", default=[3])
+    parser.add_argument("--violation-rate", type=float, nargs="+", default=[0.0, 0.05])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--format", choices=("npy", "parquet", "csv", "xlsx"), default="npy")
+    parser.add_argument("--time-limit", type=float, default=30.0,
+                        help="límite de tiempo del optimizador por caso (s)")
+    parser.add_argument("--workdir", help="carpeta para los archivos temporales")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--baseline", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="razón de tiempo a partir de la cual se marca una regresión")
+    args = parser.parse_args(argv)
+
+    cases = [
+        Case(nurses, weeks, slots, rate, args.seed)
+        for nurses in args.nurses
+        for weeks in args.weeks
+        for slots in args.slots
+        for rate in args.violation_rate
+    ]
+    document = run(cases, args.stages, args.format, args.workdir, args.time_limit)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    print(f"Resultados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = 0
+        for name, stage, old, new, ratio in compare(document, baseline):
+            flag = "  ← regresión" if ratio > args.tolerance else ""
+            regressions += bool(flag)
+            print(f"{name:<40} {stage:<13} {old:9.3f} → {new:9.3f} s  ×{ratio:5.2f}{flag}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Caché LRU acotada en memoria para matrices Xij y sus agregados.
+
+Streamlit vuelve a ejecutar el script completo con cada interacción; esta caché
+guarda la matriz ya leída y los resultados derivados (horas, cobertura,
+validación) con una clave basada en el hash del contenido del archivo, de modo
+que volver a ver el mismo rol no cuesta nada. La caché se comparte entre
+sesiones y expulsa las entradas menos usadas cuando se supera ``max_bytes``.
+"""
+
+import dataclasses
+import hashlib
+import sys
+import threading
+
+import numpy as np
+from cachetools import LRUCache
+
+MAX_BYTES = 512 * 2**20     # 512 MB
+
+
+def content_hash(data):
+    """Hash hexadecimal del contenido de un archivo subido (``bytes``)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def nbytes(value):
+    """Tamaño aproximado en memoria de un valor guardado en la caché."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if dataclasses.is_dataclass(value):
+        return sum(nbytes(getattr(value, f.name)) for f in dataclasses.fields(value))
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class RosterCache:
+    """Caché LRU segura entre hilos con límite de memoria en bytes."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self._cache = LRUCache(maxsize=max_bytes, getsizeof=nbytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def current_bytes(self):
+        return self._cache.currsize
+
+    @property
+    def max_bytes(self):
+        return self._cache.maxsize
+
+    def get_or_compute(self, key, compute):
+        """Devuelve el valor de ``key`` o lo calcula con ``compute()`` y lo guarda.
+
+        Los valores más grandes que ``max_bytes`` se devuelven sin guardarse.
+        """
+        with self._lock:
+            try:
+                value = self._cache[key]
+            except KeyError:
+                pass
+            else:
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            try:
+                self._cache[key] = value
+            except ValueError:
+                pass    # más grande que toda la caché
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,158 @@
+"""Gráficas del dashboard que se adaptan al tamaño del rol.
+
+Con pocas enfermeras se dibuja una barra por enfermera, como en la versión
+original. Por encima de ``MAX_BARS`` se cambia a vistas agregadas de tamaño
+constante: histograma de horas, las ``TOP_K`` enfermeras con más violaciones y
+un mapa de calor día × turno del día. Las figuras se crean con
+``matplotlib.figure.Figure`` (sin el estado global de ``pyplot``), que se importa
+solo al dibujar, y se entregan
+como PNG para poder guardarlas en caché por hash de los datos.
+"""
+
+import hashlib
+import io
+
+import numpy as np
+
+MAX_BARS = 1000     # enfermeras a partir de las cuales se agregan las gráficas
+TOP_K = 20
+MAX_POINTS = 20_000  # puntos de dispersión por gráfica (se muestrean si hay más)
+
+
+def _figure(**kwargs):
+    # matplotlib tarda ~0.5 s en importarse; solo se carga al dibujar (no en un acierto de caché)
+    from matplotlib.figure import Figure
+
+    return Figure(**kwargs)
+
+
+def data_hash(*arrays):
+    """Hash del contenido de uno o más arreglos (clave de caché de figuras)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype, array.shape)).encode())
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+def to_png(fig, dpi=100):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def hours_figure(hours, WH, ylabel="Horas trabajadas", max_bars=MAX_BARS):
+    """Barras por enfermera o, con muchas enfermeras, histograma de horas."""
+    hours = np.asarray(hours)
+    fig = _figure()
+    ax = fig.subplots()
+    if hours.shape[0] <= max_bars:
+        ax.bar(np.arange(hours.shape[0]) + 1, hours)
+        ax.axhline(WH, linestyle="--", color="red", label=f"Máximo permitido ({WH} h)")
+        ax.set_xlabel("Enfermera")
+        ax.set_ylabel(ylabel)
+        ax.set_title("Horas asignadas por enfermera")
+    else:
+        counts = np.bincount(hours.astype(np.int64))
+        values = np.flatnonzero(counts)
+        # las horas suelen ser múltiplos de la duración del turno: el ancho sigue al paso entre barras
+        width = 0.8 * np.diff(values).min() if values.shape[0] > 1 else 0.8
+        ax.bar(values, counts[values], width=width)
+        ax.axvline(WH, linestyle="--", color="red", label=f"Máximo permitido ({WH} h)")
+        ax.set_xlabel(ylabel)
+        ax.set_ylabel("Número de enfermeras")
+        ax.set_title(f"Distribución de horas ({hours.shape[0]:,} enfermeras)")
+    ax.legend()
+    return fig
+
+
+def top_violators_figure(violations, k=TOP_K):
+    """Barras horizontales con las ``k`` enfermeras con más violaciones."""
+    nurses = violations[:, 0]
+    per_nurse = np.bincount(nurses[nurses >= 0])
+    k = min(k, np.count_nonzero(per_nurse))
+    top = np.argpartition(per_nurse, -k)[-k:] if k else np.empty(0, dtype=np.intp)
+    top = top[np.argsort(per_nurse[top])]
+
+    fig = _figure(figsize=(6, max(2, 0.3 * k)))
+    ax = fig.subplots()
+    ax.barh([f"Enfermera {i + 1}" for i in top], per_nurse[top], color="indianred")
+    ax.set_xlabel("Número de violaciones")
+    ax.set_title(f"Top {k} enfermeras con más violaciones")
+    return fig
+
+
+def day_figure(agg, slots):
+    """Total por día y una línea por turno del día."""
+    days = np.arange(1, agg.day_totals.shape[0] + 1)
+    fig = _figure()
+    ax = fig.subplots()
+    ax.plot(days, agg.day_totals, marker="o", label="Total del día")
+    for slot in range(slots):
+        ax.plot(days, agg.table[:, slot], linestyle=":", label=f"Turno {slot + 1} del día")
+    ax.set_xlabel("Día del horizonte")
+    ax.set_ylabel("Total de asignaciones (turnos trabajados)")
+    ax.set_title("Carga total de trabajo por día")
+    ax.legend()
+    return fig
+
+
+def heatmap_figure(table):
+    """Mapa de calor de la cobertura agrupada en celdas día × turno del día."""
+    fig = _figure(figsize=(10, 2.5))
+    ax = fig.subplots()
+    image = ax.imshow(table.T, aspect="auto", cmap="viridis")
+    ax.set_xlabel("Día del horizonte")
+    ax.set_ylabel("Turno del día")
+    ax.set_xticks(np.arange(table.shape[0]), np.arange(1, table.shape[0] + 1))
+    ax.set_yticks(np.arange(table.shape[1]), np.arange(1, table.shape[1] + 1))
+    ax.set_title("Enfermeras asignadas por día y turno")
+    fig.colorbar(image, ax=ax)
+    return fig
+
+
+def shift_figure(coverage):
+    """Enfermeras asignadas a cada turno del horizonte."""
+    fig = _figure(figsize=(10, 4))
+    ax = fig.subplots()
+    ax.bar(np.arange(1, coverage.shape[0] + 1), coverage)
+    ax.set_xlabel("Turno (j)")
+    ax.set_ylabel("Enfermeras asignadas")
+    ax.set_title("Número de enfermeras por turno")
+    return fig
+
+
+def frontier_figure(sweep):
+    """Horas ociosas por plantilla: escenarios factibles, no factibles y la frontera."""
+    shown = np.arange(len(sweep))
+    if shown.size > MAX_POINTS:
+        shown = np.sort(np.random.default_rng(0).choice(shown, MAX_POINTS, replace=False))
+    ok = sweep.feasible[shown]
+    headcount, idle = sweep.headcount[shown], sweep.idle[shown]
+    fig = _figure()
+    ax = fig.subplots()
+    ax.scatter(headcount[~ok], idle[~ok], s=8, color="lightgray", label="No factible")
+    ax.scatter(headcount[ok], idle[ok], s=8, color="steelblue", label="Factible")
+    headcount, idle = sweep.frontier()
+    if headcount.size:
+        ax.plot(headcount, idle, color="red", marker="o", label="Frontera (mínimo ocioso)")
+    ax.set_xlabel("Plantilla (enfermeras)")
+    ax.set_ylabel("Horas ociosas")
+    ax.set_title("Escenarios: plantilla vs tiempo ocioso")
+    ax.legend()
+    return fig
+
+
+def versions_figure(coverage, names):
+    """Cobertura por turno de cada versión del rol, una línea por versión."""
+    shifts = np.arange(1, coverage.shape[1] + 1)
+    fig = _figure(figsize=(10, 4))
+    ax = fig.subplots()
+    for row, name in zip(coverage, names):
+        ax.step(shifts, row, where="mid", label=name)
+    ax.set_xlabel("Turno (j)")
+    ax.set_ylabel("Enfermeras asignadas")
+    ax.set_title("Cobertura por turno en cada versión")
+    ax.legend(fontsize="small")
+    return fig
@@ -0,0 +1,150 @@
+"""Comparación de varias versiones de un rol.
+
+Cada versión se resume una sola vez (``summarize``) en sus palabras de bits
+por enfermera y semana (como ``PackedRoster``), sus horas por enfermera y su
+cobertura por turno; ese resumen se puede guardar en caché por hash del
+archivo. ``compare`` alinea las versiones por índice de enfermera y de turno
+(las filas o semanas que faltan cuentan como ceros) y calcula todo con
+operaciones sobre el arreglo (versiones × enfermeras × semanas):
+
+- celdas agregadas y quitadas: ``popcount`` de ``nueva & ~vieja`` y ``vieja & ~nueva``;
+- diferencia de horas por enfermera y de cobertura por turno: restas de filas.
+
+Solo la lista de celdas cambiadas de un par (``Comparison.changes``)
+desempaqueta bits, y solo de las enfermeras que cambiaron.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from turnos.packed import PackedRoster
+from turnos.sparse import SparseRoster
+from turnos.validation import SHIFT_HOURS
+
+
+@dataclass
+class Version:
+    """Resumen de una versión: lo único que ``compare`` necesita de ella."""
+
+    words: np.ndarray       # (nurses, weeks) uint32, bit b = turno b de la semana
+    coverage: np.ndarray    # enfermeras por turno
+    shifts: int
+    invalid: int            # celdas no binarias (no participan en la diferencia)
+    week_len: int
+
+    @property
+    def nurses(self):
+        return self.words.shape[0]
+
+
+def summarize(roster):
+    """``Version`` de un ``PackedRoster``, ``SparseRoster`` o matriz densa."""
+    if isinstance(roster, SparseRoster):
+        weeks = -(-roster.shifts // roster.week_len)
+        week, bit = np.divmod(roster.indices.astype(np.int64), roster.week_len)
+        # los bits de una palabra son distintos: sumarlos es lo mismo que combinarlos con OR
+        words = np.bincount(roster._rows() * weeks + week, weights=np.ldexp(1.0, bit),
+                            minlength=roster.nurses * weeks)
+        words = words.astype(np.uint32).reshape(roster.nurses, weeks)
+        return Version(words=words, coverage=roster.coverage(), shifts=roster.shifts,
+                       invalid=len(roster.invalid), week_len=roster.week_len)
+    if not isinstance(roster, PackedRoster):
+        roster = PackedRoster.from_matrix(roster)
+    return Version(words=roster.words, coverage=roster.coverage(), shifts=roster.shifts,
+                   invalid=len(roster.invalid), week_len=roster.week_len)
+
+
+@dataclass
+class Comparison:
+    """Versiones alineadas y sus diferencias entre pares."""
+
+    names: list
+    words: np.ndarray       # (versiones, nurses, weeks) uint32
+    coverage: np.ndarray    # (versiones, shifts)
+    shapes: list            # (enfermeras, turnos) original de cada versión
+    invalid: list
+    shifts: int
+    week_len: int
+    shift_hours: float = SHIFT_HOURS
+
+    @property
+    def versions(self):
+        return self.words.shape[0]
+
+    @property
+    def nurses(self):
+        return self.words.shape[1]
+
+    def hours(self):
+        """Horas por enfermera en cada versión, (versiones, enfermeras)."""
+        return np.bitwise_count(self.words).sum(axis=2, dtype=np.int64) * self.shift_hours
+
+    def pairs(self, baseline=False):
+        """Índices ``(antes, después)``: consecutivos o, con ``baseline``, contra la primera."""
+        return [(0 if baseline else k - 1, k) for k in range(1, self.versions)]
+
+    def diff(self, before, after):
+        """Celdas agregadas y quitadas por enfermera entre dos versiones."""
+        old, new = self.words[before], self.words[after]
+        added = np.bitwise_count(new & ~old).sum(axis=1, dtype=np.int64)
+        removed = np.bitwise_count(old & ~new).sum(axis=1, dtype=np.int64)
+        return added, removed
+
+    def summary(self, baseline=False):
+        """Una fila por par de versiones, calculada para todos los pares a la vez."""
+        pairs = np.array(self.pairs(baseline), dtype=np.intp).reshape(-1, 2)
+        old, new = self.words[pairs[:, 0]], self.words[pairs[:, 1]]
+        added = np.bitwise_count(new & ~old).sum(axis=2, dtype=np.int64)
+        removed = np.bitwise_count(old & ~new).sum(axis=2, dtype=np.int64)
+        coverage = self.coverage[pairs[:, 1]] - self.coverage[pairs[:, 0]]
+        return {
+            "before": [self.names[k] for k in pairs[:, 0]],
+            "after": [self.names[k] for k in pairs[:, 1]],
+            "added": added.sum(axis=1),
+            "removed": removed.sum(axis=1),
+            "nurses_changed": ((added + removed) > 0).sum(axis=1),
+            "hours_delta": (added.sum(axis=1) - removed.sum(axis=1)) * self.shift_hours,
+            "max_coverage_delta": (np.abs(coverage).max(axis=1) if self.shifts
+                                   else np.zeros(len(pairs), dtype=np.int64)),
+        }
+
+    def changes(self, before, after, limit=None):
+        """Celdas que cambiaron como arreglo (k, 3): enfermera, turno, valor nuevo (0-based).
+
+        Solo se desempaquetan las palabras con algún bit distinto.
+        """
+        flipped = self.words[before] ^ self.words[after]
+        nurse, week = np.nonzero(flipped)
+        if limit is not None:
+            nurse, week = nurse[:limit], week[:limit]     # ``limit`` palabras bastan para ``limit`` celdas
+        bits = (flipped[nurse, week][:, None] >> np.arange(self.week_len, dtype=np.uint32)) & 1
+        row, bit = np.nonzero(bits)
+        shift = week[row] * self.week_len + bit
+        value = (self.words[after][nurse[row], week[row]] >> bit.astype(np.uint32)) & 1
+        out = np.column_stack([nurse[row], shift, value]).astype(np.int64)
+        return out if limit is None else out[:limit]
+
+
+def compare(versions, names=None, shift_hours=SHIFT_HOURS):
+    """Alinea las ``Version`` (o rosters) dadas, en orden, para compararlas."""
+    versions = [v if isinstance(v, Version) else summarize(v) for v in versions]
+    if not versions:
+        raise ValueError("No hay versiones que comparar.")
+    week_len = versions[0].week_len
+    if any(v.week_len != week_len for v in versions):
+        raise ValueError("Todas las versiones deben tener la misma longitud de semana.")
+    names = list(names) if names is not None else [f"v{k + 1}" for k in range(len(versions))]
+
+    nurses = max(v.nurses for v in versions)
+    weeks = max(v.words.shape[1] for v in versions)
+    shifts = max(v.shifts for v in versions)
+    words = np.zeros((len(versions), nurses, weeks), dtype=np.uint32)
+    coverage = np.zeros((len(versions), shifts), dtype=np.int64)
+    for k, v in enumerate(versions):
+        words[k, :v.nurses, :v.words.shape[1]] = v.words
+        coverage[k, :v.shifts] = v.coverage
+    return Comparison(names=names, words=words, coverage=coverage,
+                      shapes=[(v.nurses, v.shifts) for v in versions],
+                      invalid=[v.invalid for v in versions], shifts=shifts,
+                      week_len=week_len, shift_hours=shift_hours)
@@ -0,0 +1,322 @@
+"""Solución descompuesta por salas y semanas en un ``ProcessPoolExecutor``.
+
+Cada sala tiene su propia plantilla y sus propios Nj(min)/Nj(max), así que las
+salas son independientes entre sí. Dentro de una sala, R1, R3 y R4 se
+evalúan semana a semana; solo R2 relaciona semanas consecutivas (una ventana
+de descanso puede cruzar el cambio de semana). Por eso cada par (sala, semana)
+se resuelve como un subproblema independiente de una semana, con su propio
+límite de tiempo, y después se cosen las semanas:
+
+- como las enfermeras de una sala son intercambiables, las filas de la semana
+  siguiente se reordenan para que el final de cada horario no choque con el
+  inicio del siguiente (un problema de transporte entre los tipos de final y
+  de inicio, de tamaño ``2**(window - 1)``);
+- el reordenamiento minimiza los choques pero no siempre los elimina (p. ej.,
+  cuando muchos horarios empiezan y terminan trabajando); las costuras que
+  aún violan R2 se reoptimizan con un MILP de mínimo tiempo ocioso limitado a
+  los turnos alrededor del cambio de semana (el resto del rol queda fijo), que
+  también respeta R1, R3 y R4;
+- la matriz cosida se valida sala por sala con ``validate``.
+
+Cada subproblema es una relajación de su semana (le falta solo R2 entre
+semanas), así que la suma de sus objetivos es una cota inferior del óptimo
+completo. El estado es óptimo solo si la matriz cosida alcanza esa cota; si la
+reparación de costuras la aleja, o si aún se viola alguna regla, el estado
+deja de ser óptimo.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+from turnos.optimizer import STATUS, solve
+from turnos.validation import (
+    REST_WINDOW,
+    SHIFT_HOURS,
+    SHIFTS,
+    WH,
+    validate,
+)
+
+SEAM_RADIUS = 2 * REST_WINDOW   # turnos a cada lado del cambio de semana en la primera vecindad
+
+
+@dataclass
+class Subproblem:
+    """Una sala en una semana."""
+
+    ward: int
+    week: int
+    TN: int
+    nj_min: np.ndarray      # (week_len,) límites de la semana
+    nj_max: np.ndarray
+
+
+@dataclass
+class DecomposedResult:
+    """Solución cosida; expone los mismos campos que ``OptimizationResult``."""
+
+    X: np.ndarray               # (Σ plantillas, turnos) uint8, o None si algún subproblema falló
+    ward: np.ndarray            # sala de cada fila de X
+    objective: float
+    status: int
+    message: str
+    mip_gap: float              # la mayor brecha entre los subproblemas
+    build_time: float           # suma de los tiempos de construcción
+    solve_time: float           # tiempo de pared de toda la solución en paralelo
+    parts: list = field(default_factory=list)      # (Subproblem, OptimizationResult)
+    checks: list = field(default_factory=list)     # ValidationResult por sala
+
+    @property
+    def success(self):
+        return self.X is not None
+
+    @property
+    def feasible(self):
+        return self.success and all(check.feasible for check in self.checks)
+
+
+def _limits(value, wards, shifts, default):
+    """Límites por sala y turno: escalar, un valor por sala, por turno o (salas, turnos)."""
+    if value is None:
+        return np.full((wards, shifts), default)
+    value = np.asarray(value, dtype=float)
+    if value.ndim == 1 and value.shape[0] == wards and wards != shifts:
+        value = value[:, None]
+    return np.broadcast_to(value, (wards, shifts)).astype(float)
+
+
+def subproblems(wards, weeks=1, week_len=SHIFTS, nj_min=None, nj_max=None):
+    """Parte el horizonte en un subproblema por sala y semana."""
+    shifts = weeks * week_len
+    low = _limits(nj_min, len(wards), shifts, 0.0)
+    high = _limits(nj_max, len(wards), shifts, np.inf)
+    parts = []
+    for w, TN in enumerate(wards):
+        for k in range(weeks):
+            week = slice(k * week_len, (k + 1) * week_len)
+            parts.append(Subproblem(ward=w, week=k, TN=int(TN),
+                                    nj_min=low[w, week], nj_max=high[w, week]))
+    return parts
+
+
+def _solve_part(part, options):
+    return solve(part.TN, shifts=part.nj_min.shape[0], nj_min=part.nj_min,
+                 nj_max=part.nj_max, **options)
+
+
+def _conflicts(window):
+    """``conflict[a, b]``: un final de tipo ``a`` choca (R2) con un inicio de tipo ``b``.
+
+    El bit ``i`` de ``a`` es el turno ``window − 1 − i`` antes del cambio de
+    semana; el bit ``q`` de ``b`` es el turno ``q`` después. Dos turnos
+    trabajados chocan si están a menos de ``window`` turnos de distancia.
+    """
+    k = window - 1
+    codes = np.arange(2**k)
+    bits = (codes[:, None] >> np.arange(k)) & 1
+    near = np.arange(k)[None, :] <= np.arange(k)[:, None]        # near[i, q]: q ≤ i
+    return (bits @ near @ bits.T) > 0
+
+
+def stitch(previous, following, window=REST_WINDOW):
+    """Reordena las filas de ``following`` para que choquen lo menos posible (R2) con ``previous``.
+
+    Se resuelve un problema de transporte entre los tipos de final de semana
+    (últimos ``window − 1`` turnos) y los de inicio (primeros ``window − 1``)
+    que minimiza los choques; sus soluciones básicas son enteras. Si no hay
+    suficientes inicios compatibles, quedan choques: ver ``repair_seams``.
+    """
+    k = window - 1
+    if k <= 0 or not previous.shape[0]:
+        return following
+    weights = 1 << np.arange(k)
+    tail = previous[:, -k:] @ weights
+    head = following[:, :k] @ weights
+    types = 2**k
+    supply = np.bincount(tail, minlength=types)
+    demand = np.bincount(head, minlength=types)
+
+    # f[a, b]: filas con final a que reciben un horario con inicio b
+    rows = np.repeat(np.eye(types), types, axis=1)
+    columns = np.tile(np.eye(types), types)
+    res = linprog(_conflicts(window).ravel().astype(float),
+                  A_eq=np.vstack([rows, columns]), b_eq=np.concatenate([supply, demand]),
+                  bounds=(0, None), method="highs")
+    flow = np.rint(res.x).astype(np.int64).reshape(types, types)
+
+    out = np.empty_like(following)
+    by_head = [list(np.flatnonzero(head == b)) for b in range(types)]
+    for a in range(types):
+        targets = iter(np.flatnonzero(tail == a))
+        for b in range(types):
+            for _ in range(flow[a, b]):
+                out[next(targets)] = following[by_head[b].pop()]
+    return out
+
+
+def _seam_conflicts(check, seam, window):
+    """¿Hay ventanas de R2 violadas que cruzan el cambio de semana ``seam``?"""
+    windows = check.by_rule(2)[:, 1]
+    return bool(((windows > seam - window) & (windows < seam)).any())
+
+
+def seam_model(X, start, stop, cap, nj_min, nj_max, window, week_len):
+    """MILP de mínimo tiempo ocioso sobre los turnos ``[start, stop)``; ``(c, restricciones, cotas)``.
+
+    Las celdas fuera de la vecindad son constantes que se descuentan de los
+    límites de R1 y R2. La variable de la celda ``(i, j)`` ocupa la columna
+    ``i * (stop - start) + j - start``.
+    """
+    nurses, shifts = X.shape
+    width = stop - start
+    var = np.arange(nurses * width).reshape(nurses, width)
+    outside = X == 1
+    outside[:, start:stop] = False
+
+    # R1 — una fila por enfermera y semana de la vecindad
+    first_week, last_week = start // week_len, (stop - 1) // week_len
+    weeks = last_week - first_week + 1
+    local_week = np.arange(start, stop) // week_len - first_week
+    fixed = outside.reshape(nurses, -1, week_len).sum(axis=2)[:, first_week:last_week + 1]
+    r1_rows = (np.arange(nurses)[:, None] * weeks + local_week).ravel()
+    r1_ub = np.maximum(cap - fixed, 0).ravel()
+
+    # R2 — ventanas que tocan la vecindad; sus celdas fuera de ella son fijas
+    starts = np.arange(max(start - window + 1, 0), min(stop - 1, shifts - window) + 1)
+    offsets = starts[:, None] + np.arange(window)
+    k_idx, o_idx = np.nonzero((offsets >= start) & (offsets < stop))
+    count = starts.shape[0]
+    base = nurses * weeks
+    r2_rows = (base + np.arange(nurses)[:, None] * count + k_idx).ravel()
+    r2_cols = var[:, offsets[k_idx, o_idx] - start].ravel()
+    window_fixed = np.zeros((nurses, count), dtype=np.int64)
+    for offset in range(window):
+        window_fixed += outside[:, starts + offset]
+    r2_ub = np.maximum(1 - window_fixed, 0).ravel()
+
+    # R3 / R4 — cobertura de cada turno de la vecindad
+    base += nurses * count
+    r3_rows = base + np.tile(np.arange(width), nurses)
+
+    rows = np.concatenate([r1_rows, r2_rows, r3_rows])
+    cols = np.concatenate([var.ravel(), r2_cols, var.ravel()])
+    A = sparse.csr_array((np.ones(rows.shape[0]), (rows, cols)), shape=(base + width, var.size))
+    lb = np.concatenate([np.full(r1_ub.shape[0] + r2_ub.shape[0], -np.inf), nj_min[start:stop]])
+    ub = np.concatenate([r1_ub, r2_ub, nj_max[start:stop]])
+    # mínimo tiempo ocioso = máximo de turnos asignados
+    return -np.ones(var.size), LinearConstraint(A, lb, ub), Bounds(0, 1)
+
+
+def repair_seams(X, seams, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None, nj_max=None,
+                 window=REST_WINDOW, week_len=SHIFTS, radius=SEAM_RADIUS, time_limit=60.0):
+    """Elimina los choques de R2 en los cambios de semana ``seams``.
+
+    Cada costura se reoptimiza con ``seam_model`` sobre ``radius`` turnos a
+    cada lado (R1, R2, R3 y R4 incluidos); si esa vecindad no tiene solución,
+    se duplica ``radius`` hasta cubrir todo el horizonte. Devuelve ``(X,
+    estado)``: el peor estado de los MILP resueltos (0 si no hizo falta
+    ninguno).
+    """
+    X = X.copy()
+    nurses, shifts = X.shape
+    nj_min = np.broadcast_to(np.asarray(0.0 if nj_min is None else nj_min, dtype=float), (shifts,))
+    nj_max = np.broadcast_to(np.asarray(np.inf if nj_max is None else nj_max, dtype=float), (shifts,))
+    cap = int(np.floor(WH / shift_hours)) if shift_hours > 0 else week_len
+    status = 0
+    for seam in seams:
+        width = radius
+        while True:
+            start, stop = max(seam - width, 0), min(seam + width, shifts)
+            c, constraints, bounds = seam_model(X, start, stop, cap, nj_min, nj_max,
+                                                window, week_len)
+            res = milp(c, constraints=constraints, integrality=np.ones_like(c), bounds=bounds,
+                       options={"time_limit": time_limit, "disp": False})
+            if res.status == 2 and (start > 0 or stop < shifts):
+                width *= 2
+                continue
+            break
+        status = max(status, res.status)
+        if res.x is not None:
+            X[:, start:stop] = np.rint(res.x).astype(X.dtype).reshape(nurses, stop - start)
+    return X, status
+
+
+def solve_decomposed(wards, weeks=1, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None,
+                     nj_max=None, window=REST_WINDOW, time_limit=60.0, mip_gap=1e-4,
+                     formulation="auto", week_len=SHIFTS, max_workers=None):
+    """Resuelve cada (sala, semana) en paralelo, cose las semanas, repara las costuras y valida.
+
+    ``wards`` es la plantilla de cada sala. ``nj_min``/``nj_max`` aceptan un
+    escalar, un valor por sala, un valor por turno o una matriz (salas,
+    turnos). ``time_limit`` es el presupuesto de cada subproblema, en
+    segundos; ``max_workers`` es el número de procesos (por omisión, uno por
+    núcleo).
+    """
+    parts = subproblems(wards, weeks, week_len, nj_min, nj_max)
+    options = dict(WH=WH, shift_hours=shift_hours, window=window, time_limit=time_limit,
+                   mip_gap=mip_gap, formulation=formulation, week_len=week_len)
+    workers = min(max_workers or os.cpu_count() or 1, len(parts))
+
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_solve_part, parts, [options] * len(parts)))
+    else:
+        results = [_solve_part(part, options) for part in parts]
+    solve_time = time.perf_counter() - start
+
+    status = max(result.status for result in results)
+    common = dict(
+        ward=np.repeat(np.arange(len(wards)), wards),
+        status=status,
+        message=STATUS.get(status, results[0].message),
+        mip_gap=max(result.mip_gap for result in results),
+        build_time=sum(result.build_time for result in results),
+        solve_time=solve_time,
+        parts=list(zip(parts, results)),
+    )
+    if not all(result.success for result in results):
+        return DecomposedResult(X=None, objective=np.nan, **common)
+
+    blocks, checks = [], []
+    solved = iter(results)
+    low = _limits(nj_min, len(wards), weeks * week_len, 0.0)
+    high = _limits(nj_max, len(wards), weeks * week_len, np.inf)
+    for w, TN in enumerate(wards):
+        weeks_X = [next(solved).X for _ in range(weeks)]
+        for k in range(1, weeks):
+            weeks_X[k] = stitch(weeks_X[k - 1], weeks_X[k], window)
+        X = np.hstack(weeks_X)
+        limits = dict(WH=WH, shift_hours=shift_hours, nj_min=low[w], nj_max=high[w],
+                      window=window, week_len=week_len)
+        check = validate(X, **limits)
+        seams = [k * week_len for k in range(1, weeks)
+                 if _seam_conflicts(check, k * week_len, window)]
+        if seams:
+            X, repaired = repair_seams(X, seams, time_limit=time_limit, **limits)
+            status = max(status, repaired)
+            check = validate(X, **limits)
+        blocks.append(X)
+        checks.append(check)
+
+    X = np.vstack(blocks)
+    objective = WH * X.shape[0] * weeks - shift_hours * float(X.sum())
+    # cota inferior: la suma de los subproblemas, cada uno sin R2 entre semanas
+    bound = sum(WH * part.TN - shift_hours * float(result.X.sum())
+                for part, result in common["parts"])
+    common.update(status=status, message=STATUS.get(status, common["message"]))
+    if objective > bound:
+        common.update(status=max(status, 1),
+                      message=f"Costuras reparadas con un MILP local: la solución puede no ser "
+                              f"óptima (cota inferior de {bound:,.0f} h de tiempo ocioso)")
+    if not all(check.feasible for check in checks):
+        counts = {rule: sum(check.counts()[rule] for check in checks) for rule in checks[0].counts()}
+        common.update(status=max(status, 1),
+                      message=f"La solución cosida viola restricciones {counts}")
+    return DecomposedResult(X=X, objective=objective, checks=checks, **common)
@@ -0,0 +1,295 @@
+"""Exportación de roles, horas por enfermera y violaciones a Excel, Parquet y CSV.
+
+Todo se escribe por bloques de filas, sin armar el archivo completo en memoria:
+
+- Parquet y CSV usan los escritores incrementales de Arrow (``ParquetWriter``,
+  ``CSVWriter``), un lote por bloque.
+- Excel se escribe en modo solo escritura: el XML de la hoja se genera por
+  bloques y se comprime directamente dentro del ``.xlsx`` (``zipfile``). En el
+  rol cada celda es uno de tres fragmentos de igual longitud (0, 1 o vacía),
+  así que el XML de un bloque se arma indexando una tabla de bytes con la
+  matriz ``uint8``. El modo ``write_only`` de openpyxl escribe celda por celda
+  en Python y tarda ~2 s por cada 1 000 enfermeras de una semana.
+
+El rol se exporta como el archivo original: sin encabezado, una fila por
+enfermera, 0/1 por turno y vacío en las celdas no binarias (``INVALID``), así
+que el archivo exportado se vuelve a leer con ``load_roster``.
+"""
+
+import os
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from turnos.loaders import INVALID
+from turnos.validation import RULES
+
+EXPORT_FORMATS = ("xlsx", "parquet", "csv")
+MIME_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+    "csv": "text/csv",
+}
+EXPORT_BLOCK = 1 << 14      # filas por bloque al escribir
+XLSX_MAX_ROWS = 1_048_576   # límites de una hoja de Excel
+XLSX_MAX_COLUMNS = 16_384
+
+# =======================
+# PIEZAS FIJAS DEL .XLSX
+# =======================
+_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_DOC_RELS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PACKAGE = {
+    "[Content_Types].xml": (
+        f'{_XML}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        f'{_XML}<Relationships xmlns="{_RELS}">'
+        f'<Relationship Id="rId1" Type="{_DOC_RELS}/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        f'{_XML}<Relationships xmlns="{_RELS}">'
+        f'<Relationship Id="rId1" Type="{_DOC_RELS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+# Un fragmento por valor de celda, todos de 15 bytes (el relleno son espacios
+# entre elementos, que el XML ignora); los valores no binarios quedan vacíos.
+_CELL_BYTES = 15
+_CELLS = np.frombuffer(b"<c/>".ljust(_CELL_BYTES) * 256, dtype=np.uint8).reshape(256, -1).copy()
+_CELLS[0] = np.frombuffer(b"<c><v>0</v></c>", dtype=np.uint8)
+_CELLS[1] = np.frombuffer(b"<c><v>1</v></c>", dtype=np.uint8)
+
+
+def _column_letter(index):
+    """Letra de columna de Excel (0 → A, 26 → AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(65 + rest) + letters
+    return letters
+
+
+def _format(target, fmt):
+    if fmt is None:
+        fmt = os.path.splitext(str(getattr(target, "name", target)))[1].lower().lstrip(".")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportación no soportado: '{fmt}'. "
+                         f"Use {', '.join(EXPORT_FORMATS)}.")
+    return fmt
+
+
+def _write_xlsx(target, chunks, rows, columns, sheet="Hoja1"):
+    """Escribe un ``.xlsx`` de una hoja con el XML de filas que generan ``chunks``."""
+    if rows > XLSX_MAX_ROWS or columns > XLSX_MAX_COLUMNS:
+        raise ValueError(f"Excel admite hasta {XLSX_MAX_ROWS:,} filas y {XLSX_MAX_COLUMNS:,} "
+                         f"columnas ({rows:,} × {columns:,}); exporte a Parquet o CSV.")
+    last = f"{_column_letter(columns - 1)}{rows}" if rows and columns else "A1"
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as package:
+        for name, text in _PACKAGE.items():
+            package.writestr(name, text)
+        package.writestr("xl/workbook.xml", (
+            f'{_XML}<workbook xmlns="{_MAIN}" xmlns:r="{_DOC_RELS}">'
+            f'<sheets><sheet name="{escape(sheet)}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+        with package.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as part:
+            part.write(f'{_XML}<worksheet xmlns="{_MAIN}"><dimension ref="A1:{last}"/>'
+                       "<sheetData>".encode())
+            for chunk in chunks:
+                part.write(chunk)
+            part.write(b"</sheetData></worksheet>")
+
+
+# =======================
+# ROL (Xij)
+# =======================
+def roster_blocks(roster, block_rows=EXPORT_BLOCK):
+    """Bloques ``uint8`` de filas de un rol denso, ``PackedRoster`` o ``SparseRoster``."""
+    nurses = roster.shape[0]
+    for start in range(0, nurses, block_rows):
+        stop = min(start + block_rows, nurses)
+        if isinstance(roster, np.ndarray):
+            yield roster[start:stop]
+        else:
+            yield roster.to_matrix(start, stop)
+
+
+def _roster_xml(blocks, shifts):
+    width = 5 + shifts * _CELL_BYTES + 6
+    for cells in blocks:
+        out = np.empty((cells.shape[0], width), dtype=np.uint8)
+        out[:, :5] = np.frombuffer(b"<row>", dtype=np.uint8)
+        out[:, 5:-6] = _CELLS[cells].reshape(cells.shape[0], -1)
+        out[:, -6:] = np.frombuffer(b"</row>", dtype=np.uint8)
+        yield out.tobytes()
+
+
+def _roster_batches(blocks, shifts):
+    import pyarrow as pa
+
+    names = [str(j + 1) for j in range(shifts)]
+    for cells in blocks:
+        invalid = cells == INVALID
+        yield pa.record_batch([pa.array(cells[:, j], mask=invalid[:, j]) for j in range(shifts)],
+                              names=names)
+
+
+def write_roster(roster, target, fmt=None, block_rows=EXPORT_BLOCK):
+    """Escribe el rol en ``target`` (ruta u objeto archivo binario) por bloques de filas.
+
+    ``fmt`` es ``"xlsx"``, ``"parquet"`` o ``"csv"``; sin ``fmt`` se toma de la
+    extensión de ``target``.
+    """
+    fmt = _format(target, fmt)
+    nurses, shifts = roster.shape
+    blocks = roster_blocks(roster, block_rows)
+    if fmt == "xlsx":
+        _write_xlsx(target, _roster_xml(blocks, shifts), nurses, shifts, sheet="Xij")
+        return
+
+    import pyarrow as pa
+
+    schema = pa.schema([(str(j + 1), pa.uint8()) for j in range(shifts)])
+    _write_arrow(target, fmt, schema, _roster_batches(blocks, shifts), header=False)
+
+
+def _write_arrow(target, fmt, schema, batches, header=True):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        with pq.ParquetWriter(target, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    else:
+        import pyarrow.csv as pcsv
+
+        options = pcsv.WriteOptions(include_header=header)
+        with pcsv.CSVWriter(target, schema, write_options=options) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+
+# =======================
+# TABLAS DE REPORTE
+# =======================
+def hours_table(result):
+    """Horas por enfermera: total, por semana y número de violaciones (índices 1-based)."""
+    nurses = result.violations[:, 0]
+    table = {
+        "enfermera": np.arange(1, result.nurses + 1),
+        "horas": result.hours,
+    }
+    if result.weeks > 1:
+        for week in range(result.weeks):
+            table[f"semana_{week + 1}"] = result.week_hours[:, week]
+    table["excede_WH"] = result.week_hours.max(axis=1, initial=0) > result.WH
+    table["violaciones"] = np.bincount(nurses[nurses >= 0], minlength=result.nurses)
+    return table
+
+
+def violations_table(result):
+    """Una fila por violación: enfermera, turno, regla y su descripción.
+
+    Los índices son 1-based como en el modelo; 0 indica que la regla no depende
+    de ese eje (p. ej., R3 y R4 son por turno) y se exporta como vacío.
+    """
+    nurse, shift, rule = result.violations.T
+    text = np.array([""] + [RULES[r] for r in sorted(RULES)], dtype=object)
+    return {
+        "enfermera": np.ma.masked_less(nurse.astype(np.int64) + 1, 1),
+        "turno": np.ma.masked_less(shift.astype(np.int64) + 1, 1),
+        "regla": np.char.add("R", rule.astype(str)).astype(object),
+        "descripcion": text[rule],
+    }
+
+
+def _table_rows(table):
+    return len(next(iter(table.values()))) if table else 0
+
+
+def _xlsx_cells(values):
+    """Fragmentos XML de las celdas de una columna (arreglo de ``str``)."""
+    mask = np.ma.getmaskarray(values)
+    values = np.ma.getdata(values)
+    if values.dtype == object or values.dtype.kind == "U":
+        text = np.array([escape(str(v)) for v in values.tolist()], dtype=object)
+        cells = '<c t="inlineStr"><is><t>' + text + "</t></is></c>"
+    elif values.dtype == np.bool_:
+        cells = "<c t=\"b\"><v>" + values.astype(np.uint8).astype(str).astype(object) + "</v></c>"
+    else:
+        mask = mask | ~np.isfinite(values)
+        cells = "<c><v>" + values.astype(str).astype(object) + "</v></c>"
+    cells[mask] = "<c/>"
+    return cells
+
+
+def _table_xml(table, block_rows):
+    header = "".join(f'<c t="inlineStr"><is><t>{escape(name)}</t></is></c>' for name in table)
+    yield f"<row>{header}</row>".encode()
+    for start in range(0, _table_rows(table), block_rows):
+        columns = [_xlsx_cells(values[start:start + block_rows]) for values in table.values()]
+        rows = "<row>" + columns[0]
+        for cells in columns[1:]:
+            rows = rows + cells
+        yield ("</row>".join(rows.tolist()) + "</row>").encode()
+
+
+def _arrow_type(values):
+    import pyarrow as pa
+
+    dtype = np.ma.getdata(values).dtype
+    return pa.string() if dtype == object or dtype.kind == "U" else pa.from_numpy_dtype(dtype)
+
+
+def _table_batches(table, schema, block_rows):
+    import pyarrow as pa
+
+    for start in range(0, _table_rows(table), block_rows):
+        columns = [values[start:start + block_rows] for values in table.values()]
+        yield pa.record_batch(
+            [pa.array(np.ma.getdata(values), type=field.type,
+                      mask=np.ma.getmaskarray(values) if np.ma.isMaskedArray(values) else None)
+             for values, field in zip(columns, schema)],
+            schema=schema)
+
+
+def write_table(table, target, fmt=None, sheet="Hoja1", block_rows=EXPORT_BLOCK):
+    """Escribe una tabla ``{columna: arreglo}`` (p. ej., ``hours_table``) por bloques.
+
+    Los arreglos enmascarados (``np.ma``) se escriben con celdas vacías.
+    """
+    fmt = _format(target, fmt)
+    rows = _table_rows(table)
+    if fmt == "xlsx":
+        _write_xlsx(target, _table_xml(table, block_rows), rows + 1, len(table), sheet=sheet)
+        return
+
+    import pyarrow as pa
+
+    schema = pa.schema([(name, _arrow_type(values)) for name, values in table.items()])
+    _write_arrow(target, fmt, schema, _table_batches(table, schema, block_rows))
+
+
+# =======================
+# DESCARGAS
+# =======================
+def to_bytes(write, *args, **kwargs):
+    """Contenido de ``write(..., destino)`` como ``bytes`` (para ``st.download_button``)."""
+    import io
+
+    buffer = io.BytesIO()
+    write(*args, buffer, **kwargs)
+    return buffer.getvalue()
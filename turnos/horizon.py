@@ -0,0 +1,84 @@
+"""Horizonte de planificación: semanas, días y turnos por día.
+
+El modelo original usa 7 días × 3 turnos = 21 turnos, pero el horizonte puede
+ser de varias semanas y algunas salas trabajan con 2 o 4 turnos por día. La
+matriz (enfermeras × turnos) se ve como un cubo (enfermeras, días, turnos del
+día) con un ``reshape`` sin copia, y los agregados por día, por turno del día
+y por semana salen de una sola reducción sobre ese cubo.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+DAYS_PER_WEEK = 7
+
+
+@dataclass(frozen=True)
+class Horizon:
+    """Forma del horizonte: ``weeks`` semanas de 7 días con ``slots`` turnos."""
+
+    weeks: int = 1
+    slots: int = 3      # turnos por día
+
+    @property
+    def days(self):
+        return self.weeks * DAYS_PER_WEEK
+
+    @property
+    def week_len(self):
+        """Turnos por semana (el período de R1)."""
+        return DAYS_PER_WEEK * self.slots
+
+    @property
+    def shifts(self):
+        return self.days * self.slots
+
+    @classmethod
+    def from_shifts(cls, shifts, slots=3):
+        """Deduce el número de semanas a partir del total de turnos."""
+        weeks, rest = divmod(shifts, DAYS_PER_WEEK * slots)
+        if rest or not weeks:
+            raise ValueError(
+                f"{shifts} turnos no forman semanas completas de "
+                f"{DAYS_PER_WEEK} días × {slots} turnos."
+            )
+        return cls(weeks=weeks, slots=slots)
+
+    def cube(self, values):
+        """Vista (…, días, turnos del día) de un arreglo cuyo último eje son turnos.
+
+        Sobre la matriz Xij da el cubo (enfermeras, días, turnos); sobre la
+        cobertura por turno da la tabla (días, turnos).
+        """
+        values = np.asarray(values)
+        if values.shape[-1] != self.shifts:
+            raise ValueError(
+                f"Se esperaban {self.shifts} turnos ({self.weeks} semana(s) × "
+                f"{DAYS_PER_WEEK} días × {self.slots}), hay {values.shape[-1]}."
+            )
+        return values.reshape(values.shape[:-1] + (self.days, self.slots))
+
+    def aggregates(self, coverage):
+        """Totales por día, por turno del día y por semana desde la cobertura.
+
+        La cobertura por turno es la suma del cubo sobre el eje de enfermeras,
+        así que cada total es una reducción de la tabla (días, turnos).
+        """
+        table = self.cube(coverage)
+        return Aggregates(
+            table=table,
+            day_totals=table.sum(axis=1),
+            slot_totals=table.sum(axis=0),
+            week_totals=table.reshape(self.weeks, -1).sum(axis=1),
+        )
+
+
+@dataclass
+class Aggregates:
+    """Asignaciones agregadas sobre el cubo del horizonte."""
+
+    table: np.ndarray           # (días, turnos del día)
+    day_totals: np.ndarray      # (días,)
+    slot_totals: np.ndarray     # (turnos del día,)
+    week_totals: np.ndarray     # (semanas,)
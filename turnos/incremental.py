@@ -0,0 +1,158 @@
+"""Revalidación incremental cuando se editan celdas individuales de Xij.
+
+``EditableRoster`` calcula una sola vez (de forma vectorizada) las horas por
+enfermera y semana, la cobertura por turno, los totales por día y las sumas de
+las ventanas de R2. Después, cada cambio de celda actualiza esos agregados y
+los conjuntos de violaciones en O(``window``), sin recorrer la matriz.
+"""
+
+import numpy as np
+
+from turnos.loaders import INVALID
+from turnos.validation import (
+    REST_WINDOW,
+    SHIFT_HOURS,
+    WH,
+    _assemble,
+    _per_shift,
+    _week_len,
+)
+
+
+def _pairs(mask):
+    return set(zip(*(axis.tolist() for axis in np.nonzero(mask))))
+
+
+class EditableRoster:
+    """Matriz Xij editable con agregados y violaciones mantenidos al día."""
+
+    def __init__(self, X, week_len=None, slots=3, WH=WH, shift_hours=SHIFT_HOURS,
+                 nj_min=None, nj_max=None, window=REST_WINDOW):
+        values = np.asarray(X)
+        cells = np.where((values == 0) | (values == 1), values, INVALID).astype(np.uint8)
+        nurses, shifts = cells.shape
+        if shifts % slots:
+            raise ValueError(f"{shifts} turnos no forman días completos de {slots} turnos.")
+
+        self.cells = cells
+        self.week_len = _week_len(week_len, shifts)
+        self.slots = slots
+        self.window = window
+        self.edits = 0
+
+        worked = cells == 1
+        self.week_worked = worked.reshape(nurses, -1, self.week_len).sum(axis=2)
+        self.coverage = worked.sum(axis=0).astype(np.int64)
+        self.day_totals = self.coverage.reshape(-1, slots).sum(axis=1)
+
+        windows = max(shifts - window + 1, 0)
+        self.window_sum = np.zeros((nurses, windows), dtype=np.uint8)
+        for offset in range(window):
+            self.window_sum += worked[:, offset:offset + windows]
+
+        self.rest = _pairs(self.window_sum > 1)
+        self.invalid = _pairs(cells == INVALID)
+        self.set_limits(WH, shift_hours, nj_min, nj_max)
+
+    @property
+    def shape(self):
+        return self.cells.shape
+
+    @property
+    def windows(self):
+        return self.window_sum.shape[1]
+
+    def set_limits(self, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None, nj_max=None):
+        """Cambia WH, Nj(min) o Nj(max) reutilizando los agregados ya calculados."""
+        shifts = self.shape[1]
+        self.WH = WH
+        self.shift_hours = shift_hours
+        self.nj_min = _per_shift(nj_min, shifts, 0.0)
+        self.nj_max = _per_shift(nj_max, shifts, np.inf)
+        self.overworked = _pairs(self.week_worked * shift_hours > WH)
+        self.under = set(np.flatnonzero(self.coverage < self.nj_min).tolist())
+        self.over = set(np.flatnonzero(self.coverage > self.nj_max).tolist())
+
+    # =======================
+    # EDICIÓN
+    # =======================
+    def set(self, i, j, value):
+        """Asigna ``Xij = value`` y actualiza agregados y violaciones en O(window)."""
+        old = int(self.cells[i, j])
+        value = int(value)
+        if old == value:
+            return
+        self.cells[i, j] = value if value in (0, 1) else INVALID
+        self.edits += 1
+
+        if value in (0, 1):
+            self.invalid.discard((i, j))
+        else:
+            self.invalid.add((i, j))
+
+        delta = int(value == 1) - int(old == 1)
+        if not delta:
+            return
+
+        # R1 — horas de la semana de ese turno
+        week = j // self.week_len
+        self.week_worked[i, week] += delta
+        self._mark(self.overworked, (i, week),
+                   self.week_worked[i, week] * self.shift_hours > self.WH)
+
+        # R3 / R4 — cobertura del turno y total del día
+        self.coverage[j] += delta
+        self.day_totals[j // self.slots] += delta
+        self._mark(self.under, j, self.coverage[j] < self.nj_min[j])
+        self._mark(self.over, j, self.coverage[j] > self.nj_max[j])
+
+        # R2 — solo las ventanas que contienen el turno j
+        first = max(0, j - self.window + 1)
+        last = min(j, self.windows - 1)
+        for k in range(first, last + 1):
+            total = int(self.window_sum[i, k]) + delta
+            self.window_sum[i, k] = total
+            self._mark(self.rest, (i, k), total > 1)
+
+    def toggle(self, i, j):
+        """Cambia la celda entre 0 y 1 (una celda no binaria pasa a 1)."""
+        self.set(i, j, 0 if self.cells[i, j] == 1 else 1)
+
+    @staticmethod
+    def _mark(found, item, violated):
+        if violated:
+            found.add(item)
+        else:
+            found.discard(item)
+
+    # =======================
+    # RESULTADOS
+    # =======================
+    def counts(self):
+        """Violaciones por regla en O(1), como ``ValidationResult.counts``."""
+        return {
+            1: len(self.overworked),
+            2: len(self.rest),
+            3: len(self.under),
+            4: len(self.over),
+            5: len(self.invalid),
+        }
+
+    @property
+    def feasible(self):
+        return not any(self.counts().values())
+
+    def result(self):
+        """``ValidationResult`` equivalente a ``validate`` sobre la matriz editada."""
+        rest = np.array(sorted(self.rest), dtype=np.intp).reshape(-1, 2)
+        invalid = np.array(sorted(self.invalid), dtype=np.intp).reshape(-1, 2)
+        return _assemble(
+            self.week_worked.astype(np.int64) * self.shift_hours,
+            self.coverage,
+            (rest[:, 0], rest[:, 1]),
+            (invalid[:, 0], invalid[:, 1]),
+            self.WH,
+            self.nj_min,
+            self.nj_max,
+            self.week_len,
+        )
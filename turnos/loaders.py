@@ -0,0 +1,440 @@
+"""Lectura de matrices Xij desde Excel, Parquet, CSV y NumPy (``.npy``).
+
+Todas las rutas devuelven directamente una matriz compacta ``uint8``
+(enfermeras × turnos) sin pasar por un ``DataFrame`` de tipo ``object``. Las
+celdas válidas valen 0 o 1; cualquier otro valor (vacío, texto, 2, 0.5…) se
+guarda como ``INVALID`` para que la validación lo reporte en R5.
+
+Los roles dispersos (``.npz`` CSR o CSV/Parquet con columnas ``enfermera`` y
+``turno``, ver ``turnos.sparse``) también se leen aquí como matriz densa; para
+trabajar sin densificarlos se usa ``turnos.sparse.load_sparse``.
+"""
+
+import csv
+import os
+
+import numpy as np
+
+INVALID = 255           # código de celda no binaria
+EXCEL_BLOCK = 4096      # filas por bloque al leer Excel en modo streaming
+BLOCK_ROWS = 1 << 16    # filas por bloque en la lectura incremental (``iter_roster``)
+FORMATS = ("xlsx", "parquet", "csv", "npy", "npz")
+
+
+def to_cells(values):
+    """Convierte un arreglo numérico a ``uint8`` con 0, 1 o ``INVALID``."""
+    values = np.asarray(values)
+    if values.dtype == np.bool_:
+        return values.view(np.uint8)
+    if values.dtype == np.uint8:
+        return np.where(values <= 1, values, np.uint8(INVALID))
+    return np.where(
+        values == 1, np.uint8(1), np.where(values == 0, np.uint8(0), np.uint8(INVALID))
+    )
+
+
+def _extension(name):
+    return os.path.splitext(str(name))[1].lower().lstrip(".")
+
+
+def read_excel(source):
+    """Lee la primera hoja en modo ``read_only`` de openpyxl, por bloques.
+
+    Si la hoja declara sus dimensiones, la matriz se reserva una sola vez y se
+    llena bloque a bloque; así el pico de memoria queda cerca del tamaño final.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        out = np.empty((ws.max_row or 0, ws.max_column or 0), dtype=np.uint8)
+        used = 0
+        for cells in _excel_blocks(ws, EXCEL_BLOCK):
+            out = _store(out, used, cells)
+            used += cells.shape[0]
+    finally:
+        wb.close()
+    return out[:used]
+
+
+def iter_excel(source, block_rows=EXCEL_BLOCK):
+    """Genera la primera hoja en bloques ``uint8`` de ``block_rows`` filas."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        yield from _excel_blocks(wb.worksheets[0], block_rows)
+    finally:
+        wb.close()
+
+
+def _excel_blocks(ws, block_rows):
+    """Convierte las filas de la hoja en bloques ``uint8``.
+
+    Como ``pd.read_excel``, se descartan las filas vacías al final de la hoja;
+    las vacías intermedias se conservan (sus celdas quedan como ``INVALID``).
+    """
+    rows = ws.iter_rows(values_only=True)
+    width = ws.max_column
+    if not width:
+        first = next(rows, None)
+        if first is None:
+            return
+        width = len(first)
+        rows = _chain(first, rows)
+
+    block = np.empty((block_rows, width))
+    filled = pending = 0
+    for row in rows:
+        if all(v is None for v in row):
+            pending += 1
+            continue
+        row = _pad(row, width)
+        for values in [None] * pending + [row]:
+            if values is None:
+                block[filled] = np.nan
+            else:
+                try:
+                    block[filled] = values      # celdas numéricas o vacías (None → NaN)
+                except (TypeError, ValueError):
+                    block[filled] = [v if isinstance(v, (int, float)) else np.nan for v in values]
+            filled += 1
+            if filled == block_rows:
+                yield to_cells(block)
+                filled = 0
+        pending = 0
+    if filled:
+        yield to_cells(block[:filled])
+
+
+def _chain(first, rows):
+    yield first
+    yield from rows
+
+
+def _pad(row, width):
+    if len(row) >= width:
+        return row[:width]
+    return tuple(row) + (None,) * (width - len(row))
+
+
+def _store(out, start, cells):
+    """Copia ``cells`` en ``out[start:]``, ampliando ``out`` solo si hace falta."""
+    end = start + cells.shape[0]
+    if end > out.shape[0] or out.shape[1] != cells.shape[1]:
+        grown = np.empty((max(end, 2 * out.shape[0]), cells.shape[1]), dtype=np.uint8)
+        if start:
+            grown[:start] = out[:start]
+        out = grown
+    out[start:end] = cells
+    return out
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _parse_strings(column):
+    """Convierte celda a celda una columna de texto; lo que no es número queda NaN.
+
+    Se convierte cada valor distinto una sola vez (en un rol hay pocos: "0",
+    "1", vacío y algún error) y se reparte con sus índices.
+    """
+    import pyarrow.compute as pc
+
+    uniques = pc.unique(column)
+    parsed = np.array([_number(v) for v in uniques.to_pylist()] + [np.nan])
+    index = pc.fill_null(pc.index_in(column, value_set=uniques), len(uniques))
+    return parsed[index.to_numpy()]
+
+
+def _table_to_cells(table):
+    """Columna por columna de una tabla de Arrow a la matriz ``uint8``.
+
+    Las columnas de texto (alguna celda no numérica) se convierten celda a
+    celda: solo las celdas no numéricas quedan como ``INVALID``.
+    """
+    import pyarrow as pa
+
+    out = np.empty((table.num_rows, table.num_columns), dtype=np.uint8)
+    for j, column in enumerate(table.columns):
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            out[:, j] = to_cells(_parse_strings(column))
+            continue
+        try:
+            values = column.to_numpy(zero_copy_only=False)
+            out[:, j] = to_cells(values.astype(float))
+        except (TypeError, ValueError):
+            out[:, j] = INVALID
+    return out
+
+
+def _read_schema(source, fmt):
+    """Nombres de las columnas de un CSV (primera fila) o Parquet, sin leer los datos."""
+    start = source.tell() if hasattr(source, "seek") else None
+    try:
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetFile(source).schema_arrow.names
+        import pyarrow.csv as pcsv
+
+        return pcsv.open_csv(source).schema.names
+    finally:
+        if start is not None:
+            source.seek(start)
+
+
+def _read_table(source, fmt):
+    """Tabla completa de Arrow con la primera fila como encabezado (listas de asignaciones)."""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(source)
+    import pyarrow.csv as pcsv
+
+    return pcsv.read_csv(source)
+
+
+def _sparse(source, fmt):
+    """``SparseRoster`` si el archivo es una lista de asignaciones; si no, ``None``."""
+    from turnos.sparse import from_table
+
+    if not _sparse_names(source, fmt):
+        return None
+    roster = from_table(_read_table(source, fmt))
+    if roster.shifts % roster.week_len:     # semanas completas de 21 turnos
+        roster.shifts += roster.week_len - roster.shifts % roster.week_len
+    return roster
+
+
+def _sparse_names(source, fmt):
+    from turnos.sparse import assignment_columns
+
+    return assignment_columns(_read_schema(source, fmt)) is not None
+
+
+def _blocks(roster, block_rows):
+    for start in range(0, roster.nurses, block_rows):
+        yield roster.to_matrix(start, start + block_rows)
+
+
+def read_parquet(source):
+    import pyarrow.parquet as pq
+
+    roster = _sparse(source, "parquet")
+    if roster is not None:
+        return roster.to_matrix()
+    return _table_to_cells(pq.read_table(source))
+
+
+def read_csv(source):
+    """Lee un CSV sin encabezado con el lector de Arrow.
+
+    Si la primera fila no es numérica se interpreta como encabezado (salvo que
+    sea ``enfermera,turno``: entonces es una lista de asignaciones).
+    """
+    roster = _sparse(source, "csv")
+    if roster is not None:
+        return roster.to_matrix()
+    return _table_to_cells(_csv_reader(source).read_all())
+
+
+def iter_parquet(source, block_rows=BLOCK_ROWS):
+    import pyarrow.parquet as pq
+
+    roster = _sparse(source, "parquet")
+    if roster is not None:
+        yield from _blocks(roster, block_rows)
+        return
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=block_rows):
+        yield _table_to_cells(batch)
+
+
+def iter_csv(source, block_rows=BLOCK_ROWS):
+    """Genera el CSV por lotes de Arrow; ``block_rows`` es orientativo."""
+    roster = _sparse(source, "csv")
+    if roster is not None:
+        yield from _blocks(roster, block_rows)
+        return
+    for batch in _csv_reader(source, block_rows):
+        yield _table_to_cells(batch)
+
+
+def _first_line(source):
+    """Primera línea del CSV (ruta o archivo abierto), sin mover la posición de lectura."""
+    if not hasattr(source, "readline"):
+        with open(source, "rb") as f:
+            return f.readline()
+    start = source.tell()
+    try:
+        return source.readline()
+    finally:
+        source.seek(start)
+
+
+def _is_header(line):
+    """¿Es encabezado? Solo si ninguna celda de la fila es un número (y alguna tiene texto)."""
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="replace")
+    fields = [field.strip() for field in next(csv.reader([line]), [])]
+    return any(fields) and all(np.isnan(_number(field)) for field in fields if field)
+
+
+def _csv_reader(source, block_rows=None):
+    """Lector incremental de Arrow; salta la primera fila si es un encabezado.
+
+    La decisión se toma con la primera fila sola: una celda no numérica más
+    abajo no la convierte en encabezado (se reporta como ``INVALID``).
+    """
+    import pyarrow.csv as pcsv
+
+    if hasattr(source, "seek"):
+        start = source.tell()
+
+    def open_reader(skip_rows):
+        options = pcsv.ReadOptions(autogenerate_column_names=True, skip_rows=skip_rows)
+        if block_rows:
+            # ~2 bytes por celda ("0," / "1,") y unas 32 columnas por fila
+            options.block_size = max(block_rows * 64, 1 << 20)
+        if hasattr(source, "seek"):
+            source.seek(start)
+        return pcsv.open_csv(source, read_options=options)
+
+    return open_reader(1 if _is_header(_first_line(source)) else 0)
+
+
+def read_npy(source, mmap=True):
+    """Lee un ``.npy``; con una ruta y ``mmap=True`` se mapea en memoria.
+
+    Si el arreglo ya es ``bool`` o ``uint8`` binario se devuelve sin copiar.
+    """
+    if isinstance(source, (str, os.PathLike)) and mmap:
+        values = np.load(source, mmap_mode="r")
+    else:
+        values = np.load(source, allow_pickle=False)
+    if values.ndim != 2:
+        raise ValueError("El arreglo .npy debe tener dos dimensiones (enfermeras × turnos).")
+    if values.dtype == np.bool_:
+        return values.view(np.uint8)
+    if values.dtype == np.uint8 and not (values > 1).any():
+        return values
+    return to_cells(values)
+
+
+def iter_npy(source, block_rows=BLOCK_ROWS):
+    """Recorre un ``.npy`` por bloques (mapeado en memoria si es una ruta)."""
+    if isinstance(source, (str, os.PathLike)):
+        values = np.load(source, mmap_mode="r")
+    else:
+        values = np.load(source, allow_pickle=False)
+    if values.ndim != 2:
+        raise ValueError("El arreglo .npy debe tener dos dimensiones (enfermeras × turnos).")
+    for start in range(0, values.shape[0], block_rows):
+        yield to_cells(values[start:start + block_rows])
+
+
+def read_npz(source):
+    """Matriz CSR ``.npz`` (``turnos.sparse``) como matriz densa."""
+    from turnos.sparse import SparseRoster
+
+    return SparseRoster.load(source).to_matrix()
+
+
+def iter_npz(source, block_rows=BLOCK_ROWS):
+    """La matriz CSR queda completa en memoria; solo los bloques densos se acotan."""
+    from turnos.sparse import SparseRoster
+
+    yield from _blocks(SparseRoster.load(source), block_rows)
+
+
+READERS = {
+    "xlsx": read_excel,
+    "parquet": read_parquet,
+    "csv": read_csv,
+    "npy": read_npy,
+    "npz": read_npz,
+}
+
+
+ITERATORS = {
+    "xlsx": iter_excel,
+    "parquet": iter_parquet,
+    "csv": iter_csv,
+    "npy": iter_npy,
+    "npz": iter_npz,
+}
+
+
+def _format(source, name, table):
+    if name is None:
+        name = getattr(source, "name", source)
+    fmt = _extension(name)
+    if fmt not in table:
+        raise ValueError(
+            f"Formato no soportado: '.{fmt}'. Use uno de: {', '.join(FORMATS)}."
+        )
+    return fmt
+
+
+def iter_roster(source, name=None, block_rows=BLOCK_ROWS):
+    """Como ``load_roster``, pero genera la matriz en bloques de filas ``uint8``.
+
+    La memoria usada depende de ``block_rows`` y no del tamaño del archivo.
+    """
+    return ITERATORS[_format(source, name, ITERATORS)](source, block_rows)
+
+
+def roster_rows(source, name=None):
+    """Número de filas del archivo sin leerlo completo (``None`` si no se sabe).
+
+    Sirve para mostrar el avance de la lectura incremental; en CSV no se conoce
+    de antemano.
+    """
+    fmt = _format(source, name, ITERATORS)
+    start = source.tell() if hasattr(source, "seek") else None
+    try:
+        if fmt == "npy":
+            if start is None:
+                return np.load(source, mmap_mode="r").shape[0]
+            version = np.lib.format.read_magic(source)
+            if version == (1, 0):
+                shape, _, _ = np.lib.format.read_array_header_1_0(source)
+            else:
+                shape, _, _ = np.lib.format.read_array_header_2_0(source)
+            return shape[0]
+        if fmt == "npz":
+            with np.load(source, allow_pickle=False) as data:
+                return int(data["shape"][0])
+        if fmt in ("csv", "parquet") and _sparse_names(source, fmt):
+            return None
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetFile(source).metadata.num_rows
+        if fmt == "xlsx":
+            from openpyxl import load_workbook
+
+            wb = load_workbook(source, read_only=True)
+            try:
+                return wb.worksheets[0].max_row
+            finally:
+                wb.close()
+        return None
+    finally:
+        if start is not None:
+            source.seek(start)
+
+
+def load_roster(source, name=None):
+    """Lee una matriz Xij eligiendo el lector según la extensión.
+
+    ``source`` puede ser una ruta o un objeto tipo archivo (por ejemplo, lo
+    que devuelve ``st.file_uploader``); en ese caso ``name`` indica el nombre
+    original del archivo.
+    """
+    return READERS[_format(source, name, READERS)](source)
@@ -0,0 +1,249 @@
+"""Construcción y solución del modelo de turnos con ``scipy.optimize.milp``.
+
+El modelo del artículo es
+
+    Min  WH·TN − 8·Σ Xij
+    s.a. R1: 8·Σj Xij ≤ WH                    para cada enfermera i y semana
+         R2: Xi,k + Xi,k+1 + Xi,k+2 ≤ 1       para cada ventana k
+         R3/R4: Nj(min) ≤ Σi Xij ≤ Nj(max)     para cada turno j
+         R5: Xij ∈ {0, 1}
+
+La matriz de restricciones se arma directamente como matriz dispersa a partir
+de aritmética de índices (la variable Xij ocupa la columna ``i * shifts + j``),
+sin crear objetos de Python por variable, y se resuelve con HiGHS.
+
+Como en el modelo base todas las enfermeras son intercambiables, ``solve``
+usa por defecto una formulación agregada por patrones: se enumeran los
+horarios semanales que cumplen R1 y R2 y la variable entera es cuántas
+enfermeras siguen cada patrón. El tamaño de ese modelo no depende de TN, lo que
+evita la simetría de la formulación por enfermera.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from turnos.precheck import structural_reasons
+from turnos.validation import (
+    REST_WINDOW,
+    SHIFT_HOURS,
+    SHIFTS,
+    WH,
+    _per_shift,
+    _week_len,
+)
+
+MAX_PATTERN_SHIFTS = 24     # horizonte máximo para enumerar patrones (2**24 máscaras)
+
+# Códigos de estado de ``scipy.optimize.milp``
+STATUS = {
+    0: "Óptimo encontrado",
+    1: "Límite de tiempo o iteraciones alcanzado",
+    2: "Problema infactible",
+    3: "Problema no acotado",
+    4: "Otro error del solucionador",
+}
+
+
+@dataclass
+class OptimizationResult:
+    """Solución del modelo y métricas del solucionador."""
+
+    X: np.ndarray           # matriz (TN, shifts) uint8, o None si no hay solución
+    objective: float        # tiempo ocioso WH·TN·semanas − 8·Σ Xij (horas)
+    status: int
+    message: str
+    mip_gap: float
+    build_time: float       # segundos
+    solve_time: float       # segundos
+
+    @property
+    def success(self):
+        return self.X is not None
+
+
+def build_model(TN, shifts=SHIFTS, WH=WH, shift_hours=SHIFT_HOURS,
+                nj_min=None, nj_max=None, window=REST_WINDOW, week_len=None):
+    """Devuelve ``(c, constraints, integrality, bounds)`` listos para ``milp``.
+
+    Las filas de la matriz son, en orden: R1 (TN × semanas), R2 (TN ×
+    ventanas) y R3/R4 (una fila por turno con cota inferior y superior).
+    """
+    n = TN * shifts
+    week_len = _week_len(week_len, shifts)
+    weeks = shifts // week_len
+    nj_min = _per_shift(nj_min, shifts, 0.0)
+    nj_max = _per_shift(nj_max, shifts, np.inf)
+    var = np.arange(n).reshape(TN, shifts)
+
+    # R1 — una fila por enfermera y semana con los turnos de esa semana.
+    # 8·Σ Xij ≤ WH equivale (con Xij enteras) a Σ Xij ≤ ⌊WH / 8⌋, más ajustada.
+    r1_count = TN * weeks
+    r1_rows = np.repeat(np.arange(r1_count), week_len)
+    r1_cols = var.ravel()
+
+    # R2 — una fila por enfermera y ventana de ``window`` turnos consecutivos
+    windows = max(shifts - window + 1, 0)
+    r2_base = r1_count + np.arange(TN * windows)
+    r2_rows = np.repeat(r2_base, window)
+    starts = var[:, :windows].ravel()
+    r2_cols = (starts[:, None] + np.arange(window)).ravel()
+
+    # R3 / R4 — una fila por turno con todas las enfermeras
+    r3_base = r1_count + TN * windows
+    r3_rows = r3_base + np.tile(np.arange(shifts), TN)
+    r3_cols = var.ravel()
+
+    rows = np.concatenate([r1_rows, r2_rows, r3_rows])
+    cols = np.concatenate([r1_cols, r2_cols, r3_cols])
+    A = sparse.csr_array(
+        (np.ones(rows.shape[0]), (rows, cols)),
+        shape=(r3_base + shifts, n),
+    )
+
+    lb = np.concatenate([
+        np.full(r1_count, -np.inf),
+        np.full(TN * windows, -np.inf),
+        nj_min,
+    ])
+    ub = np.concatenate([
+        np.full(r1_count, np.floor(WH / shift_hours)),
+        np.ones(TN * windows),
+        nj_max,
+    ])
+
+    # Min WH·TN − 8·Σ Xij  ≡  Min −8·Σ Xij  (WH·TN es constante)
+    c = np.full(n, -float(shift_hours))
+    return c, LinearConstraint(A, lb, ub), np.ones(n), Bounds(0, 1)
+
+
+def feasible_patterns(shifts=SHIFTS, WH=WH, shift_hours=SHIFT_HOURS,
+                      window=REST_WINDOW):
+    """Matriz (patrones, shifts) uint8 con todos los horarios que cumplen R1 y R2.
+
+    Se filtran las ``2**shifts`` máscaras de bits: R1 limita el número de bits
+    encendidos y R2 exige que dos bits encendidos estén separados por al menos
+    ``window`` posiciones.
+    """
+    if shifts > MAX_PATTERN_SHIFTS:
+        raise ValueError(
+            f"Enumerar patrones solo es viable hasta {MAX_PATTERN_SHIFTS} turnos."
+        )
+    masks = np.arange(1 << shifts, dtype=np.uint32)
+    keep = np.bitwise_count(masks) <= WH // shift_hours
+    for gap in range(1, window):
+        keep &= (masks & (masks >> gap)) == 0
+    masks = masks[keep]
+    return ((masks[:, None] >> np.arange(shifts, dtype=np.uint32)) & 1).astype(np.uint8)
+
+
+def build_pattern_model(TN, patterns, shift_hours=SHIFT_HOURS, nj_min=None,
+                        nj_max=None):
+    """Formulación agregada: ``y_p`` = enfermeras que siguen el patrón ``p``.
+
+    Filas: Σ y_p = TN y, para cada turno, Nj(min) ≤ Σ y_p·P[p, j] ≤ Nj(max).
+    """
+    count, shifts = patterns.shape
+    nj_min = _per_shift(nj_min, shifts, 0.0)
+    nj_max = _per_shift(nj_max, shifts, np.inf)
+
+    A = sparse.vstack([
+        sparse.csr_array(np.ones((1, count))),
+        sparse.csr_array(patterns.T.astype(float)),
+    ]).tocsr()
+    lb = np.concatenate([[TN], nj_min])
+    ub = np.concatenate([[TN], nj_max])
+
+    c = -float(shift_hours) * patterns.sum(axis=1)
+    return c, LinearConstraint(A, lb, ub), np.ones(count), Bounds(0, TN)
+
+
+def solve(TN, shifts=SHIFTS, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None,
+          nj_max=None, window=REST_WINDOW, time_limit=60.0, mip_gap=1e-4,
+          formulation="auto", week_len=None, incumbent=None, check=True):
+    """Construye y resuelve el modelo; devuelve un ``OptimizationResult``.
+
+    ``time_limit`` está en segundos y ``mip_gap`` es la brecha relativa a
+    partir de la cual HiGHS acepta la solución incumbente. ``formulation``
+    puede ser ``"patterns"``, ``"nurses"`` (una variable por Xij) o
+    ``"auto"``, que usa patrones cuando el horizonte es de una semana y
+    permite enumerarlos. ``week_len`` es el número de turnos por semana.
+
+    ``incumbent`` es una matriz Xij factible ya conocida (por ejemplo, de una
+    instancia vecina en ``turnos.solutions``). ``milp`` no acepta soluciones
+    iniciales, así que se usa como corte del objetivo (Σ Xij ≥ Σ incumbente),
+    que poda el árbol de HiGHS, y se devuelve si el solucionador se detiene
+    sin encontrar otra solución.
+
+    Con ``check`` se corren antes las pruebas estructurales de
+    ``turnos.precheck`` (O(turnos)); si alguna falla se devuelve el estado 2
+    (infactible) con la razón en ``message``, sin construir el modelo.
+    """
+    week_len = _week_len(week_len, shifts)
+    single_week = week_len == shifts
+    if formulation == "auto":
+        formulation = (
+            "patterns" if single_week and shifts <= MAX_PATTERN_SHIFTS else "nurses"
+        )
+    if formulation == "patterns" and not single_week:
+        raise ValueError("La formulación por patrones solo admite horizontes de una semana.")
+
+    start = time.perf_counter()
+    if check:
+        reasons = structural_reasons(TN, shifts, WH, shift_hours, nj_min, nj_max, window, week_len)
+        if reasons:
+            return OptimizationResult(
+                X=None, objective=np.nan, status=2, message=f"{STATUS[2]} ({reasons[0]})",
+                mip_gap=0.0, build_time=time.perf_counter() - start, solve_time=0.0,
+            )
+    if formulation == "patterns":
+        patterns = feasible_patterns(shifts, WH, shift_hours, window)
+        c, constraints, integrality, bounds = build_pattern_model(
+            TN, patterns, shift_hours, nj_min, nj_max
+        )
+    else:
+        c, constraints, integrality, bounds = build_model(
+            TN, shifts, WH, shift_hours, nj_min, nj_max, window, week_len
+        )
+    if incumbent is not None:
+        # c·x = −8·Σ Xij en ambas formulaciones: el óptimo no es peor que el incumbente
+        cutoff = LinearConstraint(c[None, :], -np.inf, -float(shift_hours) * float(incumbent.sum()))
+        constraints = [constraints, cutoff]
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    res = milp(
+        c,
+        constraints=constraints,
+        integrality=integrality,
+        bounds=bounds,
+        options={"time_limit": time_limit, "mip_rel_gap": mip_gap, "disp": False},
+    )
+    solve_time = time.perf_counter() - start
+
+    if res.x is None and incumbent is not None:
+        X = np.asarray(incumbent, dtype=np.uint8)
+        objective = WH * TN * (shifts // week_len) - shift_hours * float(X.sum())
+    elif res.x is None:
+        X = None
+        objective = np.nan
+    else:
+        x = np.rint(res.x).astype(np.int64)
+        if formulation == "patterns":
+            X = np.repeat(patterns, x, axis=0)
+        else:
+            X = x.astype(np.uint8).reshape(TN, shifts)
+        objective = WH * TN * (shifts // week_len) - shift_hours * float(X.sum())
+
+    return OptimizationResult(
+        X=X,
+        objective=objective,
+        status=res.status,
+        message=STATUS.get(res.status, res.message),
+        mip_gap=float(getattr(res, "mip_gap", None) or 0.0),
+        build_time=build_time,
+        solve_time=solve_time,
+    )
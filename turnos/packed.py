@@ -0,0 +1,173 @@
+"""Representación compacta de Xij: un entero de 32 bits por enfermera y semana.
+
+Una semana tiene 21 turnos, así que la fila de cada enfermera cabe en un
+``uint32`` (el bit ``b`` es el turno ``b`` de la semana). Con esta forma:
+
+- R1 es un conteo de bits (``popcount``) por palabra.
+- R2 se evalúa con desplazamientos y máscaras sobre ventanas de turnos.
+- La cobertura por turno es la suma de cada columna de bits.
+
+Un horizonte de varias semanas usa una palabra por semana; una matriz de un
+millón de enfermeras por semana ocupa 4 MB.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from turnos.loaders import INVALID
+from turnos.validation import (
+    REST_WINDOW,
+    SHIFT_HOURS,
+    SHIFTS,
+    WH,
+    _assemble,
+    _per_shift,
+)
+
+WORD_BITS = 32
+PACK_BLOCK = 1 << 16    # filas por bloque al empaquetar
+
+
+@dataclass
+class PackedRoster:
+    """Matriz Xij empaquetada en bits."""
+
+    words: np.ndarray       # (nurses, weeks) uint32
+    shifts: int             # turnos totales del horizonte
+    invalid: np.ndarray     # (k, 2) int32 con las celdas no binarias (R5)
+    week_len: int = SHIFTS
+
+    @property
+    def nurses(self):
+        return self.words.shape[0]
+
+    @property
+    def weeks(self):
+        return self.words.shape[1]
+
+    @property
+    def shape(self):
+        return (self.nurses, self.shifts)
+
+    @classmethod
+    def from_matrix(cls, X, week_len=SHIFTS):
+        """Empaqueta una matriz (enfermeras × turnos) por bloques de filas."""
+        if week_len > WORD_BITS:
+            raise ValueError(f"Una semana de más de {WORD_BITS} turnos no cabe en uint32.")
+        values = np.asarray(X)
+        nurses, shifts = values.shape
+        weeks = -(-shifts // week_len)
+        nbytes = -(-week_len // 8)
+
+        words = np.empty((nurses, weeks), dtype=np.uint32)
+        invalid = []
+        for start in range(0, nurses, PACK_BLOCK):
+            block = values[start:start + PACK_BLOCK]
+            cells = block == 1
+            bad = np.argwhere(~(cells | (block == 0)))
+            if bad.size:
+                bad[:, 0] += start
+                invalid.append(bad.astype(np.int32))
+
+            cube = np.zeros((block.shape[0], weeks * week_len), dtype=bool)
+            cube[:, :shifts] = cells
+            packed = np.packbits(
+                cube.reshape(-1, weeks, week_len), axis=2, bitorder="little"
+            )
+            buf = np.zeros((block.shape[0], weeks, 4), dtype=np.uint8)
+            buf[..., :nbytes] = packed
+            words[start:start + PACK_BLOCK] = buf.view("<u4")[..., 0]
+
+        invalid = np.concatenate(invalid) if invalid else np.empty((0, 2), dtype=np.int32)
+        return cls(words=words, shifts=shifts, invalid=invalid, week_len=week_len)
+
+    def to_matrix(self, start=0, stop=None):
+        """Desempaqueta las filas ``start:stop`` a ``uint8`` (0, 1 o ``INVALID``)."""
+        out = self._unpack(self.words[start:stop])
+
+        first = start
+        last = self.nurses if stop is None else min(stop, self.nurses)
+        bad = self.invalid[(self.invalid[:, 0] >= first) & (self.invalid[:, 0] < last)]
+        out[bad[:, 0] - first, bad[:, 1]] = INVALID
+        return out
+
+    def take(self, rows):
+        """Desempaqueta solo las filas ``rows`` (índices de enfermera en orden creciente)."""
+        rows = np.asarray(rows, dtype=np.intp)
+        out = self._unpack(self.words[rows])
+        bad = self.invalid[np.isin(self.invalid[:, 0], rows)]
+        out[np.searchsorted(rows, bad[:, 0]), bad[:, 1]] = INVALID
+        return out
+
+    def column(self, j):
+        """Columna ``j`` de Xij (0, 1 o ``INVALID``) sin desempaquetar la matriz."""
+        week, bit = divmod(j, self.week_len)
+        out = ((self.words[:, week] >> np.uint32(bit)) & np.uint32(1)).astype(np.uint8)
+        out[self.invalid[self.invalid[:, 1] == j, 0]] = INVALID
+        return out
+
+    def _unpack(self, words):
+        raw = words.astype("<u4").view(np.uint8).reshape(words.shape[0], self.weeks, 4)
+        bits = np.unpackbits(raw, axis=2, bitorder="little")[..., :self.week_len]
+        return bits.reshape(words.shape[0], -1)[:, :self.shifts]
+
+    # =======================
+    # AGREGADOS
+    # =======================
+    def week_hours(self, shift_hours=SHIFT_HOURS):
+        """Horas por enfermera y semana: ``popcount`` de cada palabra."""
+        return np.bitwise_count(self.words).astype(np.int64) * shift_hours
+
+    def hours(self, shift_hours=SHIFT_HOURS):
+        return self.week_hours(shift_hours).sum(axis=1)
+
+    def coverage(self):
+        """Enfermeras por turno: suma de cada columna de bits."""
+        coverage = np.zeros(self.weeks * self.week_len, dtype=np.int64)
+        for bit in range(self.week_len):
+            column = (self.words >> np.uint32(bit)) & np.uint32(1)
+            coverage[bit::self.week_len] = column.sum(axis=0)
+        return coverage[:self.shifts]
+
+    def rest_violations(self, window=REST_WINDOW):
+        """Inicios de ventana de R2 con dos o más turnos, como ``(enfermeras, turnos)``.
+
+        Cada palabra se extiende con la semana siguiente (64 bits) para detectar
+        ventanas que cruzan el cambio de semana. Si los bits ``p`` y ``p + d``
+        están encendidos (``d < window``), violan todas las ventanas que empiezan
+        entre ``p + d − window + 1`` y ``p``.
+        """
+        if window - 1 > self.week_len:
+            raise ValueError("La ventana de R2 no puede superar la longitud de la semana.")
+        w = self.words.astype(np.uint64)
+        following = np.zeros_like(w)
+        following[:, :-1] = w[:, 1:]
+        ext = w | (following << np.uint64(self.week_len))
+
+        starts = np.zeros_like(w)
+        for d in range(1, window):
+            pairs = ext & (ext >> np.uint64(d))
+            for s in range(window - d):
+                starts |= pairs >> np.uint64(s)
+
+        # solo inicios dentro de la semana y con la ventana completa en el horizonte
+        last_start = self.shifts - window
+        first_shift = np.arange(self.weeks) * self.week_len
+        allowed = np.clip(last_start - first_shift + 1, 0, self.week_len).astype(np.uint64)
+        starts &= (np.uint64(1) << allowed) - np.uint64(1)
+
+        nurse, week = np.nonzero(starts)
+        bits = (starts[nurse, week][:, None] >> np.arange(self.week_len, dtype=np.uint64)) & np.uint64(1)
+        row, bit = np.nonzero(bits)
+        return nurse[row], week[row] * self.week_len + bit
+
+    def validate(self, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None, nj_max=None,
+                 window=REST_WINDOW):
+        """Mismo resultado que ``turnos.validate(..., week_len=self.week_len)``."""
+        nj_min = _per_shift(nj_min, self.shifts, 0.0)
+        nj_max = _per_shift(nj_max, self.shifts, np.inf)
+        r5 = (self.invalid[:, 0], self.invalid[:, 1])
+        return _assemble(self.week_hours(shift_hours), self.coverage(),
+                         self.rest_violations(window), r5, WH, nj_min, nj_max,
+                         self.week_len)
@@ -0,0 +1,162 @@
+"""Prechequeo de factibilidad y cota de la relajación lineal, antes del MILP.
+
+Muchas instancias son infactibles por razones estructurales que se detectan
+con sumas sobre los turnos, sin resolver nada. Cada enfermera trabaja a lo
+sumo ``k = min(⌊WH / horas⌋, ⌈semana / ventana⌉)`` turnos por semana (R1 y R2)
+y a lo sumo uno en cada ventana de ``window`` turnos consecutivos (R2), así que:
+
+- cada turno necesita ``Nj(min) ≤ Nj(max)`` y ``Nj(min) ≤ TN``;
+- cada ventana necesita ``Σ Nj(min) ≤ TN`` (suma deslizante);
+- cada semana necesita ``Σ Nj(min) ≤ TN · k``.
+
+Todas las pruebas cuestan O(turnos). Si ninguna falla, la relajación lineal
+da una cota inferior del tiempo ocioso: como las enfermeras son
+intercambiables, la relajación del modelo por enfermera equivale al PL sobre
+la cobertura ``c_j`` de cada turno (``max Σ c_j`` con los límites Nj, ``Σ c ≤
+TN`` por ventana y ``Σ c ≤ TN · ⌊WH / horas⌋`` por semana), que tiene un
+variable por turno y se resuelve en milisegundos. Un PL infactible también
+prueba que el modelo lo es.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from turnos.validation import REST_WINDOW, SHIFT_HOURS, SHIFTS, WH, _per_shift, _week_len
+
+MAX_REASONS = 10        # razones que se reportan por prueba (hay una por turno o ventana)
+
+
+@dataclass
+class Precheck:
+    """Resultado del prechequeo de una instancia del modelo."""
+
+    reasons: list = field(default_factory=list)   # razones demostradas de infactibilidad
+    bound: float = math.nan         # cota inferior del tiempo ocioso (h); nan si no se calculó
+    max_assignments: float = math.nan   # máximo de Σ Xij en la relajación lineal
+    available: float = 0.0          # WH · TN · semanas (tiempo ocioso sin asignaciones)
+    seconds: float = 0.0
+
+    @property
+    def infeasible(self):
+        """``True`` si se demostró que el modelo no tiene solución."""
+        return bool(self.reasons)
+
+    def idle(self, assignments, shift_hours=SHIFT_HOURS):
+        """Tiempo ocioso (objetivo del modelo) de un rol con ``assignments`` = Σ Xij."""
+        return self.available - shift_hours * float(assignments)
+
+    def gap(self, objective):
+        """Brecha relativa entre el tiempo ocioso ``objective`` de un rol y la cota.
+
+        Se mide como la brecha MIP de HiGHS: ``(objetivo − cota) / |objetivo|``.
+        Es una cota superior de cuánto se puede mejorar el rol (la cota de la
+        relajación puede no ser alcanzable con enteros).
+        """
+        if math.isnan(self.bound):
+            return math.nan
+        if abs(objective) < 1e-9:
+            return 0.0
+        return max(objective - self.bound, 0.0) / abs(objective)
+
+
+def _describe(kind, items, limit=MAX_REASONS):
+    shown = ", ".join(items[:limit])
+    more = f" y {len(items) - limit} más" if len(items) > limit else ""
+    return f"{kind}: {shown}{more}"
+
+
+def structural_reasons(TN, shifts=SHIFTS, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None,
+                       nj_max=None, window=REST_WINDOW, week_len=None):
+    """Razones de infactibilidad que se prueban con sumas en O(turnos)."""
+    week_len = _week_len(week_len, shifts)
+    nj_min = _per_shift(nj_min, shifts, 0.0)
+    nj_max = _per_shift(nj_max, shifts, np.inf)
+    reasons = []
+
+    crossed = np.flatnonzero(nj_min > nj_max)
+    if crossed.size:
+        reasons.append(_describe(
+            "Nj(min) mayor que Nj(max) en los turnos",
+            [f"{j + 1} ({nj_min[j]:g} > {nj_max[j]:g})" for j in crossed]))
+
+    short = np.flatnonzero(nj_min > TN)
+    if short.size:
+        reasons.append(_describe(
+            f"Nj(min) mayor que las {TN} enfermeras en los turnos",
+            [f"{j + 1} ({nj_min[j]:g})" for j in short]))
+
+    # R2: una enfermera cubre a lo sumo un turno de cada ventana
+    if 1 < window <= shifts:
+        sums = np.convolve(nj_min, np.ones(window), mode="valid")
+        crowded = np.flatnonzero(sums > TN)
+        if crowded.size:
+            reasons.append(_describe(
+                f"R2 permite un turno por enfermera cada {window} turnos, pero Σ Nj(min) "
+                f"supera TN = {TN} en las ventanas",
+                [f"{k + 1}–{k + window} ({sums[k]:g})" for k in crowded]))
+
+    # R1 y R2: turnos por enfermera y semana
+    per_week = min(math.floor(WH / shift_hours) if shift_hours > 0 else week_len,
+                   -(-week_len // max(window, 1)))
+    demand = nj_min.reshape(-1, week_len).sum(axis=1)
+    heavy = np.flatnonzero(demand > TN * per_week)
+    if heavy.size:
+        reasons.append(_describe(
+            f"Σ Nj(min) de la semana supera la capacidad TN × {per_week} turnos = "
+            f"{TN * per_week:g} en las semanas",
+            [f"{w + 1} ({demand[w]:g})" for w in heavy]))
+    return reasons
+
+
+def relaxation(TN, shifts=SHIFTS, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None, nj_max=None,
+               window=REST_WINDOW, week_len=None):
+    """Resuelve el PL de cobertura; devuelve ``(Σ c_j máximo, razón)``.
+
+    ``razón`` es ``None`` si el PL tiene solución y, si no, el motivo.
+    """
+    from scipy import sparse
+    from scipy.optimize import linprog
+
+    week_len = _week_len(week_len, shifts)
+    weeks = shifts // week_len
+    nj_min = _per_shift(nj_min, shifts, 0.0)
+    nj_max = np.minimum(_per_shift(nj_max, shifts, np.inf), TN)
+
+    windows = max(shifts - window + 1, 0) if window > 1 else 0
+    rows = [np.repeat(np.arange(windows), window), windows + np.repeat(np.arange(weeks), week_len)]
+    cols = [(np.arange(windows)[:, None] + np.arange(window)).ravel(), np.arange(shifts)]
+    A = sparse.csr_array((np.ones(sum(r.size for r in rows)),
+                          (np.concatenate(rows), np.concatenate(cols))),
+                         shape=(windows + weeks, shifts))
+    b = np.concatenate([np.full(windows, float(TN)),
+                        np.full(weeks, TN * math.floor(WH / shift_hours))])
+
+    res = linprog(-np.ones(shifts), A_ub=A, b_ub=b, bounds=np.column_stack([nj_min, nj_max]),
+                  method="highs")
+    if res.status == 2:
+        return math.nan, "La relajación lineal (cobertura por turno) es infactible."
+    if res.status != 0:
+        return math.nan, None       # sin cota (límite numérico); no prueba nada
+    return -float(res.fun), None
+
+
+def precheck(TN, shifts=SHIFTS, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None, nj_max=None,
+             window=REST_WINDOW, week_len=None, bound=True):
+    """Pruebas estructurales y, si pasan y ``bound``, la cota de la relajación lineal."""
+    start = time.perf_counter()
+    week_len = _week_len(week_len, shifts)
+    result = Precheck(available=float(WH) * TN * (shifts // week_len))
+    result.reasons = structural_reasons(TN, shifts, WH, shift_hours, nj_min, nj_max, window,
+                                        week_len)
+    if bound and not result.reasons:
+        total, reason = relaxation(TN, shifts, WH, shift_hours, nj_min, nj_max, window, week_len)
+        if reason is not None:
+            result.reasons.append(reason)
+        elif not math.isnan(total):
+            result.max_assignments = total
+            result.bound = result.available - shift_hours * total
+    result.seconds = time.perf_counter() - start
+    return result
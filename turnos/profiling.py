@@ -0,0 +1,155 @@
+"""Instrumentación por etapa de una ejecución del script.
+
+``StageTimer`` mide cada etapa marcada con ``timer.start("nombre")`` y guarda:
+
+- el tiempo de pared;
+- la variación y el pico de memoria durante la etapa, si ``tracemalloc`` está
+  activo (se enciende desde el panel; tiene un costo propio). ``tracemalloc``
+  es del proceso entero: ``MemoryTracing`` lo mantiene encendido mientras
+  alguna sesión lo pida;
+- los aciertos y fallos de la ``RosterCache`` durante la etapa (la caché se
+  comparte entre sesiones, así que otras sesiones pueden sumar).
+
+``start_profile`` y ``profile_report`` envuelven una ejecución completa con
+``cProfile`` y devuelven el reporte de ``pstats`` como texto.
+"""
+
+import cProfile
+import datetime
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+import weakref
+from dataclasses import asdict, dataclass
+
+
+@dataclass
+class Stage:
+    name: str
+    seconds: float
+    memory_delta: int = None    # bytes (None si tracemalloc no está activo)
+    memory_peak: int = None
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+class StageTimer:
+    """Registro de las etapas de una ejecución.
+
+    Como el script de Streamlit es plano, las etapas se marcan en secuencia:
+    ``start("nombre")`` cierra la etapa anterior (si la hay) y abre la nueva;
+    ``stop()`` cierra la última.
+    """
+
+    def __init__(self, page="", cache=None):
+        self.page = page
+        self.cache = cache
+        self.stages = []
+        self.started = time.perf_counter()
+        self._open = None
+
+    def start(self, name):
+        self.stop()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        self._open = (
+            name,
+            time.perf_counter(),
+            tracemalloc.get_traced_memory()[0] if tracing else None,
+            self.cache.hits if self.cache is not None else 0,
+            self.cache.misses if self.cache is not None else 0,
+        )
+
+    def stop(self):
+        if self._open is None:
+            return
+        name, start, before, hits, misses = self._open
+        self._open = None
+        record = Stage(name=name, seconds=time.perf_counter() - start)
+        if before is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            record.memory_delta = current - before
+            record.memory_peak = peak - before
+        if self.cache is not None:
+            record.cache_hits = self.cache.hits - hits
+            record.cache_misses = self.cache.misses - misses
+        self.stages.append(record)
+
+    @property
+    def total(self):
+        """Segundos desde que se creó el registro (toda la ejecución hasta ahora)."""
+        return time.perf_counter() - self.started
+
+    def to_dict(self):
+        return {
+            "page": self.page,
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "total_seconds": self.total,
+            "stages": [asdict(stage) for stage in self.stages],
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def append_jsonl(self, path):
+        """Agrega el registro como una línea JSON (para monitoreo externo)."""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(self.to_json() + "\n")
+
+
+class _Session:
+    """Identifica a una sesión; muere con su ``session_state``."""
+
+
+class MemoryTracing:
+    """``tracemalloc`` compartido: encendido mientras al menos una sesión lo pida.
+
+    Cada sesión guarda un ``session()`` en su estado y llama a
+    ``request(sesion, activo)`` en cada ejecución. Las sesiones se cuentan
+    con referencias débiles, así que una sesión cerrada deja de contar sin
+    avisar. Solo se apaga el trazado que se encendió aquí (no, p. ej., el de
+    ``python -X tracemalloc``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = weakref.WeakSet()
+        self._owned = False
+
+    @staticmethod
+    def session():
+        return _Session()
+
+    def request(self, session, enabled):
+        with self._lock:
+            if enabled:
+                self._sessions.add(session)
+            else:
+                self._sessions.discard(session)
+            if len(self._sessions) and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owned = True
+            elif not len(self._sessions) and self._owned:
+                tracemalloc.stop()
+                self._owned = False
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+def start_profile():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def profile_report(profiler, limit=40, sort="cumulative"):
+    """Detiene ``profiler`` y devuelve las ``limit`` funciones más costosas como texto."""
+    profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,219 @@
+"""Reparación de roles no factibles por búsqueda local.
+
+Se parte de la matriz Xij cargada (un ``EditableRoster``) y se cambian celdas
+una a una hasta que no quede ninguna violación, intentando cambiar lo menos
+posible respecto al rol original:
+
+1. Las celdas no binarias (R5) se ponen en 0.
+2. Búsqueda tabú: en cada iteración se toma una violación (R1, R2, R4 y por
+   último R3) y se evalúan todas las celdas que podrían corregirla: quitar un
+   turno de la semana o ventana excedida, quitar a una enfermera de un turno
+   sobrecubierto o asignar a una enfermera libre a un turno descubierto. Se
+   aplica el movimiento de menor costo que no esté en la lista tabú.
+3. Si la búsqueda se estanca, una vecindad grande (LNS) libera una semana de
+   algunas enfermeras al azar y la búsqueda vuelve a cubrir esos turnos.
+
+El costo de un movimiento se evalúa en O(``window``) con los agregados del
+``EditableRoster`` (turnos por semana, sumas de ventanas y cobertura), de forma
+vectorizada sobre todos los candidatos. Al final se vuelve al mejor estado
+encontrado.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+CHANGE_COST = 1e-3      # desempate: preferir celdas que vuelven a su valor original
+TABU_TENURE = 10        # iteraciones durante las que no se revierte un cambio
+PATIENCE = 200          # iteraciones sin mejorar antes de una perturbación (LNS)
+LNS_NURSES = 8          # enfermeras liberadas en cada perturbación
+SHORTLIST = 8           # mejores candidatos revisados antes de ordenar todos
+
+
+@dataclass
+class RepairReport:
+    """Resumen de una reparación."""
+
+    changes: np.ndarray     # (k, 3) enfermera, turno y valor nuevo respecto al original
+    before: dict            # violaciones por regla antes de reparar
+    after: dict             # violaciones por regla después
+    iterations: int
+    elapsed: float          # segundos
+
+    @property
+    def feasible(self):
+        return not any(self.after.values())
+
+
+class _Search:
+    def __init__(self, state, seed):
+        self.state = state
+        self.original = state.cells.copy()
+        self.allowed = np.floor(state.WH / state.shift_hours) if state.shift_hours else np.inf
+        self.rng = np.random.default_rng(seed)
+        self.tabu = {}
+        self.cost = self.total_cost()
+        self.best = self.cost
+        self.since_best = []        # (i, j, valor anterior) para volver al mejor estado
+
+    def total_cost(self):
+        s = self.state
+        r1 = np.maximum(s.week_worked - self.allowed, 0).sum()
+        r2 = np.maximum(s.window_sum.astype(np.int64) - 1, 0).sum()
+        r3 = np.maximum(s.nj_min - s.coverage, 0).sum()
+        r4 = np.maximum(s.coverage - s.nj_max, 0).sum()
+        return float(r1 + r2 + r3 + r4)
+
+    def delta(self, rows, cols, value):
+        """Cambio del costo al poner ``Xij = value`` en cada par ``(rows[k], cols[k])``."""
+        s = self.state
+        d = 1 if value == 1 else -1
+
+        worked = s.week_worked[rows, cols // s.week_len]
+        total = np.maximum(worked + d - self.allowed, 0) - np.maximum(worked - self.allowed, 0)
+
+        windows = s.windows
+        for offset in range(s.window):
+            k = cols - offset
+            inside = (k >= 0) & (k < windows)
+            ws = s.window_sum[rows, np.clip(k, 0, max(windows - 1, 0))].astype(np.int64) if windows else 0
+            total = total + np.where(inside, np.maximum(ws + d - 1, 0) - np.maximum(ws - 1, 0), 0)
+
+        cov = s.coverage[cols]
+        low, high = s.nj_min[cols], s.nj_max[cols]
+        total = total + np.maximum(low - cov - d, 0) - np.maximum(low - cov, 0)
+        total = total + np.maximum(cov + d - high, 0) - np.maximum(cov - high, 0)
+        return total + np.where(self.original[rows, cols] == value, -CHANGE_COST, CHANGE_COST)
+
+    def apply(self, i, j, value, delta, iteration):
+        s = self.state
+        self.since_best.append((i, j, int(s.cells[i, j])))
+        s.set(i, j, value)
+        self.tabu[(i, j)] = iteration + TABU_TENURE
+        self.cost += delta
+        if self.cost < self.best - 1e-9:
+            self.best = self.cost
+            self.since_best.clear()
+            return True
+        return False
+
+    def restore_best(self):
+        for i, j, old in reversed(self.since_best):
+            self.state.set(i, j, old)
+        self.since_best.clear()
+        self.cost = self.best
+
+    # =======================
+    # CANDIDATOS POR VIOLACIÓN
+    # =======================
+    def target(self):
+        """Una violación pendiente (regla, elemento); R3 al final porque agrega turnos."""
+        s = self.state
+        for rule, found in ((1, s.overworked), (2, s.rest), (4, s.over), (3, s.under)):
+            if found:
+                item = found.pop()      # ``pop`` avanza por el conjunto: recorre todas
+                found.add(item)
+                return rule, item
+        return None
+
+    def candidates(self, rule, item):
+        """Celdas ``(rows, cols)`` y el valor que tomarían para corregir la violación."""
+        s = self.state
+        if rule == 1:
+            i, week = item
+            start = week * s.week_len
+            cols = start + np.flatnonzero(s.cells[i, start:start + s.week_len] == 1)
+            return np.full(cols.shape, i), cols, 0
+        if rule == 2:
+            i, k = item
+            cols = k + np.flatnonzero(s.cells[i, k:k + s.window] == 1)
+            return np.full(cols.shape, i), cols, 0
+        j = item
+        value = 0 if rule == 4 else 1
+        rows = np.flatnonzero(s.cells[:, j] == 1 - value)
+        return rows, np.full(rows.shape, j), value
+
+    def choose(self, rows, cols, deltas, iteration):
+        """Índice del mejor candidato no tabú (o tabú que mejora el mejor costo)."""
+        def allowed(k):
+            return (self.tabu.get((int(rows[k]), int(cols[k])), -1) < iteration
+                    or self.cost + deltas[k] < self.best - 1e-9)
+
+        if deltas.shape[0] > SHORTLIST:
+            short = np.argpartition(deltas, SHORTLIST)[:SHORTLIST]
+            for k in short[np.argsort(deltas[short], kind="stable")]:
+                if allowed(k):
+                    return k
+        for k in np.argsort(deltas, kind="stable"):
+            if allowed(k):
+                return k
+        return None
+
+    def perturb(self, iteration):
+        """LNS: libera una semana de algunas enfermeras al azar."""
+        s = self.state
+        nurses, shifts = s.shape
+        week = int(self.rng.integers(shifts // s.week_len))
+        start = week * s.week_len
+        for i in self.rng.choice(nurses, size=min(LNS_NURSES, nurses), replace=False):
+            for j in start + np.flatnonzero(s.cells[i, start:start + s.week_len] == 1):
+                delta = float(self.delta(np.array([i]), np.array([j]), 0)[0])
+                self.apply(int(i), int(j), 0, delta, iteration)
+
+
+def repair(state, time_limit=10.0, max_iterations=None, seed=0):
+    """Repara en el lugar un ``EditableRoster`` hasta que cumpla R1 a R5.
+
+    Usa los límites ya configurados en ``state`` (``set_limits``). Termina al
+    encontrar un rol factible, al agotar ``time_limit`` segundos o
+    ``max_iterations``; en los dos últimos casos deja el mejor rol encontrado.
+    Los cambios quedan registrados en ``state.edits`` como cualquier edición.
+    """
+    start = time.perf_counter()
+    before = state.counts()
+    original = state.cells.copy()
+
+    # R5: las celdas no binarias pasan a 0 (si el turno queda descubierto, R3 lo repara)
+    for i, j in sorted(state.invalid):
+        state.set(i, j, 0)
+
+    search = _Search(state, seed)
+    iteration = stall = 0
+    while not state.feasible:
+        if max_iterations is not None and iteration >= max_iterations:
+            break
+        if time.perf_counter() - start > time_limit:
+            break
+        iteration += 1
+
+        rule, item = search.target()
+        rows, cols, value = search.candidates(rule, item)
+        k = None
+        if rows.shape[0]:
+            deltas = search.delta(rows, cols, value)
+            k = search.choose(rows, cols, deltas, iteration)
+        if k is None:
+            search.perturb(iteration)
+            continue
+
+        if search.apply(int(rows[k]), int(cols[k]), value, float(deltas[k]), iteration):
+            stall = 0
+        else:
+            stall += 1
+        if stall > PATIENCE:
+            search.perturb(iteration)
+            stall = 0
+
+    if not state.feasible:
+        search.restore_best()
+
+    changed = np.argwhere(state.cells != original)
+    changes = np.column_stack([changed, state.cells[changed[:, 0], changed[:, 1]]])
+    return RepairReport(
+        changes=changes.astype(np.int64),
+        before=before,
+        after=state.counts(),
+        iterations=iteration,
+        elapsed=time.perf_counter() - start,
+    )
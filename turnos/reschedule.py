@@ -0,0 +1,274 @@
+"""Reprogramación incremental cuando algunas enfermeras no pueden trabajar.
+
+A mitad de semana se parte del rol vigente Xij, de los pares ``(enfermera,
+turno)`` en los que alguien ya no está disponible y de los turnos pasados, que
+quedan congelados. Se busca el rol factible más parecido al vigente (el que
+cambia menos celdas) modificando solo la vecindad de las ausencias:
+
+1. Las celdas no disponibles se ponen en 0 y se calcula una cota inferior de
+   los cambios: las asignaciones quitadas más el déficit de cobertura que
+   dejan (cada enfermera que falta en un turno exige al menos un cambio).
+2. Arranque en caliente voraz: cada turno descubierto se cubre con enfermeras
+   libres a las que R1 y R2 les permiten tomarlo. Si lo consigue con tantos
+   cambios como la cota, el resultado es mínimo y no hace falta el MILP (el
+   caso habitual: una baja y colegas con horas libres).
+3. Si no, se resuelve un MILP de cambio mínimo solo sobre los turnos
+   ``[inicio, fin)`` alrededor de las ausencias (``radius`` turnos a cada lado,
+   sin entrar en los congelados), con todas las enfermeras. Las celdas fuera
+   de la vecindad son constantes que se descuentan de los límites de R1 y R2.
+   El resultado voraz se pasa como corte del objetivo, como el incumbente de
+   ``turnos.optimizer.solve``. Si la vecindad no tiene solución, se duplica
+   ``radius`` hasta cubrir todo el horizonte no congelado.
+
+Las violaciones que dependen solo de celdas congeladas (p. ej., horas de más en
+turnos ya trabajados) no se pueden corregir; quedan en ``check``.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from turnos.loaders import INVALID
+from turnos.optimizer import STATUS
+from turnos.validation import (
+    REST_WINDOW,
+    SHIFT_HOURS,
+    WH,
+    _per_shift,
+    _week_len,
+    validate,
+)
+
+RADIUS = 2 * REST_WINDOW    # turnos a cada lado de las ausencias en la primera vecindad
+
+
+@dataclass
+class RescheduleResult:
+    """Rol reprogramado y cómo se obtuvo."""
+
+    X: np.ndarray           # rol reprogramado (uint8), o None si no hay solución
+    changes: np.ndarray     # (k, 3) enfermera, turno y valor nuevo respecto al rol vigente
+    check: object           # ValidationResult del rol reprogramado (None si no hay)
+    start: int              # turnos [start, stop) que se reoptimizaron
+    stop: int
+    lower_bound: int        # cambios mínimos posibles según la cota
+    origin: str             # "voraz" (prueba de mínimo por la cota) o "solucionador"
+    status: int
+    message: str
+    build_time: float       # segundos
+    solve_time: float
+
+    @property
+    def success(self):
+        return self.X is not None
+
+
+def unavailable_mask(pairs, shape):
+    """Máscara booleana a partir de pares ``(enfermera, turno)`` 0-based."""
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    nurses, shifts = shape
+    outside = (pairs[:, 0] < 0) | (pairs[:, 0] >= nurses) | (pairs[:, 1] < 0) | (pairs[:, 1] >= shifts)
+    if outside.any():
+        i, j = pairs[np.argmax(outside)]
+        raise ValueError(f"El par (enfermera {i + 1}, turno {j + 1}) está fuera del rol "
+                         f"de {nurses} × {shifts}.")
+    mask = np.zeros(shape, dtype=bool)
+    mask[pairs[:, 0], pairs[:, 1]] = True
+    return mask
+
+
+def _inside(violations, start, stop, window, week_len):
+    """Filas de ``violations`` que tocan algún turno de ``[start, stop)``."""
+    shift, rule = violations[:, 1].astype(np.int64), violations[:, 2]
+    first = np.where(rule == 1, np.maximum(shift, 0), shift)
+    last = np.where(rule == 1, np.where(shift < 0, np.iinfo(np.int64).max, shift + week_len - 1),
+                    np.where(rule == 2, shift + window - 1, shift))
+    return (last >= start) & (first < stop)
+
+
+def _greedy(X, blocked, start, stop, cap, window, week_len, nj_min):
+    """Cubre los déficits de ``[start, stop)`` con enfermeras libres; ``None`` si no alcanza."""
+    X = X.copy()
+    worked = X == 1
+    week_worked = worked.reshape(X.shape[0], -1, week_len).sum(axis=2)
+    deficit = np.ceil(nj_min[start:stop] - worked[:, start:stop].sum(axis=0)).astype(np.int64)
+    for j in start + np.flatnonzero(deficit > 0):
+        lo, hi = max(j - window + 1, 0), min(j + window, X.shape[1])
+        free = (~worked[:, lo:hi].any(axis=1) & ~blocked[:, j] & (X[:, j] == 0)
+                & (week_worked[:, j // week_len] < cap))
+        candidates = np.flatnonzero(free)
+        need = deficit[j - start]
+        if candidates.shape[0] < need:
+            return None
+        # primero las enfermeras con menos turnos en la semana: reparte la carga
+        chosen = candidates[np.argsort(week_worked[candidates, j // week_len], kind="stable")[:need]]
+        X[chosen, j] = 1
+        worked[chosen, j] = True
+        week_worked[chosen, j // week_len] += 1
+    return X
+
+
+def build_model(X, blocked, start, stop, cap, nj_min, nj_max, window, week_len):
+    """MILP de cambio mínimo sobre los turnos ``[start, stop)``; ``(c, restricciones, cotas)``.
+
+    La variable de la celda ``(i, j)`` ocupa la columna ``i * (stop - start) + j - start``.
+    """
+    nurses, shifts = X.shape
+    width = stop - start
+    var = np.arange(nurses * width).reshape(nurses, width)
+    worked = X == 1
+    outside = worked.copy()
+    outside[:, start:stop] = False
+
+    # R1 — una fila por enfermera y semana de la vecindad; lo fijo fuera de la vecindad se descuenta
+    first_week, last_week = start // week_len, (stop - 1) // week_len
+    local_week = np.arange(start, stop) // week_len - first_week
+    weeks = last_week - first_week + 1
+    fixed = outside.reshape(nurses, -1, week_len).sum(axis=2)[:, first_week:last_week + 1]
+    r1_rows = (np.arange(nurses)[:, None] * weeks + local_week).ravel()
+    r1_cols = var.ravel()
+    r1_ub = np.maximum(cap - fixed, 0).ravel()
+
+    # R2 — ventanas que tocan la vecindad; las celdas de la ventana fuera de ella son fijas
+    first, last = max(start - window + 1, 0), min(stop - 1, shifts - window)
+    starts = np.arange(first, last + 1)
+    offsets = starts[:, None] + np.arange(window)
+    keep = (offsets >= start) & (offsets < stop)
+    k_idx, o_idx = np.nonzero(keep)
+    count = starts.shape[0]
+    base = nurses * weeks
+    r2_rows = (base + np.arange(nurses)[:, None] * count + k_idx).ravel()
+    r2_cols = var[:, offsets[k_idx, o_idx] - start].ravel()
+    window_fixed = np.zeros((nurses, count), dtype=np.int64)
+    for offset in range(window):
+        window_fixed += outside[:, starts + offset]
+    r2_ub = np.maximum(1 - window_fixed, 0).ravel()
+
+    # R3 / R4 — cobertura de cada turno de la vecindad (todas las enfermeras están en ella)
+    base += nurses * count
+    r3_rows = base + np.tile(np.arange(width), nurses)
+    r3_cols = var.ravel()
+
+    rows = np.concatenate([r1_rows, r2_rows, r3_rows])
+    cols = np.concatenate([r1_cols, r2_cols, r3_cols])
+    A = sparse.csr_array((np.ones(rows.shape[0]), (rows, cols)), shape=(base + width, var.size))
+    lb = np.concatenate([np.full(r1_ub.shape[0] + r2_ub.shape[0], -np.inf), nj_min[start:stop]])
+    ub = np.concatenate([r1_ub, r2_ub, nj_max[start:stop]])
+
+    # cambios = Σ_{X=1} (1 − x) + Σ_{X=0} x  →  c = 1 − 2·X (las celdas no binarias cambian siempre)
+    current = X[:, start:stop]
+    c = np.where(current == 1, -1.0, np.where(current == 0, 1.0, 0.0)).ravel()
+    upper = np.where(blocked[:, start:stop], 0.0, 1.0).ravel()
+    return c, LinearConstraint(A, lb, ub), Bounds(0, upper)
+
+
+def reschedule(X, unavailable, frozen=0, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None,
+               nj_max=None, window=REST_WINDOW, week_len=None, radius=RADIUS,
+               time_limit=30.0, mip_gap=0.0):
+    """Reprograma ``X`` sin las celdas ``unavailable`` y sin tocar los turnos ``< frozen``.
+
+    ``unavailable`` es una máscara booleana del tamaño de ``X`` o una lista de
+    pares ``(enfermera, turno)`` 0-based; los pares en turnos congelados se
+    ignoran (ya pasaron). Devuelve un ``RescheduleResult``.
+    """
+    start_time = time.perf_counter()
+    X = np.asarray(X)
+    X = np.where((X == 0) | (X == 1), X, INVALID).astype(np.uint8)
+    nurses, shifts = X.shape
+    week_len = _week_len(week_len, shifts)
+    nj_min = _per_shift(nj_min, shifts, 0.0)
+    nj_max = _per_shift(nj_max, shifts, np.inf)
+    cap = int(np.floor(WH / shift_hours)) if shift_hours > 0 else week_len
+    frozen = min(max(int(frozen), 0), shifts)
+
+    unavailable = np.asarray(unavailable)
+    if unavailable.dtype != np.bool_ or unavailable.shape != X.shape:
+        unavailable = unavailable_mask(unavailable, X.shape)
+    blocked = unavailable.copy()
+    blocked[:, :frozen] = False
+    affected = np.flatnonzero(blocked.any(axis=0))
+
+    def finish(result_X, start, stop, bound, origin, status, message, build_time, solve_time):
+        if result_X is None:
+            changes, check = np.empty((0, 3), dtype=np.int64), None
+        else:
+            changed = np.argwhere(result_X != X)
+            changes = np.column_stack([changed, result_X[changed[:, 0], changed[:, 1]]]).astype(np.int64)
+            check = validate(result_X, WH=WH, shift_hours=shift_hours, nj_min=nj_min,
+                             nj_max=nj_max, window=window, week_len=week_len)
+        return RescheduleResult(X=result_X, changes=changes, check=check, start=start, stop=stop,
+                                lower_bound=bound, origin=origin, status=status, message=message,
+                                build_time=build_time, solve_time=solve_time)
+
+    if affected.size == 0:
+        return finish(X.copy(), frozen, frozen, 0, "voraz", 0, "Sin ausencias que reprogramar",
+                      time.perf_counter() - start_time, 0.0)
+
+    # 1. Quitar las ausencias y acotar los cambios
+    start = max(int(affected[0]) - radius, frozen)
+    stop = min(int(affected[-1]) + radius + 1, shifts)
+    removed = X.copy()
+    removed[blocked] = np.where(removed[blocked] == INVALID, INVALID, 0)
+    forced = int(np.count_nonzero(blocked & (X == 1)))
+
+    def lower_bound(start, stop):
+        coverage = (removed[:, start:stop] == 1).sum(axis=0)
+        deficit = np.maximum(np.ceil(nj_min[start:stop]) - coverage, 0).sum()
+        return forced + int(deficit)
+
+    # 2. Arranque en caliente voraz; si alcanza la cota, es mínimo
+    bound = lower_bound(start, stop)
+    before = validate(X, WH=WH, shift_hours=shift_hours, nj_min=nj_min, nj_max=nj_max,
+                      window=window, week_len=week_len)
+    clean = not _inside(before.violations, start, stop, window, week_len).any()
+    incumbent = _greedy(removed, blocked, start, stop, cap, window, week_len, nj_min) if clean else None
+    greedy_changes = None
+    if incumbent is not None:
+        check = validate(incumbent, WH=WH, shift_hours=shift_hours, nj_min=nj_min,
+                         nj_max=nj_max, window=window, week_len=week_len)
+        if _inside(check.violations, start, stop, window, week_len).any():
+            incumbent = None
+        else:
+            greedy_changes = int(np.count_nonzero(incumbent != X))
+    if greedy_changes is not None and greedy_changes <= bound:
+        return finish(incumbent, start, stop, bound, "voraz", 0, STATUS[0],
+                      time.perf_counter() - start_time, 0.0)
+
+    # 3. MILP de cambio mínimo en la vecindad, ampliándola si no tiene solución
+    build_time = solve_time = 0.0
+    while True:
+        tick = time.perf_counter()
+        c, constraints, bounds = build_model(X, blocked, start, stop, cap, nj_min, nj_max,
+                                             window, week_len)
+        offset = float(np.count_nonzero(X[:, start:stop] != 0))
+        if greedy_changes is not None:
+            # el óptimo no cambia más celdas que el arranque voraz (fuera de la vecindad no cambia nada)
+            constraints = [constraints, LinearConstraint(c[None, :], -np.inf, greedy_changes - offset)]
+        build_time += time.perf_counter() - tick
+
+        tick = time.perf_counter()
+        remaining = max(time_limit - (tick - start_time), 1.0)
+        res = milp(c, constraints=constraints, integrality=np.ones_like(c), bounds=bounds,
+                   options={"time_limit": remaining, "mip_rel_gap": mip_gap, "disp": False})
+        solve_time += time.perf_counter() - tick
+
+        whole = start == frozen and stop == shifts
+        if res.status == 2 and not whole and time.perf_counter() - start_time < time_limit:
+            radius *= 2
+            start = max(int(affected[0]) - radius, frozen)
+            stop = min(int(affected[-1]) + radius + 1, shifts)
+            incumbent = greedy_changes = None       # la cota del corte era de la vecindad anterior
+            continue
+        break
+
+    bound = lower_bound(start, stop)
+    if res.x is not None:
+        result_X = X.copy()
+        result_X[:, start:stop] = np.rint(res.x).astype(np.uint8).reshape(nurses, stop - start)
+    else:
+        result_X = incumbent        # límite de tiempo: se devuelve el arranque voraz, si lo hay
+    return finish(result_X, start, stop, bound, "solucionador", res.status,
+                  STATUS.get(res.status, res.message), build_time, solve_time)
@@ -0,0 +1,152 @@
+"""Barrido de escenarios «¿qué pasaría si…?» sobre un rol real.
+
+Cada escenario combina WH, horas por turno, Nj(min), Nj(max) y la plantilla
+(número de enfermeras). Todo el barrido se evalúa con operaciones sobre
+arreglos a partir de dos resúmenes del rol que se calculan una sola vez:
+
+- el histograma de turnos trabajados por enfermera y semana (R1 para
+  cualquier WH y duración de turno es una suma de cola del histograma);
+- la cobertura por turno ordenada (R3 y R4 para cualquier Nj(min)/Nj(max)
+  son búsquedas binarias).
+
+Una plantilla distinta a la del rol se interpreta como la misma mezcla de
+horarios a otra escala: la cobertura de cada turno y las violaciones de R1,
+R2 y R5 se multiplican por ``plantilla / enfermeras del rol`` y se redondean
+hacia arriba: un rol con alguna violación no pasa a ser factible al reducir la
+plantilla.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from turnos.validation import REST_WINDOW
+
+MAX_SCENARIOS = 1_000_000
+
+
+@dataclass
+class Sweep:
+    """Resultados de un barrido: un elemento por escenario en cada arreglo."""
+
+    WH: np.ndarray
+    shift_hours: np.ndarray
+    nj_min: np.ndarray
+    nj_max: np.ndarray
+    headcount: np.ndarray
+    r1: np.ndarray          # enfermera-semanas por encima de WH
+    r2: np.ndarray
+    r3: np.ndarray          # turnos por debajo de Nj(min)
+    r4: np.ndarray          # turnos por encima de Nj(max)
+    r5: np.ndarray
+    idle: np.ndarray        # horas ociosas: WH·TN·semanas − horas asignadas
+
+    @property
+    def feasible(self):
+        return (
+            (self.r1 == 0) & (self.r2 == 0) & (self.r3 == 0) & (self.r4 == 0)
+            & (self.r5 == 0) & (self.nj_min <= self.nj_max)
+        )
+
+    def __len__(self):
+        return self.WH.shape[0]
+
+    def columns(self):
+        """Columnas de la tabla de resultados (para ``pd.DataFrame``)."""
+        return {
+            "WH": self.WH,
+            "Horas por turno": self.shift_hours,
+            "Nj(min)": self.nj_min,
+            "Nj(max)": self.nj_max,
+            "Plantilla": self.headcount,
+            "R1": self.r1,
+            "R2": self.r2,
+            "R3": self.r3,
+            "R4": self.r4,
+            "R5": self.r5,
+            "Horas ociosas": self.idle,
+            "Factible": self.feasible,
+        }
+
+    def frontier(self):
+        """Menor tiempo ocioso entre los escenarios factibles de cada plantilla.
+
+        Devuelve ``(plantillas, horas ociosas)`` solo para las plantillas con al
+        menos un escenario factible.
+        """
+        ok = self.feasible
+        headcount, idle = self.headcount[ok], self.idle[ok]
+        order = np.lexsort((idle, headcount))
+        headcount, idle = headcount[order], idle[order]
+        first = np.ones(headcount.shape[0], dtype=bool)
+        first[1:] = headcount[1:] != headcount[:-1]
+        return headcount[first], idle[first]
+
+
+def _values(values):
+    return np.atleast_1d(np.asarray(values, dtype=float))
+
+
+def sweep(worked, coverage, WH, shift_hours, nj_min, nj_max, headcount=None,
+          rest=0, invalid=0):
+    """Evalúa la malla completa de parámetros sobre un rol en una sola pasada.
+
+    ``worked`` son los turnos trabajados por enfermera y semana (enfermeras,
+    semanas) y ``coverage`` las enfermeras por turno. ``rest`` e ``invalid``
+    son las violaciones de R2 y R5 del rol, que no dependen de los parámetros.
+    Cada parámetro acepta un valor o una lista de valores; ``headcount`` por
+    omisión es el número de enfermeras del rol.
+    """
+    worked = np.asarray(worked)
+    coverage = np.asarray(coverage)
+    nurses, weeks = worked.shape
+    if headcount is None:
+        headcount = nurses
+
+    grid = np.meshgrid(_values(WH), _values(shift_hours), _values(nj_min),
+                       _values(nj_max), _values(headcount), indexing="ij")
+    size = grid[0].size
+    if size > MAX_SCENARIOS:
+        raise ValueError(f"El barrido tiene {size:,} escenarios; el máximo es {MAX_SCENARIOS:,}.")
+    WH, shift_hours, nj_min, nj_max, headcount = (axis.ravel() for axis in grid)
+    scale = headcount / nurses if nurses else np.zeros_like(headcount)
+
+    # R1: enfermera-semanas con más de floor(WH / horas) turnos (cola del histograma)
+    histogram = np.bincount(worked.ravel(), minlength=1)
+    tail = np.append(np.cumsum(histogram[::-1])[::-1], 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        allowed = np.floor(WH / shift_hours)
+    allowed = np.where(shift_hours > 0, allowed, np.inf)
+    first_over = np.clip(allowed + 1, 0, histogram.shape[0]).astype(np.intp)
+    r1 = tail[first_over] * scale
+
+    # R3 / R4: cobertura escalada comparada con los límites por búsqueda binaria
+    ordered = np.sort(coverage)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        low = np.where(scale > 0, nj_min / scale, np.where(nj_min > 0, np.inf, 0.0))
+        high = np.where(scale > 0, nj_max / scale, np.where(nj_max >= 0, np.inf, 0.0))
+    r3 = np.searchsorted(ordered, low, side="left")
+    r4 = ordered.shape[0] - np.searchsorted(ordered, high, side="right")
+
+    assigned = coverage.sum() * scale
+    return Sweep(
+        WH=WH,
+        shift_hours=shift_hours,
+        nj_min=nj_min,
+        nj_max=nj_max,
+        headcount=headcount,
+        r1=np.ceil(r1).astype(np.int64),
+        r2=np.ceil(rest * scale).astype(np.int64),
+        r3=r3,
+        r4=r4,
+        r5=np.ceil(invalid * scale).astype(np.int64),
+        idle=WH * headcount * weeks - shift_hours * assigned,
+    )
+
+
+def sweep_roster(roster, WH, shift_hours, nj_min, nj_max, headcount=None,
+                 window=REST_WINDOW):
+    """``sweep`` a partir de un ``PackedRoster``."""
+    rest = roster.rest_violations(window)[0].shape[0]
+    return sweep(np.bitwise_count(roster.words), roster.coverage(), WH, shift_hours,
+                 nj_min, nj_max, headcount, rest=rest, invalid=roster.invalid.shape[0])
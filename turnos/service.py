@@ -0,0 +1,238 @@
+"""Servicio HTTP local de validación de roles (Tornado sobre asyncio).
+
+Pensado para que varios sistemas de sala envíen roles a la vez, sin pasar por
+la interfaz de Streamlit::
+
+    python -m turnos serve --port 8000 --workers 4
+
+    POST /validate?format=npy&nj_min=10&nj_max=30   (cuerpo: archivo .npy/.csv/.parquet/.xlsx)
+    POST /validate                                  (cuerpo JSON: {"X": [[0, 1, …], …], "nj_min": 10})
+    GET  /health
+
+La respuesta es el mismo reporte de ``turnos.batch`` (veredicto, violaciones
+por regla, horas, cobertura). Con ``details=1`` incluye la lista de
+violaciones.
+
+El bucle de eventos no hace trabajo de CPU: el cuerpo se pasa tal cual a un
+``ProcessPoolExecutor``, donde se lee y se valida. Las solicitudes pequeñas se
+agrupan en lotes (hasta ``batch_size`` o ``batch_wait`` segundos) para que el
+costo fijo de enviar una tarea al pool se reparta. Hay a lo sumo dos lotes por
+proceso en vuelo; lo demás espera en una cola de ``max_pending`` solicitudes y,
+cuando está llena, se responde ``503`` con ``Retry-After`` en lugar de aceptar
+trabajo que solo haría crecer la latencia.
+"""
+
+import asyncio
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import tornado.web
+
+from turnos.batch import describe
+from turnos.loaders import FORMATS, load_roster, to_cells
+from turnos.validation import validate
+
+MAX_PENDING = 256           # solicitudes en cola antes de responder 503
+BATCH_SIZE = 32             # solicitudes pequeñas por tarea del pool
+BATCH_WAIT = 0.005          # segundos que se espera para completar un lote
+SMALL_BYTES = 256 * 2**10   # cuerpos hasta este tamaño se agrupan
+MAX_BODY = 256 * 2**20      # tamaño máximo del cuerpo
+TIMEOUT = 60.0              # segundos por solicitud (incluida la espera en cola)
+
+OPTIONS = {                 # parámetro → tipo (en la URL o en el cuerpo JSON)
+    "slots": int,
+    "WH": float,
+    "shift_hours": float,
+    "nj_min": float,
+    "nj_max": float,
+    "window": int,
+}
+
+
+def check_payload(body, fmt=None, details=False, **options):
+    """Lee y valida un cuerpo de solicitud; devuelve el reporte como ``dict``.
+
+    Sin ``fmt`` el cuerpo es JSON con la matriz en ``"X"`` (y, opcionalmente,
+    los mismos parámetros que la URL); si no, es un archivo en ese formato.
+    """
+    start = time.perf_counter()
+    try:
+        if fmt is None:
+            document = json.loads(body)
+            X = to_cells(np.asarray(document.pop("X"), dtype=float))
+            options.update({key: OPTIONS[key](value) for key, value in document.items()
+                            if key in OPTIONS and value is not None})
+        else:
+            X = load_roster(io.BytesIO(body), name=f"rol.{fmt}")
+        slots = options.pop("slots", 3)
+        result = validate(X, week_len=7 * slots, **options)
+        report = describe(result, slots)
+    except Exception as exc:    # la respuesta lleva el error; el proceso sigue atendiendo
+        return {"error": f"{type(exc).__name__}: {exc}",
+                "seconds": time.perf_counter() - start}
+    if details:
+        report["details"] = report["details"].tolist()
+    else:
+        del report["details"]
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def _check_batch(jobs):
+    """Tarea del pool: valida un lote de ``(cuerpo, formato, detalles, opciones)``."""
+    return [check_payload(body, fmt, details, **options) for body, fmt, details, options in jobs]
+
+
+class Overloaded(Exception):
+    """La cola de solicitudes está llena."""
+
+
+class Dispatcher:
+    """Cola acotada de solicitudes que se envían al pool en lotes."""
+
+    def __init__(self, pool, workers, max_pending=MAX_PENDING, batch_size=BATCH_SIZE,
+                 batch_wait=BATCH_WAIT):
+        self.pool = pool
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.in_flight = asyncio.Semaphore(2 * workers)
+        self.processed = 0
+        self.rejected = 0
+        self.batches = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def submit(self, job):
+        """Encola ``job`` y devuelve el futuro de su reporte; ``Overloaded`` si no cabe."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((job, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise Overloaded from None
+        return future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.in_flight.acquire()
+            batch = [await self.queue.get()]
+            if len(batch[0][0][0]) <= SMALL_BYTES:
+                deadline = loop.time() + self.batch_wait
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self.queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(self.queue.get(), remaining)
+                        except asyncio.TimeoutError:
+                            break
+                    batch.append(item)
+                    if len(item[0][0]) > SMALL_BYTES:
+                        break       # un cuerpo grande cierra el lote
+            # las solicitudes que ya vencieron (el cliente recibió 504) no se procesan
+            batch = [(job, future) for job, future in batch if not future.done()]
+            if not batch:
+                self.in_flight.release()
+                continue
+            self.batches += 1
+            work = loop.run_in_executor(self.pool, _check_batch, [job for job, _ in batch])
+            work.add_done_callback(lambda done, batch=batch: self._finish(done, batch))
+
+    def _finish(self, done, batch):
+        self.in_flight.release()
+        self.processed += len(batch)
+        try:
+            reports = done.result()
+        except Exception as exc:    # p. ej., un proceso del pool terminó de forma anormal
+            reports = [{"error": f"{type(exc).__name__}: {exc}"}] * len(batch)
+        for (_, future), report in zip(batch, reports):
+            if not future.done():
+                future.set_result(report)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "pending": self.queue.qsize(),
+            "max_pending": self.queue.maxsize,
+            "processed": self.processed,
+            "rejected": self.rejected,
+            "batches": self.batches,
+        }
+
+
+class JSONHandler(tornado.web.RequestHandler):
+    def write_error(self, status_code, **kwargs):
+        self.finish({"error": self._reason})
+
+
+class ValidateHandler(JSONHandler):
+    async def post(self):
+        fmt = self.get_query_argument("format", None)
+        if fmt is None and not self.request.headers.get("Content-Type", "").startswith(
+                "application/json"):
+            fmt = "npy"
+        if fmt is not None and fmt not in FORMATS:
+            raise tornado.web.HTTPError(400, reason=f"Formato no soportado: {fmt}")
+        try:
+            options = {key: cast(self.get_query_argument(key)) for key, cast in OPTIONS.items()
+                       if self.get_query_argument(key, None) is not None}
+        except ValueError as exc:
+            raise tornado.web.HTTPError(400, reason=str(exc)) from None
+        details = self.get_query_argument("details", "0") not in ("0", "false", "")
+
+        dispatcher = self.settings["dispatcher"]
+        try:
+            future = dispatcher.submit((self.request.body, fmt, details, options))
+        except Overloaded:
+            # se responde de inmediato: la cola llena es la señal para que el cliente espere
+            self.set_status(503, "Servicio saturado; intente de nuevo.")
+            self.set_header("Retry-After", "1")
+            self.finish({"error": self._reason})
+            return
+        try:
+            report = await asyncio.wait_for(asyncio.shield(future), self.settings["timeout"])
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise tornado.web.HTTPError(504, reason="La validación excedió el tiempo límite.") from None
+        if "error" in report:
+            self.set_status(422)
+        self.write(report)
+
+
+class HealthHandler(JSONHandler):
+    def get(self):
+        self.write(self.settings["dispatcher"].stats())
+
+
+def make_app(dispatcher, timeout=TIMEOUT):
+    return tornado.web.Application(
+        [(r"/validate", ValidateHandler), (r"/health", HealthHandler)],
+        dispatcher=dispatcher,
+        timeout=timeout,
+    )
+
+
+async def serve(port=8000, address="127.0.0.1", workers=None, max_pending=MAX_PENDING,
+                batch_size=BATCH_SIZE, batch_wait=BATCH_WAIT, timeout=TIMEOUT):
+    """Atiende solicitudes hasta que se cancele la tarea (Ctrl+C)."""
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        dispatcher = Dispatcher(pool, workers, max_pending, batch_size, batch_wait)
+        dispatcher.start()
+        server = make_app(dispatcher, timeout).listen(port, address, max_body_size=MAX_BODY)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            server.stop()
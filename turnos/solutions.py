@@ -0,0 +1,320 @@
+"""Caché en disco de soluciones del modelo, por hash canónico de los parámetros.
+
+La misma instancia (TN, WH, horas por turno, Nj(min)/Nj(max), ventana de
+descanso, semanas) se vuelve a pedir a lo largo del día; resolverla de nuevo
+cuesta segundos o minutos, leerla del disco, milisegundos. Cada solución se
+guarda como ``<hash>.npz`` (Xij comprimida) y sus metadatos en ``index.json``.
+
+- La clave es el hash de los parámetros en forma canónica (``model_params``):
+  Nj(min)/Nj(max) se expanden a un valor por turno y los números se pasan a
+  ``float``, así que ``10``, ``10.0`` y ``[10] * 21`` dan la misma clave. Las
+  opciones del solucionador no forman parte de la clave: una entrada solo se
+  reutiliza si es óptima con una brecha no mayor a la pedida.
+- Las entradas sin usar durante ``max_age`` segundos se borran, y si el total
+  supera ``max_bytes`` se borran las usadas hace más tiempo.
+- Las soluciones de instancias vecinas (mismos parámetros salvo Nj) sirven de
+  arranque en caliente: si el óptimo de una instancia con límites más holgados
+  cumple los nuevos límites, también es óptimo para la nueva; si no, cualquier
+  vecina factible se pasa a ``solve`` como incumbente.
+
+El índice se reescribe de forma atómica (``os.replace``); con varios procesos
+escribiendo a la vez se puede perder una entrada del índice, nunca corromperlo
+(los ``.npz`` huérfanos se borran en la siguiente expulsión).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from turnos.validation import REST_WINDOW, SHIFT_HOURS, SHIFTS, WH, _per_shift, _week_len
+
+MAX_BYTES = 256 * 2**20     # 256 MB en disco
+MAX_AGE = 7 * 24 * 3600     # una semana sin usarse
+NEIGHBOURS = 5              # vecinas que se prueban como incumbente
+INDEX = "index.json"
+
+
+def default_path():
+    """Carpeta por omisión: ``TURNOS_SOLUTION_CACHE`` o la caché del usuario, fuera del repositorio."""
+    if os.environ.get("TURNOS_SOLUTION_CACHE"):
+        return os.environ["TURNOS_SOLUTION_CACHE"]
+    base = (os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+            or os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "turnos", "soluciones")
+
+
+def model_params(TN, shifts=SHIFTS, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None,
+                 nj_max=None, window=REST_WINDOW, week_len=None):
+    """Parámetros del modelo en forma canónica, solo con tipos de JSON."""
+    nj_max = _per_shift(nj_max, shifts, np.inf)
+    return {
+        "TN": int(TN),
+        "shifts": int(shifts),
+        "WH": float(WH),
+        "shift_hours": float(shift_hours),
+        "nj_min": _per_shift(nj_min, shifts, 0.0).tolist(),
+        "nj_max": [None if np.isinf(v) else v for v in nj_max.tolist()],   # JSON no tiene inf
+        "window": int(window),
+        "week_len": _week_len(week_len, shifts),
+    }
+
+
+def params_hash(params):
+    text = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _family(params):
+    """Todo salvo Nj: las instancias de la misma familia comparten R1, R2 y R5."""
+    return {key: value for key, value in params.items() if key not in ("nj_min", "nj_max")}
+
+
+def _limits(params):
+    nj_min = np.asarray(params["nj_min"], dtype=float)
+    nj_max = np.array([np.inf if v is None else v for v in params["nj_max"]], dtype=float)
+    return nj_min, nj_max
+
+
+class SolutionCache:
+    """Soluciones del modelo en la carpeta ``path``, seguras entre hilos."""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, max_age=MAX_AGE):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._index = {}
+        self._mtime = None
+        self.hits = 0
+        self.misses = 0
+        with self._lock:
+            self._refresh()
+            self._evict()
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    @property
+    def current_bytes(self):
+        with self._lock:
+            self._refresh()
+            return sum(entry["bytes"] for entry in self._index.values())
+
+    # -- índice ---------------------------------------------------------------
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.npz")
+
+    def _refresh(self):
+        """Relee ``index.json`` si otro proceso lo cambió."""
+        try:
+            mtime = os.stat(os.path.join(self.path, INDEX)).st_mtime_ns
+        except FileNotFoundError:
+            self._index, self._mtime = {}, None
+            return
+        if mtime != self._mtime:
+            try:
+                with open(os.path.join(self.path, INDEX), encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}        # índice dañado: se reconstruye con las nuevas entradas
+            self._mtime = mtime
+
+    def _save(self):
+        target = os.path.join(self.path, INDEX)
+        temp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(temp, target)
+        self._mtime = os.stat(target).st_mtime_ns
+
+    def _evict(self):
+        now = time.time()
+        doomed = {key for key, entry in self._index.items() if now - entry["used"] > self.max_age}
+        total = sum(entry["bytes"] for key, entry in self._index.items() if key not in doomed)
+        for key in sorted(self._index, key=lambda key: self._index[key]["used"]):
+            if total <= self.max_bytes:
+                break
+            if key not in doomed:
+                doomed.add(key)
+                total -= self._index[key]["bytes"]
+        for key in doomed:
+            del self._index[key]
+            try:
+                os.remove(self._file(key))
+            except FileNotFoundError:
+                pass
+        # archivos sin entrada en el índice (escrituras concurrentes o interrumpidas)
+        for name in os.listdir(self.path):
+            stem, ext = os.path.splitext(name)
+            if ext in (".npz", ".tmp") and stem not in self._index:
+                try:
+                    if now - os.path.getmtime(os.path.join(self.path, name)) > 60:
+                        os.remove(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    pass
+        if doomed:
+            self._save()
+
+    def _load(self, key):
+        try:
+            with np.load(self._file(key)) as data:
+                return data["X"]
+        except (OSError, KeyError, ValueError):
+            return None
+
+    # -- consulta -------------------------------------------------------------
+
+    def get(self, params, mip_gap=None):
+        """``OptimizationResult`` óptimo guardado para ``params`` o ``None``."""
+        from turnos.optimizer import OptimizationResult
+
+        key = params_hash(params)
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(key)
+            usable = (entry is not None and entry["status"] == 0
+                      and (mip_gap is None or entry["mip_gap"] <= mip_gap))
+            X = self._load(key) if usable else None
+            if X is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry["used"] = time.time()
+            self._save()
+        return OptimizationResult(X=X, objective=entry["objective"], status=0,
+                                  message=entry["message"], mip_gap=entry["mip_gap"],
+                                  build_time=0.0, solve_time=0.0)
+
+    def put(self, params, result):
+        """Guarda ``result`` (con solución) para ``params`` y aplica la expulsión."""
+        if result.X is None:
+            return
+        key = params_hash(params)
+        temp = f"{self._file(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as f:
+            np.savez_compressed(f, X=np.asarray(result.X, dtype=np.uint8))
+        os.replace(temp, self._file(key))
+        now = time.time()
+        with self._lock:
+            self._refresh()
+            self._index[key] = {
+                "params": params,
+                "objective": float(result.objective),
+                "status": int(result.status),
+                "message": result.message,
+                "mip_gap": float(result.mip_gap),
+                "solve_time": float(result.build_time + result.solve_time),
+                "bytes": os.path.getsize(self._file(key)),
+                "created": now,
+                "used": now,
+            }
+            self._save()
+            self._evict()
+
+    def neighbours(self, params, limit=NEIGHBOURS):
+        """Soluciones guardadas de la misma familia, de la más cercana en Nj a la más lejana.
+
+        Devuelve tuplas ``(entrada, X)``; ``entrada`` es el diccionario del índice.
+        """
+        family = _family(params)
+        nj_min, nj_max = _limits(params)
+        with self._lock:
+            self._refresh()
+            close = []
+            for key, entry in self._index.items():
+                if _family(entry["params"]) != family:
+                    continue
+                other_min, other_max = _limits(entry["params"])
+                with np.errstate(invalid="ignore"):
+                    gaps = np.abs(np.concatenate([nj_min - other_min, nj_max - other_max]))
+                distance = float(np.nan_to_num(gaps, nan=0.0, posinf=1e9).sum())
+                close.append((distance, key, entry))
+            close.sort(key=lambda item: item[0])
+            found = []
+            for _, key, entry in close[:limit]:
+                X = self._load(key)
+                if X is not None:
+                    found.append((entry, X))
+        return found
+
+    def warm_start(self, params, mip_gap=None):
+        """``(resultado, incumbente)`` a partir de las vecinas de ``params``.
+
+        ``resultado`` es un ``OptimizationResult`` óptimo cuando una vecina óptima
+        tenía límites más holgados (su región factible contiene a la nueva) y su
+        solución cumple los nuevos; ``incumbente`` es la mejor Xij vecina que
+        cumple los nuevos límites. Cualquiera de los dos puede ser ``None``.
+        """
+        from turnos.optimizer import OptimizationResult
+
+        nj_min, nj_max = _limits(params)
+        weeks = params["shifts"] // params["week_len"]
+        incumbent = None
+        for entry, X in self.neighbours(params):
+            # R1, R2 y R5 dependen solo de la familia; basta revisar la cobertura
+            coverage = X.sum(axis=0)
+            if np.any(coverage < nj_min) or np.any(coverage > nj_max):
+                continue
+            other_min, other_max = _limits(entry["params"])
+            looser = np.all(other_min <= nj_min) and np.all(other_max >= nj_max)
+            if (looser and entry["status"] == 0
+                    and (mip_gap is None or entry["mip_gap"] <= mip_gap)):
+                objective = (params["WH"] * params["TN"] * weeks
+                             - params["shift_hours"] * float(X.sum()))
+                result = OptimizationResult(X=X, objective=objective, status=0,
+                                            message=entry["message"], mip_gap=entry["mip_gap"],
+                                            build_time=0.0, solve_time=0.0)
+                return result, X
+            if incumbent is None or X.sum() > incumbent.sum():
+                incumbent = X
+        return None, incumbent
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                try:
+                    os.remove(self._file(key))
+                except FileNotFoundError:
+                    pass
+            self._index = {}
+            self._save()
+            self.hits = self.misses = 0
+
+
+def cached_solve(cache, TN, shifts=SHIFTS, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None,
+                 nj_max=None, window=REST_WINDOW, time_limit=60.0, mip_gap=1e-4,
+                 formulation="auto", week_len=None):
+    """``turnos.solve`` con la caché ``cache``; devuelve ``(resultado, origen)``.
+
+    ``origen`` es ``"caché"`` (misma instancia), ``"vecina"`` (óptimo de una
+    instancia con límites más holgados que cumple los nuevos) o
+    ``"solucionador"``; en este último caso el resultado se guarda en la caché.
+    """
+    params = model_params(TN, shifts, WH, shift_hours, nj_min, nj_max, window, week_len)
+    start = time.perf_counter()
+    result = cache.get(params, mip_gap)
+    if result is not None:
+        result.solve_time = time.perf_counter() - start
+        return result, "caché"
+
+    result, incumbent = cache.warm_start(params, mip_gap)
+    if result is not None:
+        result.solve_time = time.perf_counter() - start
+        cache.put(params, result)
+        return result, "vecina"
+
+    from turnos.optimizer import solve
+
+    result = solve(TN, shifts=shifts, WH=WH, shift_hours=shift_hours, nj_min=nj_min,
+                   nj_max=nj_max, window=window, time_limit=time_limit, mip_gap=mip_gap,
+                   formulation=formulation, week_len=week_len, incumbent=incumbent)
+    cache.put(params, result)
+    return result, "solucionador"
@@ -0,0 +1,376 @@
+"""Xij como lista de asignaciones (formato CSR): solo se guardan los unos.
+
+Cada enfermera trabaja a lo sumo 5 de los 21 turnos de la semana, y en roles
+de varias sedes cada enfermera aparece solo en las columnas de la suya, así que
+la matriz densa es casi toda ceros. ``SparseRoster`` guarda, como una matriz
+CSR sin valores, los turnos asignados de cada enfermera (``indices``, en orden
+creciente) y dónde empieza cada enfermera (``indptr``). Los agregados y las
+reglas cuestan tiempo proporcional al número de asignaciones:
+
+- R1 y la cobertura son conteos (``bincount``) de las asignaciones;
+- R2 solo mira pares de asignaciones consecutivas de la misma enfermera;
+- R5 son las entradas con un valor distinto de 0 y 1, guardadas aparte.
+
+El resultado es el mismo ``ValidationResult`` que ``turnos.validate`` sobre la
+matriz densa. Se lee de:
+
+- ``.npz`` con la matriz CSR (el formato de ``scipy.sparse.save_npz``);
+- CSV o Parquet con columnas ``enfermera`` y ``turno`` (1-based, como en el
+  modelo) y, opcionalmente, ``valor``;
+- cualquier matriz densa, por bloques, con ``SparseRoster.from_matrix``.
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from turnos.loaders import INVALID
+from turnos.validation import (
+    REST_WINDOW,
+    SHIFT_HOURS,
+    SHIFTS,
+    WH,
+    _assemble,
+    _per_shift,
+    _week_len,
+)
+
+SPARSE_BLOCK = 1 << 16      # filas por bloque al convertir una matriz densa
+ASSIGNMENT_COLUMNS = (("enfermera", "turno", "valor"), ("nurse", "shift", "value"))
+
+
+def _index_dtype(shifts):
+    return np.uint16 if shifts <= np.iinfo(np.uint16).max else np.uint32
+
+
+def _sorted_unique(keys):
+    """Como ``np.unique`` para claves enteras, sin ordenar si ya vienen en orden."""
+    keys = np.asarray(keys, dtype=np.int64)
+    if keys.size > 1 and np.any(keys[1:] < keys[:-1]):
+        keys = np.sort(keys)
+    if keys.size > 1:
+        keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+    return keys
+
+
+@dataclass
+class SparseRoster:
+    """Matriz Xij como lista CSR de asignaciones."""
+
+    indptr: np.ndarray      # (nurses + 1,) int64: asignaciones de la enfermera i en indptr[i]:indptr[i+1]
+    indices: np.ndarray     # (asignaciones,) uint16/uint32: turno de cada asignación
+    shifts: int             # turnos totales del horizonte
+    invalid: np.ndarray     # (k, 2) int32 con las celdas no binarias (R5)
+    week_len: int = SHIFTS
+
+    @property
+    def nurses(self):
+        return self.indptr.shape[0] - 1
+
+    @property
+    def shape(self):
+        return (self.nurses, self.shifts)
+
+    @property
+    def nnz(self):
+        return self.indices.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.invalid.nbytes
+
+    def _rows(self):
+        """Enfermera de cada asignación (el inverso de ``indptr``)."""
+        return np.repeat(np.arange(self.nurses), np.diff(self.indptr))
+
+    # =======================
+    # CONSTRUCCIÓN
+    # =======================
+    @classmethod
+    def from_pairs(cls, nurse, shift, values=None, nurses=None, shifts=None, week_len=SHIFTS):
+        """Desde listas paralelas de enfermera y turno (0-based).
+
+        Con ``values``, las entradas 0 se ignoran y las que no son 0 ni 1 van a
+        R5. Las asignaciones repetidas cuentan una sola vez. ``nurses`` y
+        ``shifts`` se deducen de los índices si se omiten.
+        """
+        nurse = np.asarray(nurse, dtype=np.int64)
+        shift = np.asarray(shift, dtype=np.int64)
+        if nurse.shape != shift.shape:
+            raise ValueError("Las listas de enfermeras y turnos deben tener la misma longitud.")
+        if nurse.size and (nurse.min() < 0 or shift.min() < 0):
+            raise ValueError("Los índices de enfermera y turno deben ser positivos.")
+        nurses = int(nurse.max()) + 1 if nurses is None and nurse.size else nurses or 0
+        shifts = int(shift.max()) + 1 if shifts is None and shift.size else shifts or 0
+        if nurse.size and (nurse.max() >= nurses or shift.max() >= shifts):
+            raise ValueError(f"Hay asignaciones fuera de la matriz de {nurses} × {shifts}.")
+
+        invalid = np.empty((0, 2), dtype=np.int32)
+        if values is not None:
+            values = np.asarray(values, dtype=float)
+            ones = values == 1
+            bad = ~(ones | (values == 0))
+            if bad.any():
+                cells = _sorted_unique(nurse[bad] * shifts + shift[bad])
+                invalid = np.stack(np.divmod(cells, shifts), axis=1).astype(np.int32)
+            nurse, shift = nurse[ones], shift[ones]
+
+        cells = _sorted_unique(nurse * shifts + shift)  # orden por fila y turno, sin repetidas
+        rows, cols = np.divmod(cells, shifts) if shifts else (cells, cells)
+        indptr = np.zeros(nurses + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=nurses), out=indptr[1:])
+        return cls(indptr=indptr, indices=cols.astype(_index_dtype(shifts)), shifts=shifts,
+                   invalid=invalid, week_len=week_len)
+
+    @classmethod
+    def from_matrix(cls, X, week_len=SHIFTS):
+        """Desde una matriz densa (enfermeras × turnos), por bloques de filas."""
+        values = np.asarray(X)
+        nurses, shifts = values.shape
+        counts, indices, invalid = [], [], []
+        for start in range(0, nurses, SPARSE_BLOCK):
+            block = values[start:start + SPARSE_BLOCK]
+            ones = block == 1
+            rows, cols = np.nonzero(ones)
+            counts.append(np.bincount(rows, minlength=block.shape[0]))
+            indices.append(cols.astype(_index_dtype(shifts)))
+            bad = np.argwhere(~(ones | (block == 0)))
+            if bad.size:
+                bad[:, 0] += start
+                invalid.append(bad.astype(np.int32))
+        return cls._assemble_blocks(counts, indices, invalid, nurses, shifts, week_len)
+
+    @classmethod
+    def from_blocks(cls, blocks, week_len=SHIFTS):
+        """Desde bloques densos de filas (``turnos.loaders.iter_roster``).
+
+        Solo un bloque denso está en memoria a la vez.
+        """
+        counts, indices, invalid = [], [], []
+        nurses, shifts = 0, None
+        for block in blocks:
+            part = cls.from_matrix(block, week_len)
+            if shifts is not None and part.shifts != shifts:
+                raise ValueError("Todos los bloques deben tener el mismo número de turnos.")
+            shifts = part.shifts
+            counts.append(np.diff(part.indptr))
+            indices.append(part.indices)
+            if part.invalid.size:
+                invalid.append(part.invalid + np.array([nurses, 0], dtype=np.int32))
+            nurses += part.nurses
+        return cls._assemble_blocks(counts, indices, invalid, nurses, shifts or 0, week_len)
+
+    @classmethod
+    def _assemble_blocks(cls, counts, indices, invalid, nurses, shifts, week_len):
+        indptr = np.zeros(nurses + 1, dtype=np.int64)
+        if counts:
+            np.cumsum(np.concatenate(counts), out=indptr[1:])
+        return cls(
+            indptr=indptr,
+            indices=np.concatenate(indices) if indices else np.empty(0, _index_dtype(shifts)),
+            shifts=shifts,
+            invalid=np.concatenate(invalid) if invalid else np.empty((0, 2), dtype=np.int32),
+            week_len=week_len,
+        )
+
+    @classmethod
+    def from_csr(cls, matrix, week_len=SHIFTS):
+        """Desde una matriz CSR de SciPy (o cualquier objeto con ``indptr``, ``indices``, ``data``)."""
+        if isinstance(matrix, cls):
+            return matrix
+        if hasattr(matrix, "tocsr"):
+            matrix = matrix.tocsr()
+        nurses, shifts = matrix.shape
+        indptr = np.asarray(matrix.indptr, dtype=np.int64)
+        rows = np.repeat(np.arange(nurses), np.diff(indptr))
+        return cls.from_pairs(rows, matrix.indices, matrix.data, nurses, shifts, week_len)
+
+    def to_csr(self):
+        """Matriz ``scipy.sparse.csr_array`` de 0/1 (sin las celdas no binarias)."""
+        from scipy import sparse
+
+        data = np.ones(self.nnz, dtype=np.uint8)
+        return sparse.csr_array((data, self.indices, self.indptr), shape=self.shape)
+
+    # =======================
+    # LECTURA Y ESCRITURA
+    # =======================
+    def save(self, target):
+        """Guarda en ``.npz`` comprimido, legible también con ``scipy.sparse.load_npz``."""
+        np.savez_compressed(
+            target, format=np.array("csr"), shape=np.array(self.shape), indptr=self.indptr,
+            indices=self.indices, data=np.ones(self.nnz, dtype=np.uint8), invalid=self.invalid,
+            week_len=np.array(self.week_len),
+        )
+
+    @classmethod
+    def load(cls, source, week_len=None):
+        """Lee un ``.npz`` escrito por ``save`` o por ``scipy.sparse.save_npz`` (CSR)."""
+        with np.load(source, allow_pickle=False) as data:
+            if "format" in data and str(data["format"]) != "csr":
+                raise ValueError(f"Solo se admiten matrices CSR, no '{data['format']}'.")
+            nurses, shifts = (int(v) for v in data["shape"])
+            if week_len is None:
+                week_len = int(data["week_len"]) if "week_len" in data else SHIFTS
+            indptr, indices, values = data["indptr"], data["indices"], data["data"]
+            if "invalid" in data:
+                # archivo propio: índices ya ordenados y sin repetir, todos los valores 1
+                return cls(indptr=indptr.astype(np.int64),
+                           indices=indices.astype(_index_dtype(shifts)), shifts=shifts,
+                           invalid=data["invalid"].astype(np.int32), week_len=week_len)
+        rows = np.repeat(np.arange(nurses), np.diff(indptr))
+        return cls.from_pairs(rows, indices, values, nurses, shifts, week_len)
+
+    # =======================
+    # VISTAS
+    # =======================
+    def to_matrix(self, start=0, stop=None):
+        """Filas ``start:stop`` como matriz densa ``uint8`` (0, 1 o ``INVALID``)."""
+        stop = self.nurses if stop is None else min(stop, self.nurses)
+        return self.take(np.arange(start, stop))
+
+    def take(self, rows):
+        """Solo las filas ``rows`` (índices de enfermera en orden creciente), densas."""
+        rows = np.asarray(rows, dtype=np.intp)
+        out = np.zeros((rows.size, self.shifts), dtype=np.uint8)
+        lengths = self.indptr[rows + 1] - self.indptr[rows]
+        if lengths.sum():
+            positions = np.repeat(self.indptr[rows] - np.cumsum(lengths) + lengths, lengths)
+            positions += np.arange(lengths.sum())
+            out[np.repeat(np.arange(rows.size), lengths), self.indices[positions]] = 1
+        bad = self.invalid[np.isin(self.invalid[:, 0], rows)]
+        out[np.searchsorted(rows, bad[:, 0]), bad[:, 1]] = INVALID
+        return out
+
+    def column(self, j):
+        """Columna ``j`` de Xij (0, 1 o ``INVALID``)."""
+        out = np.zeros(self.nurses, dtype=np.uint8)
+        out[self._rows()[self.indices == j]] = 1
+        out[self.invalid[self.invalid[:, 1] == j, 0]] = INVALID
+        return out
+
+    # =======================
+    # AGREGADOS
+    # =======================
+    def week_hours(self, shift_hours=SHIFT_HOURS):
+        """Horas por enfermera y semana: conteo de asignaciones por (enfermera, semana)."""
+        weeks = -(-self.shifts // self.week_len)
+        slot = self._rows() * weeks + self.indices // self.week_len
+        counts = np.bincount(slot, minlength=self.nurses * weeks)
+        return counts.reshape(self.nurses, weeks) * shift_hours
+
+    def hours(self, shift_hours=SHIFT_HOURS):
+        return self.week_hours(shift_hours).sum(axis=1)
+
+    def coverage(self):
+        return np.bincount(self.indices, minlength=self.shifts).astype(np.int64)
+
+    def rest_violations(self, window=REST_WINDOW):
+        """Inicios de ventana de R2 con dos o más turnos, como ``(enfermeras, turnos)``.
+
+        Si una enfermera tiene dos asignaciones consecutivas ``a < b`` con
+        ``b − a < window``, violan las ventanas que empiezan entre
+        ``b − window + 1`` y ``a``. Tres asignaciones cercanas se cubren con
+        sus pares consecutivos (toda ventana con la primera y la última tiene
+        la del medio).
+        """
+        rows = self._rows()
+        cols = self.indices.astype(np.int64)
+        close = (rows[1:] == rows[:-1]) & (cols[1:] - cols[:-1] < window)
+        a, b, nurse = cols[:-1][close], cols[1:][close], rows[1:][close]
+
+        found = []
+        for offset in range(window - 1):
+            start = a - offset
+            keep = (start >= b - window + 1) & (start >= 0) & (start <= self.shifts - window)
+            found.append(nurse[keep] * self.shifts + start[keep])
+        cells = _sorted_unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+        return np.divmod(cells, self.shifts) if self.shifts else (cells, cells)
+
+    def validate(self, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None, nj_max=None,
+                 window=REST_WINDOW):
+        """Mismo resultado que ``turnos.validate(..., week_len=self.week_len)`` en la matriz densa."""
+        week_len = _week_len(self.week_len, self.shifts)
+        nj_min = _per_shift(nj_min, self.shifts, 0.0)
+        nj_max = _per_shift(nj_max, self.shifts, np.inf)
+        r5 = (self.invalid[:, 0], self.invalid[:, 1])
+        return _assemble(self.week_hours(shift_hours), self.coverage(),
+                         self.rest_violations(window), r5, WH, nj_min, nj_max, week_len)
+
+
+def assignment_columns(names):
+    """Nombres de las columnas (enfermera, turno, valor) si ``names`` es una lista de asignaciones."""
+    lowered = [str(name).strip().lower() for name in names]
+    for nurse, shift, value in ASSIGNMENT_COLUMNS:
+        if nurse in lowered and shift in lowered:
+            return (names[lowered.index(nurse)], names[lowered.index(shift)],
+                    names[lowered.index(value)] if value in lowered else None)
+    return None
+
+
+def from_table(table, nurses=None, shifts=None, week_len=SHIFTS):
+    """``SparseRoster`` desde una tabla de Arrow con columnas de asignación (1-based)."""
+    columns = assignment_columns(table.column_names)
+    if columns is None:
+        raise ValueError("La tabla no tiene columnas 'enfermera' y 'turno'.")
+    nurse, shift, value = (None if name is None else table.column(name).to_numpy(zero_copy_only=False)
+                           for name in columns)
+    try:
+        nurse = np.asarray(nurse, dtype=np.int64) - 1
+        shift = np.asarray(shift, dtype=np.int64) - 1
+    except (TypeError, ValueError):
+        raise ValueError("Las columnas 'enfermera' y 'turno' deben ser enteras.") from None
+    if value is not None:
+        value = np.asarray([v if isinstance(v, (int, float)) else np.nan for v in value]
+                           if value.dtype == object else value, dtype=float)
+    return SparseRoster.from_pairs(nurse, shift, value, nurses, shifts, week_len)
+
+
+def is_sparse_file(source, name=None):
+    """``True`` si el archivo es ``.npz`` o una lista de asignaciones (CSV/Parquet)."""
+    from turnos.loaders import _extension, _read_schema
+
+    fmt = _extension(name if name is not None else getattr(source, "name", source))
+    if fmt == "npz":
+        return True
+    if fmt in ("csv", "parquet"):
+        return assignment_columns(_read_schema(source, fmt)) is not None
+    return False
+
+
+def load_sparse(source, name=None, week_len=SHIFTS, shifts=None):
+    """Lee cualquier formato de rol como ``SparseRoster``.
+
+    Las matrices densas se convierten por bloques; ``shifts`` fija el horizonte
+    de una lista de asignaciones (si no, termina en la última semana con turnos).
+    """
+    from turnos.loaders import _extension, _read_table, iter_roster
+
+    fmt = _extension(name if name is not None else getattr(source, "name", source))
+    if fmt == "npz":
+        return SparseRoster.load(source, week_len)
+    if is_sparse_file(source, name):
+        table = _read_table(source, fmt)
+        roster = from_table(table, shifts=shifts, week_len=week_len)
+        if shifts is None and roster.shifts % week_len:
+            roster.shifts += week_len - roster.shifts % week_len     # semanas completas
+        return roster
+    return SparseRoster.from_blocks(iter_roster(source, name), week_len)
+
+
+def save_sparse(roster, path):
+    """Guarda ``roster`` como ``.npz`` o, si ``path`` termina en ``.csv``, como lista."""
+    if os.path.splitext(str(path))[1].lower() == ".csv":
+        rows = roster._rows()
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write("enfermera,turno,valor\n")
+            np.savetxt(f, np.column_stack([rows + 1, roster.indices.astype(np.int64) + 1,
+                                           np.ones(roster.nnz, dtype=np.int64)]),
+                       fmt="%d", delimiter=",")
+            if roster.invalid.size:
+                np.savetxt(f, np.column_stack([roster.invalid + 1,
+                                               np.full(len(roster.invalid), 2)]),
+                           fmt="%d", delimiter=",")
+    else:
+        roster.save(path)
@@ -0,0 +1,114 @@
+"""Validación incremental (fuera de memoria) de roles muy grandes.
+
+El archivo se recorre en bloques de filas con ``turnos.loaders.iter_roster``;
+cada bloque pasa por ``validate`` y solo se acumulan los turnos trabajados por
+enfermera, la cobertura por turno y las violaciones de R2 y R5. R1, R3 y R4
+dependen de parámetros (WH, Nj(min), Nj(max)) y se evalúan al final sobre esos
+acumulados, así que cambiar los parámetros no obliga a releer el archivo.
+
+La memoria usada depende del tamaño del bloque: de la matriz completa solo se
+conservan 2 bytes por enfermera y semana.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from turnos.loaders import BLOCK_ROWS, iter_roster, roster_rows
+from turnos.validation import (
+    REST_WINDOW,
+    SHIFT_HOURS,
+    WH,
+    _assemble,
+    _per_shift,
+    validate,
+)
+
+
+@dataclass
+class StreamSummary:
+    """Acumulados de una pasada por bloques sobre el archivo."""
+
+    worked: np.ndarray      # turnos trabajados por enfermera y semana (uint16)
+    coverage: np.ndarray    # enfermeras por turno
+    rest: np.ndarray        # (k, 2) int32 → violaciones de R2 (enfermera, turno)
+    invalid: np.ndarray     # (k, 2) int32 → celdas no binarias (R5)
+    week_len: int
+
+    @property
+    def nurses(self):
+        return self.worked.shape[0]
+
+    @property
+    def shifts(self):
+        return self.coverage.shape[0]
+
+    @property
+    def shape(self):
+        return (self.nurses, self.shifts)
+
+    def validate(self, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None, nj_max=None):
+        """Completa R1, R3 y R4 y devuelve un ``ValidationResult``."""
+        return _assemble(
+            self.worked.astype(np.int64) * shift_hours,
+            self.coverage,
+            (self.rest[:, 0], self.rest[:, 1]),
+            (self.invalid[:, 0], self.invalid[:, 1]),
+            WH,
+            _per_shift(nj_min, self.shifts, 0.0),
+            _per_shift(nj_max, self.shifts, np.inf),
+            self.week_len,
+        )
+
+
+def validate_blocks(blocks, window=REST_WINDOW, week_len=None, total=None,
+                    progress=None):
+    """Recorre ``blocks`` (matrices de filas consecutivas) y acumula los resultados.
+
+    ``progress(filas_procesadas, total)`` se llama después de cada bloque;
+    ``total`` puede ser ``None`` si no se conoce el número de filas.
+    """
+    worked, rest, invalid = [], [], []
+    coverage = None
+    rows = 0
+    for block in blocks:
+        # sin límites de horas ni de cobertura: solo R2, R5 y los agregados
+        part = validate(block, WH=np.inf, shift_hours=1, window=window,
+                        week_len=week_len)
+        if coverage is None:
+            coverage = np.zeros(part.shifts, dtype=np.int64)
+        elif part.shifts != coverage.shape[0]:
+            raise ValueError("Todas las filas deben tener el mismo número de turnos.")
+
+        coverage += part.coverage
+        worked.append(part.week_hours.astype(np.uint16))
+        for rule, found in ((2, rest), (5, invalid)):
+            pairs = part.by_rule(rule)[:, :2]
+            pairs[:, 0] += rows
+            found.append(pairs)
+
+        rows += part.nurses
+        if progress is not None:
+            progress(rows, total)
+
+    if coverage is None:
+        raise ValueError("El archivo no contiene filas.")
+    shifts = coverage.shape[0]
+    return StreamSummary(
+        worked=np.concatenate(worked),
+        coverage=coverage,
+        rest=np.concatenate(rest),
+        invalid=np.concatenate(invalid),
+        week_len=shifts if week_len is None else min(week_len, shifts),
+    )
+
+
+def validate_stream(source, name=None, block_rows=BLOCK_ROWS, window=REST_WINDOW,
+                    week_len=None, progress=None):
+    """Lee ``source`` por bloques de ``block_rows`` filas y lo valida.
+
+    Acepta los mismos formatos que ``turnos.loaders.load_roster``.
+    """
+    total = roster_rows(source, name)
+    return validate_blocks(iter_roster(source, name, block_rows), window, week_len,
+                           total, progress)
@@ -0,0 +1,80 @@
+"""Generador reproducible de matrices Xij sintéticas.
+
+Cada semana de cada enfermera es un horario que cumple R1 y R2 por
+construcción: se eligen ``k`` turnos (``k`` al azar hasta ``floor(WH/8)``)
+separados al menos ``window`` turnos entre sí. Las semanas se cosen con
+``turnos.decompose.stitch``, y los turnos del inicio de semana que aún chocan
+con el final de la anterior se quitan, para que tampoco haya choques de R2 en
+el cambio de semana (quitar turnos no rompe R1). Después se inyectan defectos a tasas controladas:
+
+- ``violation_rate``: fracción de enfermeras a las que se agrega un turno
+  pegado a otro ya trabajado (viola R2 y a veces R1);
+- ``invalid_rate``: fracción de celdas con un valor no binario (R5).
+
+La misma semilla produce siempre la misma matriz.
+"""
+
+import numpy as np
+
+from turnos.horizon import Horizon
+from turnos.validation import REST_WINDOW, SHIFT_HOURS, WH
+
+BAD_VALUE = 2       # valor no binario que se inyecta para R5
+
+
+def weekly_schedules(nurses, week_len, rng, WH=WH, shift_hours=SHIFT_HOURS,
+                     window=REST_WINDOW):
+    """Una semana factible (R1 y R2) por enfermera, como matriz ``uint8``."""
+    most = min(int(WH // shift_hours), -(-week_len // window))
+    worked = rng.integers(0, most + 1, size=nurses)
+    out = np.zeros((nurses, week_len), dtype=np.uint8)
+    for k in range(1, most + 1):
+        rows = np.flatnonzero(worked == k)
+        if not rows.size:
+            continue
+        # k posiciones entre las que quedan al reservar window − 1 turnos tras cada una
+        slots = week_len - (k - 1) * (window - 1)
+        picks = np.sort(np.argsort(rng.random((rows.size, slots)), axis=1)[:, :k], axis=1)
+        cols = picks + np.arange(k) * (window - 1)
+        out[rows[:, None], cols] = 1
+    return out
+
+
+def _drop_seam_conflicts(previous, following, window=REST_WINDOW):
+    """Quita de ``following`` los turnos iniciales que violan R2 con el final de ``previous``."""
+    following = following.copy()
+    for q in range(min(window - 1, following.shape[1])):
+        tail = previous[:, previous.shape[1] - (window - 1 - q):]
+        following[tail.any(axis=1), q] = 0
+    return following
+
+
+def generate_roster(nurses, weeks=1, slots=3, violation_rate=0.0, invalid_rate=0.0,
+                    seed=0, WH=WH, shift_hours=SHIFT_HOURS, window=REST_WINDOW):
+    """Matriz (enfermeras × turnos) ``uint8`` con la semilla ``seed``."""
+    rng = np.random.default_rng(seed)
+    horizon = Horizon(weeks=weeks, slots=slots)
+    blocks = [weekly_schedules(nurses, horizon.week_len, rng, WH, shift_hours, window)]
+    if weeks > 1:
+        from turnos.decompose import stitch     # importa SciPy solo si hay semanas que coser
+    for _ in range(1, weeks):
+        following = weekly_schedules(nurses, horizon.week_len, rng, WH, shift_hours, window)
+        following = stitch(blocks[-1], following, window)
+        blocks.append(_drop_seam_conflicts(blocks[-1], following, window))
+    X = np.hstack(blocks)
+
+    # R2 (y a veces R1): un turno extra justo después de uno trabajado
+    broken = np.flatnonzero(rng.random(nurses) < violation_rate)
+    if broken.size:
+        worked = X[broken].astype(bool)
+        worked[:, -1] = False
+        has = worked.any(axis=1)
+        broken, worked = broken[has], worked[has]
+        first = np.argmax(worked, axis=1)
+        X[broken, first + 1] = 1
+
+    # R5: celdas no binarias
+    if invalid_rate:
+        cells = rng.random(X.shape) < invalid_rate
+        X[cells] = BAD_VALUE
+    return X
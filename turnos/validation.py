@@ -0,0 +1,189 @@
+"""Validación vectorizada de las restricciones R1–R5 sobre una matriz Xij.
+
+Todas las reglas se evalúan con operaciones de NumPy sobre la matriz completa
+(sin bucles de Python por enfermera o por turno). Las violaciones se devuelven
+como un arreglo compacto de índices ``(enfermera, turno, regla)``; cuando la
+regla no depende de uno de los ejes se usa ``-1`` en esa columna.
+
+R1 se evalúa por semana. Con una sola semana la columna de turno de R1 vale
+``-1``; con varias, es el primer turno de la semana en que se excede WH.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# =======================
+# PARÁMETROS POR DEFECTO
+# =======================
+WH = 40             # horas máximas por enfermera y semana
+SHIFTS = 21         # turnos por semana: 3 por día × 7 días
+SHIFT_HOURS = 8     # duración de cada turno
+REST_WINDOW = 3     # R2: a lo sumo un turno en cada ventana de 3 turnos
+
+RULES = {
+    1: "R1 — Límite de horas por enfermera",
+    2: "R2 — Descanso mínimo entre turnos",
+    3: "R3 — Mínimo por turno",
+    4: "R4 — Máximo por turno",
+    5: "R5 — Naturaleza binaria",
+}
+
+
+@dataclass
+class ValidationResult:
+    """Resultado de ``validate``: agregados y violaciones de la matriz."""
+
+    hours: np.ndarray           # horas por enfermera, forma (nurses,)
+    week_hours: np.ndarray      # horas por enfermera y semana, forma (nurses, weeks)
+    coverage: np.ndarray        # enfermeras por turno, forma (shifts,)
+    violations: np.ndarray      # (k, 3) int32 → enfermera, turno, regla
+    WH: float
+    nj_min: np.ndarray
+    nj_max: np.ndarray
+
+    @property
+    def nurses(self):
+        return self.hours.shape[0]
+
+    @property
+    def shifts(self):
+        return self.coverage.shape[0]
+
+    @property
+    def weeks(self):
+        return self.week_hours.shape[1]
+
+    @property
+    def feasible(self):
+        return self.violations.shape[0] == 0
+
+    def counts(self):
+        """Número de violaciones por regla, ``{1: n1, ..., 5: n5}``."""
+        per_rule = np.bincount(self.violations[:, 2], minlength=len(RULES) + 1)
+        return {rule: int(per_rule[rule]) for rule in RULES}
+
+    def by_rule(self, rule):
+        """Filas de ``violations`` que corresponden a una regla."""
+        return self.violations[self.violations[:, 2] == rule]
+
+
+def _per_shift(value, shifts, default):
+    """Convierte un escalar o vector en un vector de longitud ``shifts``."""
+    if value is None:
+        value = default
+    vector = np.asarray(value, dtype=float)
+    if vector.ndim == 0:
+        return np.full(shifts, float(vector))
+    if vector.shape != (shifts,):
+        raise ValueError(
+            f"Se esperaban {shifts} valores por turno, se recibieron {vector.shape[0]}."
+        )
+    return vector
+
+
+def _stack(nurse, shift, rule):
+    rows = np.empty((nurse.shape[0], 3), dtype=np.int32)
+    rows[:, 0] = nurse
+    rows[:, 1] = shift
+    rows[:, 2] = rule
+    return rows
+
+
+def _week_len(week_len, shifts):
+    """Turnos por semana; ``None`` trata todo el horizonte como una semana."""
+    if week_len is None or week_len >= shifts:
+        return max(shifts, 1)
+    if shifts % week_len:
+        raise ValueError(
+            f"{shifts} turnos no forman un número entero de semanas de {week_len} turnos."
+        )
+    return week_len
+
+
+def validate(X, WH=WH, shift_hours=SHIFT_HOURS, nj_min=None, nj_max=None,
+             window=REST_WINDOW, week_len=None):
+    """Evalúa R1–R5 sobre ``X`` (enfermeras × turnos) en una sola pasada.
+
+    ``nj_min`` y ``nj_max`` aceptan un escalar (mismo valor para todos los
+    turnos) o un vector con un valor por turno. Si se omiten, R3 y R4 no
+    restringen (mínimo 0, máximo infinito). ``week_len`` es el número de
+    turnos por semana para R1 (por defecto, todo el horizonte).
+
+    ``X`` también puede ser una matriz dispersa (``turnos.sparse.SparseRoster``
+    o CSR de SciPy); entonces el costo es proporcional a las asignaciones.
+    """
+    if hasattr(X, "indptr"):
+        from dataclasses import replace
+
+        from turnos.sparse import SparseRoster
+
+        roster = SparseRoster.from_csr(X)
+        roster = replace(roster, week_len=_week_len(week_len, roster.shifts))
+        return roster.validate(WH, shift_hours, nj_min, nj_max, window)
+
+    values = np.asarray(X)
+    if values.ndim != 2:
+        raise ValueError("La matriz Xij debe tener dos dimensiones (enfermeras × turnos).")
+    nurses, shifts = values.shape
+    week_len = _week_len(week_len, shifts)
+
+    nj_min = _per_shift(nj_min, shifts, 0.0)
+    nj_max = _per_shift(nj_max, shifts, np.inf)
+
+    # R5 — celdas que no son 0 ni 1 (incluye vacías/NaN). El resto de reglas
+    # trabaja sobre una máscara booleana (1 byte por celda) sin pasar a float.
+    if values.dtype == np.bool_:
+        cells = values
+        not_binary = np.zeros(values.shape, dtype=bool)
+    else:
+        cells = values == 1
+        not_binary = ~(cells | (values == 0))
+
+    # R1 — horas por enfermera y semana, sobre la vista (enfermeras, semanas, turnos)
+    week_hours = cells.reshape(nurses, -1, week_len).sum(axis=2) * shift_hours
+    coverage = cells.sum(axis=0)
+
+    # R2 — suma deslizante de ``window`` turnos: se suman ``window`` vistas
+    # desplazadas de la matriz, con acumulador de 1 byte por ventana
+    windows = shifts - window + 1
+    if windows > 0:
+        window_sum = cells[:, :windows].astype(np.uint8)
+        for offset in range(1, window):
+            window_sum += cells[:, offset:offset + windows]
+        r2 = np.nonzero(window_sum > 1)
+    else:
+        r2 = (np.empty(0, dtype=np.intp),) * 2
+
+    return _assemble(week_hours, coverage, r2, np.nonzero(not_binary),
+                     WH, nj_min, nj_max, week_len)
+
+
+def _assemble(week_hours, coverage, r2, r5, WH, nj_min, nj_max, week_len):
+    """Evalúa R1 sobre ``week_hours`` y R3/R4 sobre ``coverage``.
+
+    ``r2`` y ``r5`` son pares ``(enfermeras, turnos)`` con los índices de las
+    violaciones ya detectadas. Devuelve el ``ValidationResult`` completo.
+    """
+    nurse, week = np.nonzero(week_hours > WH)
+    r1_shift = -1 if week_hours.shape[1] == 1 else week * week_len
+    r3 = np.flatnonzero(coverage < nj_min)
+    r4 = np.flatnonzero(coverage > nj_max)
+
+    violations = np.concatenate([
+        _stack(nurse, r1_shift, 1),
+        _stack(*r2, 2),
+        _stack(np.full(r3.shape[0], -1), r3, 3),
+        _stack(np.full(r4.shape[0], -1), r4, 4),
+        _stack(*r5, 5),
+    ])
+
+    return ValidationResult(
+        hours=week_hours.sum(axis=1),
+        week_hours=week_hours,
+        coverage=coverage,
+        violations=violations,
+        WH=WH,
+        nj_min=nj_min,
+        nj_max=nj_max,
+    )
@@ -0,0 +1,87 @@
+"""Vista paginada de Xij: solo se envía al navegador la ventana visible.
+
+Los filtros (enfermeras con violaciones, un solo turno, enfermeras asignadas a
+ese turno) se resuelven en el servidor sobre índices, y después se
+desempaquetan únicamente las filas de la página pedida. El tamaño de lo que se
+muestra depende de ``PAGE_ROWS`` y no del número de enfermeras.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from turnos.packed import PackedRoster
+from turnos.sparse import SparseRoster
+
+PAGE_ROWS = 50      # filas por página
+
+
+@dataclass
+class Page:
+    """Ventana visible de la matriz."""
+
+    rows: np.ndarray        # índices (0-based) de las enfermeras mostradas
+    columns: np.ndarray     # índices (0-based) de los turnos mostrados
+    cells: np.ndarray       # (len(rows), len(columns)) uint8
+    matches: int            # enfermeras que cumplen el filtro
+    number: int             # página mostrada (0-based)
+    pages: int
+
+
+def violating_nurses(result):
+    """Enfermeras con alguna violación de R1, R2 o R5 (en orden creciente)."""
+    nurses = result.violations[:, 0]
+    return np.unique(nurses[nurses >= 0])
+
+
+def summary(result):
+    """Resumen de la matriz para el encabezado del visor."""
+    cells = result.nurses * result.shifts
+    assigned = int(result.coverage.sum())
+    return {
+        "nurses": result.nurses,
+        "shifts": result.shifts,
+        "assigned": assigned,
+        "density": assigned / cells if cells else 0.0,
+        "invalid": result.counts()[5],
+        "violating": violating_nurses(result).size,
+    }
+
+
+def _take(source, rows):
+    if isinstance(source, (PackedRoster, SparseRoster)):
+        return source.take(rows)
+    return np.asarray(source)[rows]
+
+
+def _column(source, j):
+    if isinstance(source, (PackedRoster, SparseRoster)):
+        return source.column(j)
+    return np.asarray(source)[:, j]
+
+
+def select(source, result=None, only_violations=False, shift=None, only_assigned=False):
+    """Filas y columnas que cumplen los filtros, como arreglos de índices.
+
+    ``source`` es un ``PackedRoster``, un ``SparseRoster`` o una matriz
+    (enfermeras × turnos).
+    ``shift`` (0-based) deja una sola columna; con ``only_assigned`` se
+    conservan solo las enfermeras con ``Xij = 1`` en ese turno.
+    """
+    nurses, shifts = source.shape
+    rows = violating_nurses(result) if only_violations else np.arange(nurses)
+    if shift is None:
+        return rows, np.arange(shifts)
+    if only_assigned:
+        rows = rows[_column(source, shift)[rows] == 1]
+    return rows, np.array([shift])
+
+
+def page(source, rows, columns, number=0, page_rows=PAGE_ROWS):
+    """Desempaqueta solo la página ``number`` de las filas seleccionadas."""
+    pages = max(1, -(-len(rows) // page_rows))
+    number = min(max(number, 0), pages - 1)
+    shown = rows[number * page_rows:(number + 1) * page_rows]
+    cells = _take(source, shown)[:, columns]
+    return Page(rows=shown, columns=columns, cells=cells, matches=len(rows),
+                number=number, pages=pages)